@@ -0,0 +1,68 @@
+"""Débit de requêtes concurrentes : appels bloquants (pyrebase) vs repository asynchrone.
+
+Simule une Realtime Database avec une latence fixe par aller-retour, puis lance
+N requêtes simultanées sur la boucle d'événements, comme le ferait uvicorn :
+
+    python -m benchmarks.bench_async_db --requests 200 --latency 0.05
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from database.firebase_rest import FirebaseRestClient
+
+STUDENT = {"id": "student-1", "first_name": "Ada", "validated_skills": {"python": "avancé"}}
+
+
+def blocking_get(latency: float):
+    # Équivalent de db.child(...).get().val() : la requête HTTP bloque le thread
+    time.sleep(latency)
+    return STUDENT
+
+
+async def handler_before(latency: float):
+    return blocking_get(latency)
+
+
+def mock_transport(latency: float) -> httpx.MockTransport:
+    async def handle(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        return httpx.Response(200, content=json.dumps(STUDENT))
+    return httpx.MockTransport(handle)
+
+
+async def run(handler, total: int) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(handler() for _ in range(total)))
+    return total / (time.perf_counter() - start)
+
+
+async def main(total: int, latency: float):
+    client = FirebaseRestClient(
+        "https://bench.firebaseio.test", token_provider=None, transport=mock_transport(latency)
+    )
+
+    async def handler_after():
+        return await client.get("students/student-1")
+
+    before = await run(lambda: handler_before(latency), total)
+    after = await run(handler_after, total)
+    await client.close()
+    print(json.dumps({
+        "requests": total,
+        "latency_s": latency,
+        "blocking_req_per_s": round(before, 1),
+        "async_req_per_s": round(after, 1),
+        "speedup": round(after / before, 1)
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.latency))
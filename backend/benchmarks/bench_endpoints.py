@@ -0,0 +1,194 @@
+"""Latence des endpoints sur un jeu de données synthétique, application en processus.
+
+Génère les données (benchmarks.datagen), les charge dans une base SQLite
+temporaire, démarre l'application (lifespan compris) puis appelle chaque
+endpoint via httpx.ASGITransport. Pour chaque scénario : percentiles de
+latence, allers-retours et octets reçus de la base par requête (traces de
+database/tracing.py) et pic mémoire (tracemalloc).
+Résultat JSON, comparable d'un commit à l'autre :
+
+    python -m benchmarks.bench_endpoints --scale 0.1 --requests 200 --output bench.json
+
+L'authentification passe par le cache de jetons, préchargé ; pour les
+inscriptions, Firebase Auth est remplacé par un faux local : seul le
+traitement côté serveur est mesuré.
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from types import SimpleNamespace
+
+os.environ.setdefault("STORAGE_BACKEND", "sqlite")
+
+import httpx
+
+from benchmarks.datagen import Scale, generate, load
+from database import repository
+from database.sqlite_store import SQLiteStore
+from database.tracing import capture_traces
+from services.recommendation_cache import recommendation_cache
+from services.token_cache import token_cache
+
+# Utilisateurs échantillonnés pour les requêtes (un jeton chacun)
+SAMPLE_USERS = 200
+
+
+class FakeAdminAuth:
+    """Remplace firebase_admin.auth pour les inscriptions"""
+
+    class EmailAlreadyExistsError(Exception):
+        pass
+
+    @staticmethod
+    def create_user(**kwargs):
+        return SimpleNamespace(
+            uid=str(uuid.uuid4()),
+            user_metadata=SimpleNamespace(creation_timestamp=int(time.time() * 1000))
+        )
+
+
+def _tokens(data: dict, collection: str, user_type: str) -> list:
+    tokens = []
+    for uid in list(data[collection])[:SAMPLE_USERS]:
+        token = f"bench-{uid}"
+        token_cache.put(token, {"uid": uid, "user_type": user_type, **data["users"][uid]})
+        tokens.append(token)
+    return tokens
+
+
+def _signup_payload(index: int) -> dict:
+    return {
+        "email": f"inscription{index}-{uuid.uuid4().hex[:8]}@example.com", "password": "secret123",
+        "first_name": "Nouvel", "last_name": "Étudiant", "school": "EPITA",
+        "formation": "Informatique", "year_of_study": 2
+    }
+
+
+def scenarios() -> dict:
+    """Nom -> requête : méthode, URL, type de jeton, corps, préparation, utilisateurs distincts"""
+    return {
+        "auth_me": {"method": "GET", "url": "/auth/me", "user_type": "student"},
+        "recommendations_cold": {"method": "GET", "url": "/matching/recommendations?limit=20",
+                                 "user_type": "student", "prepare": recommendation_cache.clear},
+        # Quelques étudiants seulement : après le premier appel, le classement vient du cache
+        "recommendations_warm": {"method": "GET", "url": "/matching/recommendations?limit=20",
+                                 "user_type": "student", "users": 10},
+        "search_opportunities": {"method": "GET", "url": "/matching/search?q=développeur python&type=stage&limit=20",
+                                 "user_type": "student"},
+        "my_validations": {"method": "GET", "url": "/skills/my-validations?limit=20", "user_type": "student"},
+        "pending_validations": {"method": "GET", "url": "/skills/pending-validations?limit=20",
+                                "user_type": "professional"},
+        "validation_stats": {"method": "GET", "url": "/professionals/validation-stats",
+                             "user_type": "professional"},
+        "company_opportunities": {"method": "GET", "url": "/companies/opportunities?limit=20",
+                                  "user_type": "company"},
+        "signup_student": {"method": "POST", "url": "/auth/signup/student", "body": _signup_payload},
+    }
+
+
+def _percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+async def run_scenario(client, method: str, url: str, tokens: list, requests: int,
+                       body=None, prepare=None) -> dict:
+    latencies, calls, received, statuses = [], [], [], {}
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for index in range(requests):
+        headers = {"Authorization": f"Bearer {tokens[index % len(tokens)]}"} if tokens else {}
+        payload = body(index) if callable(body) else body
+        if prepare:
+            prepare()
+        with capture_traces() as traces:
+            start = time.perf_counter()
+            response = await client.request(method, url, headers=headers, json=payload)
+            latencies.append((time.perf_counter() - start) * 1000)
+        calls.append(sum(trace.call_count for trace in traces))
+        received.append(sum(trace.bytes_received for trace in traces))
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    return {
+        "requests": requests,
+        "status_codes": {str(code): count for code, count in sorted(statuses.items())},
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 0.50), 3),
+            "p90": round(_percentile(latencies, 0.90), 3),
+            "p99": round(_percentile(latencies, 0.99), 3),
+            "mean": round(statistics.fmean(latencies), 3),
+            "max": round(max(latencies), 3)
+        },
+        "db_calls_per_request": round(statistics.fmean(calls), 2),
+        "db_calls_max": max(calls),
+        "db_bytes_received_per_request": round(statistics.fmean(received)),
+        "peak_memory_kb": round(peak / 1024, 1)
+    }
+
+
+async def main(scale: Scale, requests: int, only: list, seed: int) -> dict:
+    import main as app_module
+    import routers.router_auth
+
+    directory = tempfile.mkdtemp(prefix="studyconnect-bench-")
+    repository.configure(SQLiteStore(os.path.join(directory, "bench.db")))
+    routers.router_auth.get_admin_auth = lambda: FakeAdminAuth
+
+    start = time.perf_counter()
+    data = generate(scale, seed)
+    volumes = await load(data)
+    load_seconds = time.perf_counter() - start
+
+    tokens = {
+        "student": _tokens(data, "students", "student"),
+        "professional": _tokens(data, "professionals", "professional"),
+        "company": _tokens(data, "companies", "company"),
+    }
+    results = {}
+    tracemalloc.start()
+    async with app_module.lifespan(app_module.app):
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name, scenario in scenarios().items():
+                if only and name not in only:
+                    continue
+                users = tokens.get(scenario.get("user_type"), [])[:scenario.get("users", SAMPLE_USERS)]
+                results[name] = await run_scenario(
+                    client, scenario["method"], scenario["url"], users, requests,
+                    scenario.get("body"), scenario.get("prepare")
+                )
+    tracemalloc.stop()
+    shutil.rmtree(directory, ignore_errors=True)
+    return {
+        "python": sys.version.split()[0],
+        "dataset": volumes,
+        "load_seconds": round(load_seconds, 2),
+        "requests_per_scenario": requests,
+        "scenarios": results
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Facteur appliqué à 10k étudiants, 2k pros, 50k validations, 5k opportunités")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--scenario", action="append", default=[], help="Limiter à ce scénario (répétable)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Fichier JSON de sortie (sinon stdout)")
+    args = parser.parse_args()
+    report = asyncio.run(main(Scale().scaled(args.scale), args.requests, args.scenario, args.seed))
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w") as report_file:
+            report_file.write(output + "\n")
+    else:
+        print(output)
@@ -0,0 +1,90 @@
+"""Coût par élément de la sérialisation des réponses, avant et après FAST_SERIALIZATION.
+
+Pour des pages d'enregistrements Opportunity, SkillValidation et Student du
+jeu synthétique, compare :
+- avant : Model(**record), revalidation et jsonable_encoder par le
+  response_model de FastAPI, puis JSONResponse ;
+- après : services.serialization.models_response (plan de champs en cache
+  par modèle, sans instance ni validation, encodage orjson).
+Les deux corps de réponse sont comparés avant la mesure.
+
+    python -m benchmarks.bench_serialization --records 2000 --page-size 20
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from benchmarks.datagen import Scale, generate
+from classes.schemas_dto import Opportunity, SkillValidation, Student
+from services.serialization import models_response
+
+MODELS = {
+    "Opportunity": (Opportunity, "opportunities"),
+    "SkillValidation": (SkillValidation, "skill_validations"),
+    "Student": (Student, "students"),
+}
+
+
+async def _before(field, model, records: list) -> bytes:
+    content = await serialize_response(field=field, response_content=[model(**record) for record in records])
+    return JSONResponse(content).body
+
+
+def _after(model, records: list) -> bytes:
+    return models_response(model, records, fast=True).body
+
+
+async def _measure(run, pages: list, repeat: int) -> float:
+    """Meilleur temps (s) d'un passage sur toutes les pages"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for page in pages:
+            result = run(page)
+            if asyncio.iscoroutine(result):
+                await result
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+async def main(records: int, page_size: int, repeat: int, seed: int) -> dict:
+    data = generate(Scale(
+        students=records, professionals=10, companies=10, validations=records, opportunities=records
+    ), seed)
+    results = {}
+    for name, (model, collection) in MODELS.items():
+        items = list(data[collection].values())
+        pages = [items[start:start + page_size] for start in range(0, len(items), page_size)]
+        field = create_model_field(name="Response", type_=List[model], mode="serialization")
+
+        before_body = await _before(field, model, pages[0])
+        if json.loads(before_body) != json.loads(_after(model, pages[0])):
+            raise AssertionError(f"{name} : corps de réponse différents")
+
+        before = await _measure(lambda page: _before(field, model, page), pages, repeat)
+        after = await _measure(lambda page: _after(model, page), pages, repeat)
+        results[name] = {
+            "items": len(items),
+            "before_us_per_item": round(before / len(items) * 1e6, 2),
+            "after_us_per_item": round(after / len(items) * 1e6, 2),
+            "speedup": round(before / after, 1)
+        }
+    return {"python": sys.version.split()[0], "page_size": page_size, "models": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=2000, help="Enregistrements générés par modèle")
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    report = asyncio.run(main(args.records, args.page_size, args.repeat, args.seed))
+    print(json.dumps(report, indent=2))
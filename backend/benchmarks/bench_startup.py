@@ -0,0 +1,88 @@
+"""Temps d'import à froid de l'application (démarrage des pods autoscalés).
+
+Lance `python -X importtime -c "import main"` dans des processus neufs, sans
+identifiants Firebase, et échoue (code 1) si la médiane dépasse le budget ou
+si un SDK lourd est importé avant le lifespan :
+
+    python -m benchmarks.bench_startup --runs 5 --budget-ms 1500
+
+Budget par défaut : médiane mesurée autour de 1050 ms (dont ~350 ms pour
+fastapi.openapi.models, importé par FastAPI lui-même), plus une marge pour
+les machines d'intégration plus lentes. Exécuté par tests/test_startup.py
+(marqueur `bench`, à exclure avec -m "not bench").
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+STARTUP_IMPORT_BUDGET_MS = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "1500"))
+
+# Modules qui ne doivent être chargés qu'au premier usage ou par le lifespan
+DEFERRED_MODULES = ("firebase_admin", "pyrebase", "scipy", "google.cloud")
+
+
+def _clean_env() -> dict:
+    env = {key: value for key, value in os.environ.items() if not key.startswith("FIREBASE_")}
+    env.pop("GOOGLE_APPLICATION_CREDENTIALS", None)
+    return env
+
+
+def parse_importtime(stderr: str) -> list:
+    """Lignes `import time: self | cumulé | module` -> [(module, self_us, cumulé_us)]"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        entries.append((name.strip(), int(self_us), int(cumulative_us)))
+    return entries
+
+
+def measure(module: str) -> list:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=_clean_env(), capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Import de {module} impossible :\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def main(module: str, runs: int, budget_ms: float, top: int) -> int:
+    totals, entries = [], []
+    for _ in range(runs):
+        entries = measure(module)
+        totals.append(next(cumulative for name, _, cumulative in entries if name == module) / 1000)
+    deferred = sorted({
+        name for name, _, _ in entries
+        if any(name == prefix or name.startswith(prefix + ".") for prefix in DEFERRED_MODULES)
+    })
+    heaviest = sorted(entries, key=lambda entry: entry[1], reverse=True)[:top]
+    median = statistics.median(totals)
+    report = {
+        "module": module,
+        "runs": runs,
+        "median_ms": round(median, 1),
+        "min_ms": round(min(totals), 1),
+        "budget_ms": budget_ms,
+        "within_budget": median <= budget_ms,
+        "deferred_modules_imported": deferred,
+        "heaviest_self_ms": {name: round(self_us / 1000, 1) for name, self_us, _ in heaviest}
+    }
+    print(json.dumps(report, indent=2))
+    return 0 if report["within_budget"] and not deferred else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_IMPORT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+    sys.exit(main(args.module, args.runs, args.budget_ms, args.top))
@@ -0,0 +1,157 @@
+"""Jeu de données synthétique StudyConnect, reproductible (graine fixe).
+
+Les enregistrements suivent les modèles de classes.schemas_dto ; les index
+(validations_by_student, pending_by_skill, company_order des opportunités,
+professional_stats...) sont ensuite construits par les reconstructions de
+database.backfills, comme en production.
+"""
+import random
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from database import repository as repo
+from database.backfills import BACKFILLS, run_backfill
+
+LOAD_CHUNK_SIZE = 1000
+
+LEVELS = ["débutant", "intermédiaire", "avancé", "expert"]
+SKILLS = [
+    "Python", "JavaScript", "TypeScript", "Java", "CSharp", "Go", "Rust", "SQL", "React", "Vue",
+    "Angular", "NodeJS", "Django", "FastAPI", "Spring", "Docker", "Kubernetes", "AWS", "Azure",
+    "Data Analysis", "Machine Learning", "Deep Learning", "Power BI", "Excel", "Figma", "Photoshop",
+    "UX Design", "SEO", "Digital Marketing", "Social Media", "Project Management", "Scrum",
+    "Communication", "Comptabilité", "Finance", "Droit des affaires", "Gestion de projet",
+    "Cybersécurité", "Réseaux", "Linux", "Git", "DevOps", "Flutter", "Swift", "Kotlin",
+]
+DOMAINS = [
+    "Python", "JavaScript", "Java", "Data", "Design", "Marketing", "Cloud", "Sécurité",
+    "Gestion", "Finance", "Mobile", "DevOps", "Web", "Learning", "SQL",
+]
+SCHOOLS = ["EPITA", "HEC", "INSA Lyon", "Université Paris-Saclay", "ESSEC", "EPF", "IUT Nantes"]
+CITIES = ["Paris", "Lyon", "Marseille", "Toulouse", "Nantes", "Lille", "Bordeaux"]
+OPPORTUNITY_TYPES = ["stage", "alternance", "emploi", "projet", "freelance"]
+ROLES = ["Développeur", "Analyste", "Chef de projet", "Consultant", "Ingénieur", "Designer", "Assistant"]
+
+
+@dataclass
+class Scale:
+    students: int = 10000
+    professionals: int = 2000
+    companies: int = 500
+    validations: int = 50000
+    opportunities: int = 5000
+
+    def scaled(self, factor: float) -> "Scale":
+        return Scale(*(max(1, int(value * factor)) for value in vars(self).values()))
+
+
+def _uid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _date(rng: random.Random, now: datetime, days: int = 365) -> str:
+    return (now - timedelta(seconds=rng.randrange(days * 86400))).isoformat()
+
+
+def generate(scale: Scale, seed: int = 42) -> dict:
+    """Arbre de données {collection: {id: enregistrement}}"""
+    rng = random.Random(seed)
+    now = datetime.now()
+    data = {name: {} for name in (
+        "users", "students", "professionals", "companies", "skill_validations", "opportunities"
+    )}
+
+    for index in range(scale.students):
+        uid = _uid(rng)
+        validated = rng.sample(SKILLS, rng.randint(0, 6))
+        data["students"][uid] = {
+            "id": uid, "email": f"etudiant{index}@example.com",
+            "first_name": f"Prénom{index}", "last_name": f"Nom{index}",
+            "school": rng.choice(SCHOOLS), "formation": "Informatique",
+            "year_of_study": rng.randint(1, 5), "user_type": "student",
+            "competences": rng.sample(SKILLS, rng.randint(1, 8)),
+            "validated_skills": {skill: rng.choice(LEVELS) for skill in validated},
+            "created_at": _date(rng, now)
+        }
+        data["users"][uid] = {"email": f"etudiant{index}@example.com", "user_type": "student"}
+
+    for index in range(scale.professionals):
+        uid = _uid(rng)
+        data["professionals"][uid] = {
+            "id": uid, "email": f"pro{index}@example.com",
+            "first_name": f"Prénom{index}", "last_name": f"Nom{index}",
+            "company": f"Entreprise {rng.randrange(scale.companies)}", "position": "Senior",
+            "expertise_domains": rng.sample(DOMAINS, rng.randint(1, 3)),
+            "years_experience": rng.randint(2, 25), "user_type": "professional",
+            "created_at": _date(rng, now)
+        }
+        data["users"][uid] = {"email": f"pro{index}@example.com", "user_type": "professional"}
+
+    for index in range(scale.companies):
+        uid = _uid(rng)
+        data["companies"][uid] = {
+            "id": uid, "email": f"entreprise{index}@example.com", "name": f"Entreprise {index}",
+            "sector": "Numérique", "size": rng.choice(["TPE", "PME", "ETI", "Grande entreprise"]),
+            "description": "Entreprise synthétique", "city": rng.choice(CITIES), "country": "France",
+            "contact_person": f"Contact {index}", "contact_position": "RH", "user_type": "company",
+            "created_at": _date(rng, now)
+        }
+        data["users"][uid] = {"email": f"entreprise{index}@example.com", "user_type": "company"}
+
+    student_ids = list(data["students"])
+    professional_ids = list(data["professionals"])
+    for _ in range(scale.validations):
+        validation_id = _uid(rng)
+        created_at = _date(rng, now)
+        validation = {
+            "id": validation_id, "student_id": rng.choice(student_ids),
+            "skill_name": rng.choice(SKILLS), "level_claimed": rng.choice(LEVELS),
+            "evidence_description": "Projet réalisé en équipe", "status": "en_attente",
+            "created_at": created_at
+        }
+        draw = rng.random()
+        if draw < 0.6:
+            validation.update({
+                "status": "validée", "professional_id": rng.choice(professional_ids),
+                "validated_level": rng.choice(LEVELS), "professional_feedback": "Bon niveau",
+                "validation_date": created_at
+            })
+            if rng.random() < 0.5:
+                validation["rating"] = rng.randint(1, 5)
+        elif draw < 0.7:
+            validation.update({"status": "refusée", "professional_id": rng.choice(professional_ids)})
+        data["skill_validations"][validation_id] = validation
+
+    company_ids = list(data["companies"])
+    for index in range(scale.opportunities):
+        opportunity_id = _uid(rng)
+        required_skills = rng.sample(SKILLS, rng.randint(2, 5))
+        role = rng.choice(ROLES)
+        data["opportunities"][opportunity_id] = {
+            "id": opportunity_id, "title": f"{role} {required_skills[0]}", "company_id": rng.choice(company_ids),
+            "type": rng.choice(OPPORTUNITY_TYPES),
+            "description": f"Mission synthétique n°{index} : {role.lower()} {', '.join(required_skills)}",
+            "required_skills": required_skills,
+            "preferred_skills": rng.sample(SKILLS, rng.randint(0, 3)),
+            "location": rng.choice(CITIES), "remote_possible": rng.random() < 0.4,
+            "applications_count": 0, "views_count": 0, "status": "active",
+            "created_at": _date(rng, now)
+        }
+    return data
+
+
+async def load(data: dict) -> dict:
+    """Écrit le jeu de données via le repository puis construit les index ; retourne les volumes"""
+    for collection, records in data.items():
+        updates = {}
+        for record_id, record in records.items():
+            updates[f"{collection}/{record_id}"] = record
+            if len(updates) >= LOAD_CHUNK_SIZE:
+                await repo.update("", updates)
+                updates = {}
+        if updates:
+            await repo.update("", updates)
+    for name in BACKFILLS:
+        await run_backfill(name)
+    return {collection: len(records) for collection, records in data.items()}
@@ -140,8 +140,15 @@ class SkillValidation(SkillValidationRequest):
     professional_feedback: Optional[str] = None
     validated_level: Optional[CompetenceLevel] = None
     validation_date: Optional[datetime] = None
+    rating: Optional[int] = None
     created_at: datetime
 
+# Modèles catalogue de compétences
+class SkillCatalogEntry(BaseModel):
+    name: str
+    description: str = ""
+    aliases: List[str] = []
+
 # Modèles opportunités
 class OpportunityType(str, Enum):
     STAGE = "stage"
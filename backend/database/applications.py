@@ -0,0 +1,174 @@
+import asyncio
+import os
+
+from database import repository as repo
+from database.pagination import iter_collection, page_newest_first
+
+# Candidatures et leurs index.
+# applications/{application_id} : la candidature complète.
+# applications_by_student/{student_id}/{opportunity_id} : copie complète ; un
+# étudiant candidate une fois par opportunité, la clé sert aussi de contrôle
+# de doublon.
+# applications_by_opportunity/{opportunity_id}/{statut}/{application_id} :
+# copie des champs de la vue entreprise (COMPANY_VIEW_FIELDS), partitionnée
+# par statut : une entreprise pagine les candidatures d'un statut sans lire
+# les autres ni chaque candidature, et un changement de statut déplace
+# l'entrée d'une partition à l'autre.
+# application_counts/{opportunity_id}/{statut} : nombre de candidatures par
+# statut, tenu par incréments serveur dans la même mise à jour multi-chemins.
+
+APPLICATION_BATCH_SIZE = int(os.getenv("APPLICATION_BATCH_SIZE", "500"))
+BACKFILL_CHUNK_SIZE = 500
+
+# Champs servis par /applications/opportunity/{id} (modèle Application)
+COMPANY_VIEW_FIELDS = ("id", "student_id", "opportunity_id", "cover_letter", "additional_documents", "status",
+                       "applied_at", "company_feedback", "interview_date")
+
+
+def _student_path(student_id: str, opportunity_id: str) -> str:
+    return f"applications_by_student/{student_id}/{opportunity_id}"
+
+
+def _opportunity_path(opportunity_id: str, status: str, application_id: str) -> str:
+    return f"applications_by_opportunity/{opportunity_id}/{status}/{application_id}"
+
+
+def application_summary(application: dict) -> dict:
+    """Entrée de la partition de statut : les champs renseignés de la vue entreprise"""
+    return {field: application[field] for field in COMPANY_VIEW_FIELDS if application.get(field) is not None}
+
+
+async def save_application(application: dict):
+    """Enregistre une nouvelle candidature, ses entrées d'index et son décompte"""
+    await repo.update("", {
+        f"applications/{application['id']}": application,
+        _student_path(application['student_id'], application['opportunity_id']): application,
+        _opportunity_path(application['opportunity_id'], application['status'], application['id']):
+            application_summary(application),
+        f"application_counts/{application['opportunity_id']}/{application['status']}": repo.increment(1)
+    })
+
+
+async def get_application(application_id: str):
+    return await repo.get(f"applications/{application_id}")
+
+
+async def get_student_application(student_id: str, opportunity_id: str):
+    """Candidature de l'étudiant à l'opportunité, ou None"""
+    return await repo.get(_student_path(student_id, opportunity_id))
+
+
+async def get_status_entries(opportunity_id: str, status: str) -> dict:
+    """Résumés {application_id: résumé} des candidatures d'un statut"""
+    return await repo.get(f"applications_by_opportunity/{opportunity_id}/{status}") or {}
+
+
+async def get_status_counts(opportunity_id: str) -> dict:
+    return await repo.get(f"application_counts/{opportunity_id}") or {}
+
+
+async def update_application_fields(application: dict, fields: dict):
+    """Écrit `fields` sur la candidature et ses copies (étudiant, partition de statut), sans changer de statut"""
+    student_path = _student_path(application['student_id'], application['opportunity_id'])
+    opportunity_path = _opportunity_path(application['opportunity_id'], application['status'], application['id'])
+    updates = {}
+    for field, value in fields.items():
+        updates[f"applications/{application['id']}/{field}"] = value
+        updates[f"{student_path}/{field}"] = value
+        if field in COMPANY_VIEW_FIELDS:
+            updates[f"{opportunity_path}/{field}"] = value
+    await repo.update("", updates)
+
+
+async def update_application_status(opportunity_id: str, from_status: str, entries: dict,
+                                    to_status: str, fields: dict = None) -> int:
+    """Passe les candidatures `entries` ({application_id: résumé}) de `from_status` à `to_status`
+
+    Une mise à jour multi-chemins par lot de APPLICATION_BATCH_SIZE candidatures :
+    candidature, copie de l'étudiant, partition de statut et décomptes.
+    `fields` (commentaire, entretien...) est écrit sur chaque candidature.
+    Retourne le nombre de candidatures déplacées.
+    """
+    if from_status == to_status:
+        # Les incréments -N et +N porteraient sur le même décompte : seul +N serait écrit
+        raise ValueError("Statuts de départ et d'arrivée identiques")
+    items = list(entries.items())
+    for start in range(0, len(items), APPLICATION_BATCH_SIZE):
+        batch = items[start:start + APPLICATION_BATCH_SIZE]
+        updates = {
+            f"application_counts/{opportunity_id}/{from_status}": repo.increment(-len(batch)),
+            f"application_counts/{opportunity_id}/{to_status}": repo.increment(len(batch))
+        }
+        changes = {**(fields or {}), "status": to_status}
+        for application_id, summary in batch:
+            student_path = _student_path(summary['student_id'], opportunity_id)
+            for field, value in changes.items():
+                updates[f"applications/{application_id}/{field}"] = value
+                updates[f"{student_path}/{field}"] = value
+            updates[_opportunity_path(opportunity_id, from_status, application_id)] = None
+            updates[_opportunity_path(opportunity_id, to_status, application_id)] = {
+                **summary, **{field: value for field, value in changes.items() if field in COMPANY_VIEW_FIELDS}
+            }
+        await repo.update("", updates)
+    return len(items)
+
+
+async def list_opportunity_applications(opportunity_id: str, status: str, limit: int, cursor: str = None):
+    """Page des candidatures d'un statut, plus récentes en premier ; retourne (candidatures, curseur suivant)
+
+    Servie depuis la partition de statut, sans lecture par candidature ; seules
+    les entrées écrites avant COMPANY_VIEW_FIELDS (résumé {student_id,
+    applied_at}, jusqu'à python manage.py backfill-applications-index) sont
+    relues en entier.
+    """
+    entries, next_cursor = await page_newest_first(
+        f"applications_by_opportunity/{opportunity_id}/{status}", limit, cursor, field='applied_at'
+    )
+    legacy = [application_id for application_id, entry in entries.items() if 'cover_letter' not in entry]
+    if legacy:
+        full = await asyncio.gather(*(get_application(application_id) for application_id in legacy))
+        entries.update({application_id: application for application_id, application in zip(legacy, full)})
+    applications = []
+    for application_id, entry in entries.items():
+        if entry:
+            entry.setdefault('id', application_id)
+            applications.append(entry)
+    return applications, next_cursor
+
+
+async def list_student_applications(student_id: str, limit: int, cursor: str = None):
+    """Page des candidatures de l'étudiant, plus récentes en premier ; retourne (candidatures, curseur suivant)"""
+    entries, next_cursor = await page_newest_first(
+        f"applications_by_student/{student_id}", limit, cursor, field='applied_at'
+    )
+    return list(entries.values()), next_cursor
+
+
+async def backfill_indexes() -> int:
+    """Reconstruit les index, les décomptes par statut et applications_count à partir de applications"""
+    await repo.remove("applications_by_student")
+    await repo.remove("applications_by_opportunity")
+    await repo.remove("application_counts")
+    counts, updates, total = {}, {}, 0
+    async for application_id, application in iter_collection("applications", page_size=BACKFILL_CHUNK_SIZE):
+        if not (isinstance(application, dict) and application.get('student_id') and application.get('opportunity_id')):
+            continue
+        total += 1
+        application['id'] = application_id
+        opportunity_id, status = application['opportunity_id'], application.get('status', 'envoyée')
+        updates[_student_path(application['student_id'], opportunity_id)] = application
+        updates[_opportunity_path(opportunity_id, status, application_id)] = application_summary(application)
+        by_status = counts.setdefault(opportunity_id, {})
+        by_status[status] = by_status.get(status, 0) + 1
+        if len(updates) >= BACKFILL_CHUNK_SIZE:
+            await repo.update("", updates)
+            updates = {}
+    for opportunity_id, by_status in counts.items():
+        updates[f"application_counts/{opportunity_id}"] = by_status
+        updates[f"opportunities/{opportunity_id}/applications_count"] = sum(by_status.values())
+        if len(updates) >= BACKFILL_CHUNK_SIZE:
+            await repo.update("", updates)
+            updates = {}
+    if updates:
+        await repo.update("", updates)
+    return total
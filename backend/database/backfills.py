@@ -0,0 +1,53 @@
+import os
+from datetime import datetime
+
+from database import repository as repo
+from database.applications import backfill_indexes as backfill_application_indexes
+from database.notifications import backfill_user_index
+from database.opportunities import backfill_company_index
+from database.professional_stats import rebuild_stats
+from database.validations import backfill_indexes as backfill_validation_indexes
+
+# Reconstructions des index dérivés (copies, index par utilisateur, décomptes).
+# backfills/{nom} = date de la dernière exécution. Au démarrage, le lifespan
+# lance celles qui n'ont jamais tourné sur la base (données antérieures à
+# l'index) ; manage.py les relance à la demande. Chacune reconstruit son
+# index à partir de la collection source et peut être rejouée.
+
+AUTO_BACKFILL = os.getenv("AUTO_BACKFILL", "true").lower() == "true"
+BACKFILLS_PATH = "backfills"
+
+BACKFILLS = {
+    "validations": backfill_validation_indexes,
+    "opportunities": backfill_company_index,
+    "notifications": backfill_user_index,
+    "professional_stats": rebuild_stats,
+    "applications": backfill_application_indexes,
+}
+
+# Révision des reconstructions dont le format d'index a changé : relancées au
+# démarrage sur les bases où seule une révision antérieure a tourné
+# (applications 2 : résumés de la vue entreprise dans applications_by_opportunity).
+BACKFILL_REVISIONS = {"applications": 2}
+
+
+def _record_name(name: str) -> str:
+    revision = BACKFILL_REVISIONS.get(name, 1)
+    return name if revision == 1 else f"{name}_v{revision}"
+
+
+async def run_backfill(name: str) -> int:
+    """Exécute la reconstruction `name` et la note comme faite ; retourne le nombre d'éléments traités"""
+    count = await BACKFILLS[name]()
+    await repo.set(f"{BACKFILLS_PATH}/{_record_name(name)}", datetime.now().isoformat())
+    return count
+
+
+async def run_pending_backfills() -> list:
+    """Exécute les reconstructions jamais faites sur cette base ; retourne leurs noms"""
+    done = await repo.get(BACKFILLS_PATH) or {}
+    pending = [name for name in BACKFILLS if _record_name(name) not in done]
+    for name in pending:
+        count = await run_backfill(name)
+        print(f"Index reconstruit au démarrage : {name} ({count} éléments)")
+    return pending
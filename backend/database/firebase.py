@@ -1,12 +1,20 @@
-import firebase_admin
-from firebase_admin import credentials
 import json
-import pyrebase
 import os
+import threading
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Les SDK (firebase_admin, pyrebase) et leurs clients ne sont plus créés à
+# l'import : ils sont importés et initialisés au premier usage, ou par le
+# lifespan de l'application (init_firebase). Importer ce module ne lit aucun
+# fichier de configuration et ne nécessite pas d'identifiants.
+# Les anciens attributs (db, authUser, firebase, firebase_config_json,
+# service_account_key_json) restent accessibles via __getattr__.
+
+_lock = threading.RLock()
+_clients = {}
+
 def get_firebase_config():
     """Get Firebase configuration from file or environment variables"""
     try:
@@ -42,21 +50,74 @@ def get_service_account():
             raise ValueError("Missing FIREBASE_SERVICE_ACCOUNT environment variable")
         return json.loads(service_account_json)
 
-# Get configurations
-firebase_config_json = get_firebase_config()
-service_account_key_json = get_service_account()
+def _cached(name: str, factory):
+    # Création unique, y compris depuis les threads du threadpool
+    if name not in _clients:
+        with _lock:
+            if name not in _clients:
+                _clients[name] = factory()
+    return _clients[name]
+
+def firebase_config() -> dict:
+    """Configuration Firebase (lue au premier appel)"""
+    return _cached("config", get_firebase_config)
+
+def service_account() -> dict:
+    """Compte de service Firebase (lu au premier appel)"""
+    return _cached("service_account", get_service_account)
+
+def _init_admin_app():
+    import firebase_admin
+    from firebase_admin import credentials
+
+    # Initialize the app with a service account
+    if not firebase_admin._apps:
+        firebase_admin.initialize_app(credentials.Certificate(service_account()))
+    return firebase_admin.get_app()
+
+def get_admin_app():
+    """Application firebase_admin (initialisée au premier appel)"""
+    return _cached("admin_app", _init_admin_app)
 
-# Initialize the app with a service account
-if not firebase_admin._apps:
-    cred = credentials.Certificate(service_account_key_json)
-    firebase_admin.initialize_app(cred)
+def get_admin_auth():
+    """Module firebase_admin.auth, avec l'application initialisée"""
+    get_admin_app()
+    from firebase_admin import auth
+    return auth
 
-# Initialize Firebase with configuration
-firebase = pyrebase.initialize_app(firebase_config_json)
+def get_pyrebase_app():
+    """Application pyrebase (initialisée au premier appel)"""
+    def factory():
+        import pyrebase
+        return pyrebase.initialize_app(firebase_config())
+    return _cached("pyrebase", factory)
 
-# Get database and auth instances
-db = firebase.database()
-authUser = firebase.auth()
+def get_db():
+    """Client base de données pyrebase"""
+    return _cached("db", lambda: get_pyrebase_app().database())
+
+def get_auth_user():
+    """Client d'authentification pyrebase (connexion email / mot de passe)"""
+    return _cached("auth_user", lambda: get_pyrebase_app().auth())
+
+def init_firebase():
+    """Initialise les clients Firebase (appelé par le lifespan, bloquant)"""
+    get_admin_app()
+    get_auth_user()
+
+_LAZY_ATTRIBUTES = {
+    "firebase_config_json": firebase_config,
+    "service_account_key_json": service_account,
+    "firebase": get_pyrebase_app,
+    "db": get_db,
+    "authUser": get_auth_user,
+}
+
+def __getattr__(name):
+    # Compatibilité : `from database.firebase import db` crée le client à ce moment
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Helper functions for StudyConnect specific operations
 def init_studyconnect_collections():
@@ -77,40 +138,51 @@ def init_studyconnect_collections():
         
         for collection in collections:
             # Check if collection exists, if not create empty structure
-            existing = db.child(collection).get().val()
+            existing = get_db().child(collection).get().val()
             if not existing:
-                db.child(collection).set({})
+                get_db().child(collection).set({})
                 print(f"Initialized {collection} collection")
         
         # Initialize skills catalog with common skills
         skills_catalog = {
             "programming": {
-                "python": {"category": "programming", "description": "Python programming language"},
-                "javascript": {"category": "programming", "description": "JavaScript programming language"},
-                "java": {"category": "programming", "description": "Java programming language"},
-                "react": {"category": "frontend", "description": "React.js framework"},
-                "nodejs": {"category": "backend", "description": "Node.js runtime"}
+                "python": {"category": "programming", "name": "Python", "description": "Python programming language",
+                           "aliases": ["py", "python3"]},
+                "javascript": {"category": "programming", "name": "JavaScript", "description": "JavaScript programming language",
+                               "aliases": ["js", "ecmascript"]},
+                "java": {"category": "programming", "name": "Java", "description": "Java programming language"},
+                "react": {"category": "frontend", "name": "React", "description": "React.js framework",
+                          "aliases": ["react.js", "reactjs"]},
+                "nodejs": {"category": "backend", "name": "Node.js", "description": "Node.js runtime",
+                           "aliases": ["node"]}
             },
             "design": {
-                "photoshop": {"category": "design", "description": "Adobe Photoshop"},
-                "figma": {"category": "design", "description": "Figma design tool"},
-                "ui_ux": {"category": "design", "description": "UI/UX Design"}
+                "photoshop": {"category": "design", "name": "Photoshop", "description": "Adobe Photoshop",
+                              "aliases": ["adobe photoshop"]},
+                "figma": {"category": "design", "name": "Figma", "description": "Figma design tool"},
+                "ui_ux": {"category": "design", "name": "UI/UX Design", "description": "UI/UX Design",
+                          "aliases": ["ui", "ux", "ux design", "ui design"]}
             },
             "marketing": {
-                "digital_marketing": {"category": "marketing", "description": "Digital Marketing"},
-                "seo": {"category": "marketing", "description": "Search Engine Optimization"},
-                "social_media": {"category": "marketing", "description": "Social Media Marketing"}
+                "digital_marketing": {"category": "marketing", "name": "Digital Marketing", "description": "Digital Marketing",
+                                      "aliases": ["marketing digital"]},
+                "seo": {"category": "marketing", "name": "SEO", "description": "Search Engine Optimization",
+                        "aliases": ["référencement naturel"]},
+                "social_media": {"category": "marketing", "name": "Social Media", "description": "Social Media Marketing",
+                                 "aliases": ["réseaux sociaux"]}
             },
             "business": {
-                "project_management": {"category": "business", "description": "Project Management"},
-                "data_analysis": {"category": "business", "description": "Data Analysis"},
-                "communication": {"category": "business", "description": "Communication Skills"}
+                "project_management": {"category": "business", "name": "Project Management", "description": "Project Management",
+                                       "aliases": ["gestion de projet"]},
+                "data_analysis": {"category": "business", "name": "Data Analysis", "description": "Data Analysis",
+                                  "aliases": ["analyse de données"]},
+                "communication": {"category": "business", "name": "Communication", "description": "Communication Skills"}
             }
         }
         
-        existing_skills = db.child("skills_catalog").get().val()
+        existing_skills = get_db().child("skills_catalog").get().val()
         if not existing_skills:
-            db.child("skills_catalog").set(skills_catalog)
+            get_db().child("skills_catalog").set(skills_catalog)
             print("Initialized skills catalog")
             
         print("StudyConnect collections initialized successfully!")
@@ -132,64 +204,12 @@ def get_user_by_type(user_id: str, user_type: str):
             return None
             
         collection = collection_map[user_type]
-        user_data = db.child(collection).child(user_id).get().val()
+        user_data = get_db().child(collection).child(user_id).get().val()
         return user_data
         
     except Exception as e:
         print(f"Error getting user data: {str(e)}")
         return None
 
-def create_notification(user_id: str, notification_type: str, message: str, data: dict = None):
-    """Create a notification for a user"""
-    try:
-        import uuid
-        from datetime import datetime
-        
-        notification_id = str(uuid.uuid4())
-        notification_data = {
-            "id": notification_id,
-            "user_id": user_id,
-            "type": notification_type,
-            "message": message,
-            "data": data or {},
-            "read": False,
-            "created_at": datetime.now().isoformat()
-        }
-        
-        db.child("notifications").child(notification_id).set(notification_data)
-        return notification_id
-        
-    except Exception as e:
-        print(f"Error creating notification: {str(e)}")
-        return None
-
-def get_user_notifications(user_id: str, unread_only: bool = False):
-    """Get notifications for a user"""
-    try:
-        all_notifications = db.child("notifications").order_by_child("user_id").equal_to(user_id).get().val() or {}
-        
-        notifications = []
-        for notif_id, notif_data in all_notifications.items():
-            if unread_only and notif_data.get("read", False):
-                continue
-            notifications.append(notif_data)
-        
-        # Sort by creation date (newest first)
-        notifications.sort(key=lambda x: x.get("created_at", ""), reverse=True)
-        return notifications
-        
-    except Exception as e:
-        print(f"Error getting notifications: {str(e)}")
-        return []
-
-def mark_notification_as_read(notification_id: str):
-    """Mark a notification as read"""
-    try:
-        db.child("notifications").child(notification_id).update({"read": True})
-        return True
-    except Exception as e:
-        print(f"Error marking notification as read: {str(e)}")
-        return False
-
 # Initialize collections on import (optional - can be called manually)
 # init_studyconnect_collections()
@@ -0,0 +1,155 @@
+import asyncio
+import json
+import os
+import time
+from datetime import date, datetime
+
+import httpx
+
+# Client REST asynchrone pour la Realtime Database.
+# Remplace les appels bloquants de pyrebase dans les routes `async def` :
+# un pool de connexions keep-alive partagé, un plafond de requêtes simultanées
+# et des timeouts configurables.
+#
+# Les requêtes triées (orderBy sur un champ) exigent une règle .indexOn sur
+# le nœud interrogé : database.rules.json, déployé avec
+# `firebase deploy --only database` (tests/test_database_rules.py vérifie
+# que chaque champ trié par le code y figure).
+
+DB_MAX_CONCURRENCY = int(os.getenv("DB_MAX_CONCURRENCY", "50"))
+DB_MAX_KEEPALIVE = int(os.getenv("DB_MAX_KEEPALIVE", "20"))
+DB_CONNECT_TIMEOUT = float(os.getenv("DB_CONNECT_TIMEOUT", "5"))
+DB_READ_TIMEOUT = float(os.getenv("DB_READ_TIMEOUT", "15"))
+
+# Marge avant expiration pour renouveler le jeton d'accès OAuth2
+TOKEN_REFRESH_MARGIN = 60
+
+
+def _admin_access_token():
+    """Jeton OAuth2 du compte de service (appel bloquant, à exécuter dans un thread)"""
+    from database.firebase import get_admin_app
+
+    token_info = get_admin_app().credential.get_access_token()
+    return token_info.access_token, token_info.expiry.timestamp()
+
+
+class FirebaseRestClient:
+    """Accès asynchrone à la Realtime Database via son API REST"""
+
+    def __init__(self, database_url: str, token_provider=_admin_access_token, transport=None):
+        self.database_url = database_url.rstrip('/')
+        self._token_provider = token_provider
+        self._transport = transport
+        self._client = None
+        self._semaphore = asyncio.Semaphore(DB_MAX_CONCURRENCY)
+        self._token = None
+        self._token_expiry = 0.0
+        self._token_lock = asyncio.Lock()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=DB_MAX_CONCURRENCY,
+                    max_keepalive_connections=DB_MAX_KEEPALIVE
+                ),
+                timeout=httpx.Timeout(DB_READ_TIMEOUT, connect=DB_CONNECT_TIMEOUT),
+                transport=self._transport
+            )
+        return self._client
+
+    async def _access_token(self):
+        if self._token_provider is None:
+            return None
+        if self._token and time.time() < self._token_expiry - TOKEN_REFRESH_MARGIN:
+            return self._token
+        async with self._token_lock:
+            if not self._token or time.time() >= self._token_expiry - TOKEN_REFRESH_MARGIN:
+                self._token, self._token_expiry = await asyncio.to_thread(self._token_provider)
+        return self._token
+
+    def _url(self, path: str) -> str:
+        path = path.strip('/')
+        return f"{self.database_url}/{path}.json" if path else f"{self.database_url}/.json"
+
+    async def _request(self, method: str, path: str, params: dict = None, body=None):
+        params = dict(params or {})
+        token = await self._access_token()
+        if token:
+            params['access_token'] = token
+        content = json.dumps(body, default=_json_default) if body is not None else None
+        async with self._semaphore:
+            response = await self._get_client().request(
+                method, self._url(path), params=params, content=content
+            )
+        response.raise_for_status()
+        return response.json() if response.content else None
+
+    async def get(self, path: str):
+        return await self._request('GET', path)
+
+    async def set(self, path: str, value):
+        return await self._request('PUT', path, body=value)
+
+    async def update(self, path: str, data: dict):
+        return await self._request('PATCH', path, body=data)
+
+    async def remove(self, path: str):
+        await self._request('DELETE', path)
+
+    async def query(self, path: str, order_by: str = None, equal_to=None, start_at=None,
+                    end_at=None, limit_to_first: int = None, limit_to_last: int = None) -> dict:
+        params = {}
+        if order_by is not None:
+            params['orderBy'] = json.dumps(order_by)
+        for name, value in (('equalTo', equal_to), ('startAt', start_at), ('endAt', end_at)):
+            if value is not None:
+                params[name] = json.dumps(value)
+        if limit_to_first is not None:
+            params['limitToFirst'] = limit_to_first
+        if limit_to_last is not None:
+            params['limitToLast'] = limit_to_last
+        result = await self._request('GET', path, params=params) or {}
+        # L'API REST ne garantit pas l'ordre des clés : on le rétablit comme pyrebase
+        if order_by in (None, '$key'):
+            return dict(sorted(result.items()))
+        if order_by == '$value':
+            return dict(sorted(result.items(), key=lambda item: (_sort_key(item[1]), item[0])))
+        return dict(sorted(
+            result.items(),
+            key=lambda item: (_sort_key(_child(item[1], order_by)), item[0])
+        ))
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Type non sérialisable : {type(value).__name__}")
+
+
+def _child(value, path: str):
+    for part in path.split('/'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _sort_key(value):
+    # Ordre de tri de la Realtime Database : null, false, true, nombres, chaînes, objets
+    if value is None:
+        return (0, 0)
+    if value is False:
+        return (1, 0)
+    if value is True:
+        return (2, 0)
+    if isinstance(value, (int, float)):
+        return (3, value)
+    if isinstance(value, str):
+        return (4, value)
+    return (5, 0)
@@ -0,0 +1,65 @@
+import time
+
+from database.tracing import current_trace, payload_size
+from services.metrics import metrics
+
+# Enveloppe d'instrumentation du moteur de stockage.
+# Chaque appel du repository est chronométré et compté par opération et par
+# collection (premier segment du chemin ; pour une mise à jour multi-chemins
+# à la racine, la collection commune aux clés ou "(multi)"). Pendant une
+# requête HTTP tracée, l'appel est aussi ajouté à la trace de la requête
+# (database/tracing.py), avec la taille des données envoyées et reçues.
+
+ROOT_COLLECTION = "(root)"
+MULTI_COLLECTION = "(multi)"
+
+
+def collection_of(path: str, data=None) -> str:
+    path = path.strip("/")
+    if path:
+        return path.split("/", 1)[0]
+    if isinstance(data, dict) and data:
+        collections = {key.strip("/").split("/", 1)[0] for key in data}
+        return collections.pop() if len(collections) == 1 else MULTI_COLLECTION
+    return ROOT_COLLECTION
+
+
+class InstrumentedBackend:
+    """Moteur de stockage mesuré : délègue chaque appel au moteur enveloppé"""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    async def _call(self, operation: str, path: str, call, collection: str, payload=None):
+        trace = current_trace()
+        start = time.perf_counter()
+        failed = True
+        result = None
+        try:
+            result = await call
+            failed = False
+            return result
+        finally:
+            duration = time.perf_counter() - start
+            metrics.observe_db_call(operation, collection, duration, failed)
+            if trace is not None:
+                trace.record(operation, path, payload_size(payload), payload_size(result), duration)
+
+    async def get(self, path: str):
+        return await self._call("get", path, self.backend.get(path), collection_of(path))
+
+    async def set(self, path: str, value):
+        return await self._call("set", path, self.backend.set(path, value), collection_of(path), value)
+
+    async def update(self, path: str, data: dict):
+        return await self._call("update", path, self.backend.update(path, data),
+                                collection_of(path, data), data)
+
+    async def remove(self, path: str):
+        return await self._call("remove", path, self.backend.remove(path), collection_of(path))
+
+    async def query(self, path: str, **kwargs):
+        return await self._call("query", path, self.backend.query(path, **kwargs), collection_of(path))
+
+    async def close(self):
+        await self.backend.close()
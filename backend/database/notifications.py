@@ -0,0 +1,159 @@
+import json
+import os
+import uuid
+from datetime import datetime
+
+from database import repository as repo
+from database.pagination import InvalidCursor, page_limit, page_newest_first
+
+# Notifications utilisateurs.
+# Les envois groupés passent par une seule mise à jour multi-chemins par lot,
+# découpée pour rester sous les limites de taille d'une écriture.
+# notifications_by_user/{uid}/{notification_id} est une copie de la
+# notification adressée via user_id (seul `read` change ensuite, écrit aux
+# deux endroits) : une page se lit en une seule requête sur l'index.
+# Un envoi identifié par une clé (ex : "skill_validation_request:{id}") donne
+# à chaque notification un identifiant déterministe (clé, destinataire) :
+# rejouer l'envoi après un échec partiel (nouvelle tentative de la file de
+# tâches) réécrit les mêmes notifications au lieu d'en créer des doublons.
+# Un lot en échec n'interrompt pas l'envoi : ses destinataires sont marqués
+# None dans le résultat, et require_delivered lève une erreur pour que la
+# tâche soit retentée.
+
+NOTIFICATION_BATCH_SIZE = int(os.getenv("NOTIFICATION_BATCH_SIZE", "500"))
+NOTIFICATION_BATCH_BYTES = int(os.getenv("NOTIFICATION_BATCH_BYTES", str(1024 * 1024)))
+
+_NOTIFICATION_NAMESPACE = uuid.UUID("9b0c3f52-6e1d-4a8b-b7e2-41d5c8a0f3e6")
+
+
+class NotificationDeliveryError(Exception):
+    pass
+
+
+def notification_id(key: str = None, recipient_id: str = None) -> str:
+    """Identifiant déterministe pour (clé d'envoi, destinataire), aléatoire sans clé"""
+    if key is None:
+        return str(uuid.uuid4())
+    return str(uuid.uuid5(_NOTIFICATION_NAMESPACE, f"{key}:{recipient_id}"))
+
+
+def build_notification(recipient_id: str, notification_type: str, message: str, data: dict = None,
+                       recipient_field: str = "user_id", fields: dict = None, key: str = None) -> dict:
+    notification = {
+        "id": notification_id(key, recipient_id),
+        recipient_field: recipient_id,
+        "type": notification_type,
+        "message": message,
+        "data": data or {},
+        "read": False,
+        "created_at": datetime.now().isoformat()
+    }
+    notification.update(fields or {})
+    return notification
+
+
+async def _write_batch(batch: dict, recipients: list, results: dict):
+    try:
+        await repo.update("", batch)
+        for recipient_id, written_id in recipients:
+            results[recipient_id] = written_id
+    except Exception as e:
+        print(f"Error creating notifications batch: {str(e)}")
+        for recipient_id, _ in recipients:
+            results[recipient_id] = None
+
+
+def require_delivered(results: dict) -> int:
+    """Nombre de notifications écrites ; lève NotificationDeliveryError si un destinataire a échoué"""
+    failed = [recipient_id for recipient_id, written_id in results.items() if written_id is None]
+    if failed:
+        raise NotificationDeliveryError(f"{len(failed)} notifications sur {len(results)} non écrites")
+    return len(results)
+
+
+async def create_notifications(recipient_ids, notification_type: str, message: str, data: dict = None,
+                               recipient_field: str = "user_id", fields: dict = None,
+                               data_by_recipient: dict = None, key: str = None) -> dict:
+    """Crée une notification par destinataire ; retourne {destinataire: id ou None si échec}
+
+    `data_by_recipient` remplace `data` pour les destinataires qu'il contient.
+    `key` identifie l'envoi : les identifiants sont alors déterministes et
+    l'envoi peut être rejoué sans doublon.
+    """
+    results = {}
+    batch, batch_recipients, batch_bytes = {}, [], 0
+    for recipient_id in recipient_ids:
+        recipient_data = data_by_recipient.get(recipient_id, data) if data_by_recipient else data
+        notification = build_notification(
+            recipient_id, notification_type, message, recipient_data, recipient_field, fields, key
+        )
+        size = len(json.dumps(notification))
+        if batch and (len(batch) >= NOTIFICATION_BATCH_SIZE
+                      or batch_bytes + size > NOTIFICATION_BATCH_BYTES):
+            await _write_batch(batch, batch_recipients, results)
+            batch, batch_recipients, batch_bytes = {}, [], 0
+        batch[f"notifications/{notification['id']}"] = notification
+        if recipient_field == "user_id":
+            batch[f"notifications_by_user/{recipient_id}/{notification['id']}"] = notification
+        batch_recipients.append((recipient_id, notification['id']))
+        batch_bytes += size
+    if batch:
+        await _write_batch(batch, batch_recipients, results)
+    return results
+
+
+async def create_notification(user_id: str, notification_type: str, message: str, data: dict = None):
+    """Create a notification for a user"""
+    results = await create_notifications([user_id], notification_type, message, data)
+    return results.get(user_id)
+
+
+async def get_user_notifications(user_id: str, unread_only: bool = False,
+                                 limit: int = None, cursor: str = None):
+    """Get notifications for a user (newest first; all, or a page with limit/cursor), with the next page cursor"""
+    try:
+        entries, next_cursor = await page_newest_first(
+            f"notifications_by_user/{user_id}", page_limit(limit, cursor), cursor
+        )
+        notifications = [
+            notif_data for notif_data in entries.values()
+            if not (unread_only and notif_data.get("read", False))
+        ]
+        return notifications, next_cursor
+
+    except InvalidCursor:
+        raise
+    except Exception as e:
+        print(f"Error getting notifications: {str(e)}")
+        return [], None
+
+
+async def mark_notification_as_read(notification_id: str):
+    """Mark a notification as read"""
+    try:
+        user_id = await repo.get(f"notifications/{notification_id}/user_id")
+        updates = {f"notifications/{notification_id}/read": True}
+        if user_id:
+            updates[f"notifications_by_user/{user_id}/{notification_id}/read"] = True
+        await repo.update("", updates)
+        return True
+    except Exception as e:
+        print(f"Error marking notification as read: {str(e)}")
+        return False
+
+
+async def backfill_user_index() -> int:
+    """Reconstruit notifications_by_user à partir de notifications"""
+    all_notifications = await repo.get("notifications") or {}
+    await repo.remove("notifications_by_user")
+    updates = {}
+    for notif_id, notif_data in all_notifications.items():
+        if not notif_data.get("user_id"):
+            continue
+        updates[f"notifications_by_user/{notif_data['user_id']}/{notif_id}"] = {"id": notif_id, **notif_data}
+        if len(updates) >= NOTIFICATION_BATCH_SIZE:
+            await repo.update("", updates)
+            updates = {}
+    if updates:
+        await repo.update("", updates)
+    return len(all_notifications)
@@ -0,0 +1,71 @@
+from database import repository as repo
+from database.pagination import iter_collection, page_by_prefix
+from services.index_versions import index_versions
+
+# Opportunités.
+# Chaque opportunité porte company_order = "{company_id}/{id}" (champ indexé) :
+# /companies/opportunities lit une page d'opportunités de l'entreprise par
+# clé croissante en une seule requête ordonnée sur ce champ, sans index
+# séparé ni lecture par opportunité.
+
+BACKFILL_CHUNK_SIZE = 500
+
+
+COMPANY_ORDER_FIELD = "company_order"
+
+
+def company_order(company_id: str, opportunity_id: str) -> str:
+    return f"{company_id}/{opportunity_id}"
+
+
+def _stored(opportunity: dict) -> dict:
+    return {**opportunity, COMPANY_ORDER_FIELD: company_order(opportunity['company_id'], opportunity['id'])}
+
+
+async def save_opportunity(opportunity: dict):
+    """Enregistre une nouvelle opportunité"""
+    await repo.update("", {
+        f"opportunities/{opportunity['id']}": _stored(opportunity),
+        **index_versions.bump("opportunities", ids=[opportunity['id']])
+    })
+
+
+async def save_opportunities(opportunities: list):
+    """Enregistre un lot d'opportunités en une mise à jour multi-chemins"""
+    updates = {}
+    for opportunity in opportunities:
+        updates[f"opportunities/{opportunity['id']}"] = _stored(opportunity)
+    updates.update(index_versions.bump("opportunities", ids=[opportunity['id'] for opportunity in opportunities]))
+    await repo.update("", updates)
+
+
+async def update_opportunity_fields(opportunity_id: str, fields: dict):
+    """Écrit `fields` sur l'opportunité"""
+    updates = {f"opportunities/{opportunity_id}/{field}": value for field, value in fields.items()}
+    updates.update(index_versions.bump("opportunities", ids=[opportunity_id]))
+    await repo.update("", updates)
+
+
+async def list_company_opportunities(company_id: str, limit: int, cursor: str = None):
+    """Page des opportunités de l'entreprise ; retourne (opportunités, curseur suivant)"""
+    entries, next_cursor = await page_by_prefix("opportunities", COMPANY_ORDER_FIELD, company_id, limit, cursor)
+    return list(entries.values()), next_cursor
+
+
+async def backfill_company_index() -> int:
+    """Écrit company_order sur les opportunités qui ne l'ont pas (données antérieures)"""
+    updates, total = {}, 0
+    async for opportunity_id, opportunity in iter_collection("opportunities", page_size=BACKFILL_CHUNK_SIZE):
+        if not (isinstance(opportunity, dict) and opportunity.get('company_id')):
+            continue
+        total += 1
+        expected = company_order(opportunity['company_id'], opportunity_id)
+        if opportunity.get(COMPANY_ORDER_FIELD) != expected:
+            updates[f"opportunities/{opportunity_id}/{COMPANY_ORDER_FIELD}"] = expected
+        if len(updates) >= BACKFILL_CHUNK_SIZE:
+            await repo.update("", updates)
+            updates = {}
+    if updates:
+        await repo.update("", updates)
+    await repo.remove("opportunities_by_company")  # ancien index, remplacé par company_order
+    return total
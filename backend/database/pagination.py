@@ -0,0 +1,199 @@
+import asyncio
+import base64
+import binascii
+import bisect
+import json
+
+from database import repository as repo
+
+# Pagination par curseur opaque.
+# Un curseur encode la position du dernier élément renvoyé (clé, et valeur de
+# tri le cas échéant) : la page suivante repart de cette position par une
+# requête ordonnée (order_by/start_at/limit_to_first sur Firebase, parcours
+# d'index sur SQLite), son coût ne dépend donc pas de la profondeur.
+# Le curseur de la page suivante est renvoyé dans l'en-tête X-Next-Cursor.
+# Sans limit ni curseur, les listes existantes gardent leur comportement
+# historique (liste complète) : les fonctions de page reçoivent limit=None.
+
+PAGE_SIZE_DEFAULT = 50
+PAGE_SIZE_MAX = 200
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(position: dict) -> str:
+    raw = json.dumps(position, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, fields=('k',)):
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        position = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise InvalidCursor(cursor)
+    if not isinstance(position, dict) or any(field not in position for field in fields):
+        raise InvalidCursor(cursor)
+    return position
+
+
+def page_limit(limit: int = None, cursor: str = None):
+    """Taille de page : None (liste complète) sans limit ni curseur, PAGE_SIZE_DEFAULT avec un curseur seul"""
+    if limit is None and not cursor:
+        return None
+    return limit or PAGE_SIZE_DEFAULT
+
+
+def set_next_cursor(response, next_cursor: str):
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+
+async def page_by_key(path: str, limit: int, cursor: str = None):
+    """Page de `path` triée par clé croissante ; retourne ({clé: valeur}, curseur suivant)"""
+    if limit is None:
+        return await repo.query(path, order_by='$key'), None
+    position = decode_cursor(cursor)
+    after = position['k'] if position else None
+    # start_at est inclusif : une entrée de plus pour écarter la dernière clé déjà vue
+    entries = await repo.query(
+        path, order_by='$key', start_at=after,
+        limit_to_first=limit + (2 if after is not None else 1)
+    )
+    entries.pop(after, None)
+    keys = list(entries)
+    page = {key: entries[key] for key in keys[:limit]}
+    next_cursor = encode_cursor({'k': keys[limit - 1]}) if len(keys) > limit else None
+    return page, next_cursor
+
+
+async def page_by_prefix(path: str, field: str, prefix: str, limit: int, cursor: str = None):
+    """Page des entrées de `path` dont `field` vaut "{prefix}/{clé}", par clé croissante
+
+    Une seule requête ordonnée sur `field` (indexé) ; le curseur est celui de
+    page_by_key. Retourne ({clé: valeur}, curseur suivant).
+    """
+    if limit is None:
+        return await repo.query(path, order_by=field, start_at=f"{prefix}/", end_at=f"{prefix}/\uf8ff"), None
+    position = decode_cursor(cursor)
+    after = position['k'] if position else None
+    entries = await repo.query(
+        path, order_by=field, start_at=f"{prefix}/{after or ''}", end_at=f"{prefix}/\uf8ff",
+        limit_to_first=limit + (2 if after is not None else 1)
+    )
+    entries.pop(after, None)
+    keys = list(entries)
+    page = {key: entries[key] for key in keys[:limit]}
+    next_cursor = encode_cursor({'k': keys[limit - 1]}) if len(keys) > limit else None
+    return page, next_cursor
+
+
+async def page_by_key_merged(paths: list, limit: int, cursor: str = None):
+    """Page triée par clé croissante sur plusieurs `paths` aux clés disjointes
+
+    Une requête par chemin (en parallèle), à partir du même curseur ;
+    retourne ({clé: valeur}, curseur suivant).
+    """
+    pages = await asyncio.gather(*(page_by_key(path, limit, cursor) for path in paths))
+    entries = {}
+    for page, _ in pages:
+        entries.update(page)
+    keys = sorted(entries)
+    if limit is None:
+        return {key: entries[key] for key in keys}, None
+    has_more = len(keys) > limit or any(next_cursor for _, next_cursor in pages)
+    page = {key: entries[key] for key in keys[:limit]}
+    next_cursor = encode_cursor({'k': keys[:limit][-1]}) if has_more and page else None
+    return page, next_cursor
+
+
+def _field_value(value, field: str):
+    return (value.get(field) if isinstance(value, dict) else None) or ''
+
+
+async def page_newest_first(path: str, limit: int, cursor: str = None, field: str = 'created_at'):
+    """Page de `path` triée par `field` décroissant (puis clé) ; retourne ({clé: valeur}, curseur suivant)"""
+    if limit is None:
+        entries = await repo.query(path, order_by=field)
+        return dict(reversed(list(entries.items()))), None
+    position = decode_cursor(cursor, ('v', 'k'))
+    window = limit + 1
+    while True:
+        entries = await repo.query(
+            path, order_by=field, end_at=position['v'] if position else None, limit_to_last=window
+        )
+        items = list(reversed(list(entries.items())))
+        if position:
+            # Ex aequo sur `field` : on ne garde que ce qui suit strictement le curseur
+            items = [
+                (key, value) for key, value in items
+                if (_field_value(value, field), key) < (position['v'], position['k'])
+            ]
+        if len(items) > limit or len(entries) < window:
+            break
+        window *= 2
+    page = dict(items[:limit])
+    next_cursor = None
+    if len(items) > limit:
+        last_key, last_value = items[limit - 1]
+        next_cursor = encode_cursor({'v': _field_value(last_value, field), 'k': last_key})
+    return page, next_cursor
+
+
+async def iter_collection(path: str, order_by: str = '$key', start_at=None, page_size: int = 500):
+    """Parcourt `path` par `order_by` croissant (à partir de `start_at`), une page à la fois"""
+    position = None
+    window = page_size
+    while True:
+        entries = await repo.query(
+            path, order_by=order_by, start_at=position[0] if position else start_at,
+            limit_to_first=window + (1 if position else 0)
+        )
+        items = list(entries.items())
+        if position:
+            items = [
+                (key, value) for key, value in items
+                if (_sort_value(key, value, order_by), key) > position
+            ]
+        for key, value in items:
+            yield key, value
+        if len(entries) < window + (1 if position else 0):
+            return
+        if items:
+            last_key, last_value = items[-1]
+            position = (_sort_value(last_key, last_value, order_by), last_key)
+            window = page_size
+        else:
+            # Page entière d'ex aequo déjà vus : on élargit la fenêtre
+            window *= 2
+
+
+def _sort_value(key: str, value, order_by: str):
+    return key if order_by == '$key' else _field_value(value, order_by)
+
+
+def ranked_start(items: list, cursor: str = None, score_field: str = 'match_score') -> int:
+    """Indice du premier élément après le curseur (score, id) dans une liste classée"""
+    position = decode_cursor(cursor, ('s', 'k'))
+    if not position:
+        return 0
+    sort_key = lambda item: (-item[score_field], item.get('id', ''))
+    return bisect.bisect_right(items, (-position['s'], position['k']), key=sort_key)
+
+
+def page_ranked(items: list, limit: int, cursor: str = None, score_field: str = 'match_score'):
+    """Page d'une liste déjà triée par score décroissant puis par id ; retourne (éléments, curseur suivant)"""
+    start = ranked_start(items, cursor, score_field)
+    if limit is None:
+        return items[start:], None
+    page = items[start:start + limit]
+    next_cursor = None
+    if start + limit < len(items):
+        last = page[-1]
+        next_cursor = encode_cursor({'s': last[score_field], 'k': last.get('id', '')})
+    return page, next_cursor
@@ -0,0 +1,110 @@
+import re
+from datetime import datetime
+
+from database import repository as repo
+from database.pagination import iter_collection
+from services.expertise_index import domain_matches, normalize_domain
+
+# Statistiques de validation matérialisées par professionnel.
+# professional_stats/{uid} = {
+#     total_validations, by_month: {"AAAA-MM": n}, by_domain: {domaine: n},
+#     rating_sum, rating_count
+# }
+# Les compteurs sont incrémentés côté serveur (valeurs .sv) dans la même
+# écriture multi-chemins que la validation ou la notation : /validation-stats
+# ne lit qu'un seul nœud, quel que soit l'historique du professionnel.
+
+VALIDATED_STATUS = "validée"
+REBUILD_CHUNK_SIZE = 500
+
+
+def _stats_path(professional_id: str) -> str:
+    return f"professional_stats/{professional_id}"
+
+
+def domain_key(domain: str) -> str:
+    # Les clés de la Realtime Database ne peuvent pas contenir . $ # [ ] /
+    return re.sub(r"[.$#\[\]/]", "_", normalize_domain(domain))
+
+
+def _month(date) -> str:
+    if isinstance(date, datetime):
+        return date.strftime("%Y-%m")
+    return str(date)[:7]
+
+
+def validation_updates(professional_id: str, domains: list, validation_date) -> dict:
+    """Incréments à joindre à l'écriture d'une validation"""
+    base = _stats_path(professional_id)
+    updates = {
+        f"{base}/total_validations": repo.increment(),
+        f"{base}/by_month/{_month(validation_date)}": repo.increment()
+    }
+    for domain in domains:
+        updates[f"{base}/by_domain/{domain_key(domain)}"] = repo.increment()
+    return updates
+
+
+def rating_updates(professional_id: str, rating: int) -> dict:
+    """Incréments à joindre à l'écriture d'une note"""
+    base = _stats_path(professional_id)
+    return {
+        f"{base}/rating_sum": repo.increment(rating),
+        f"{base}/rating_count": repo.increment()
+    }
+
+
+async def get_professional_stats(professional_id: str) -> dict:
+    return await repo.get(_stats_path(professional_id)) or {}
+
+
+def summarize(stats: dict, now: datetime = None) -> dict:
+    """Réponse de /validation-stats à partir du nœud matérialisé"""
+    now = now or datetime.now()
+    rating_count = stats.get("rating_count", 0)
+    by_domain = stats.get("by_domain", {})
+    return {
+        "total_validations": stats.get("total_validations", 0),
+        "validations_this_month": stats.get("by_month", {}).get(_month(now), 0),
+        "average_rating": round(stats.get("rating_sum", 0) / rating_count, 2) if rating_count else 0.0,
+        "expertise_domains": [
+            {"domain": domain, "validations": count}
+            for domain, count in sorted(by_domain.items(), key=lambda item: (-item[1], item[0]))
+        ],
+        "validations_by_month": stats.get("by_month", {})
+    }
+
+
+async def rebuild_stats() -> int:
+    """Recalcule professional_stats à partir de skill_validations"""
+    professionals = await repo.get("professionals") or {}
+    stats = {}
+    async for _, validation in iter_collection("skill_validations"):
+        professional_id = (validation or {}).get("professional_id")
+        if not professional_id or validation.get("status") != VALIDATED_STATUS:
+            continue
+        entry = stats.setdefault(professional_id, {
+            "total_validations": 0, "by_month": {}, "by_domain": {}, "rating_sum": 0, "rating_count": 0
+        })
+        entry["total_validations"] += 1
+        month = _month(validation.get("validation_date", ""))
+        if month:
+            entry["by_month"][month] = entry["by_month"].get(month, 0) + 1
+        domains = (professionals.get(professional_id) or {}).get("expertise_domains", [])
+        for key in {domain_key(domain) for domain in domains
+                    if domain_matches(domain, validation.get("skill_name", ""))}:
+            entry["by_domain"][key] = entry["by_domain"].get(key, 0) + 1
+        if validation.get("rating"):
+            entry["rating_sum"] += validation["rating"]
+            entry["rating_count"] += 1
+
+    await repo.remove("professional_stats")
+    updates = {}
+    for professional_id, entry in stats.items():
+        updates[_stats_path(professional_id)] = entry
+        if len(updates) >= REBUILD_CHUNK_SIZE:
+            await repo.update("", updates)
+            updates = {}
+    if updates:
+        await repo.update("", updates)
+    return len(stats)
@@ -0,0 +1,82 @@
+import os
+
+from database.instrumentation import InstrumentedBackend
+
+# Couche d'accès aux données asynchrone utilisée par les routers.
+# Les chemins suivent la structure de la Realtime Database, ex : "students/{uid}".
+# Le moteur est choisi par STORAGE_BACKEND : "firebase" (défaut) ou "sqlite".
+# Il est toujours enveloppé par InstrumentedBackend (métriques par collection).
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "firebase")
+
+_backend = None
+
+
+def create_backend(name: str = STORAGE_BACKEND):
+    """Instancie le moteur de stockage configuré"""
+    if name == "firebase":
+        from database.firebase import firebase_config
+        from database.firebase_rest import FirebaseRestClient
+
+        return FirebaseRestClient(firebase_config()['databaseURL'])
+    if name == "sqlite":
+        from database.sqlite_store import SQLiteStore
+
+        return SQLiteStore()
+    raise ValueError(f"Moteur de stockage inconnu : {name}")
+
+
+def get_backend():
+    """Retourne le moteur partagé (créé au premier appel)"""
+    global _backend
+    if _backend is None:
+        _backend = InstrumentedBackend(create_backend())
+    return _backend
+
+
+def configure(backend):
+    """Remplace le moteur courant (benchmarks, déploiements alternatifs)"""
+    global _backend
+    _backend = InstrumentedBackend(backend)
+
+
+def increment(delta=1) -> dict:
+    """Valeur serveur : incrémente atomiquement la valeur numérique du chemin écrit"""
+    return {".sv": {"increment": delta}}
+
+
+async def get(path: str):
+    """Lit la valeur stockée à `path` (None si absente)"""
+    return await get_backend().get(path)
+
+
+async def set(path: str, value):
+    """Écrit (écrase) la valeur à `path`"""
+    return await get_backend().set(path, value)
+
+
+async def update(path: str, data: dict):
+    """Met à jour les enfants listés dans `data` ; à la racine, accepte des chemins multiples"""
+    return await get_backend().update(path, data)
+
+
+async def remove(path: str):
+    """Supprime la valeur à `path`"""
+    await get_backend().remove(path)
+
+
+async def query(path: str, order_by: str = None, equal_to=None, start_at=None,
+                end_at=None, limit_to_first: int = None, limit_to_last: int = None) -> dict:
+    """Requête filtrée/triée sur une collection, retourne un dict ordonné {clé: valeur}"""
+    return await get_backend().query(
+        path, order_by=order_by, equal_to=equal_to, start_at=start_at,
+        end_at=end_at, limit_to_first=limit_to_first, limit_to_last=limit_to_last
+    )
+
+
+async def close():
+    """Ferme les connexions du moteur (appelé à l'arrêt de l'application)"""
+    global _backend
+    if _backend is not None:
+        await _backend.close()
+        _backend = None
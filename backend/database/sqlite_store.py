@@ -0,0 +1,302 @@
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from database.firebase_rest import _child, _json_default, _sort_key
+
+# Moteur de stockage local (SQLite en mode WAL) exposant la même interface
+# que FirebaseRestClient : chemins "collection/id/...", get/set/update/remove/query.
+#
+# Chaque entrée d'une collection est une ligne (parent, key, data JSON). Les
+# champs filtrés par les routers ont un index secondaire sur json_extract, ce
+# qui transforme les order_by/equal_to en parcours d'index au lieu d'un
+# téléchargement complet de la collection.
+
+SQLITE_PATH = os.getenv("SQLITE_PATH", "studyconnect.db")
+
+# Profondeur à laquelle une entrée devient une ligne (par défaut : collection/id)
+DEFAULT_ROW_DEPTH = 2
+ROW_DEPTH = {
+    "validations_by_student": 3,
+    "pending_by_skill": 3,
+    "notifications_by_user": 3,
+    "applications_by_student": 3,
+    "applications_by_opportunity": 4,
+    "index_changes": 3,
+}
+
+# Champs filtrés par les routers, indexés par collection parente
+INDEXED_FIELDS = ("student_id", "professional_id", "company_id", "user_id", "status", "created_at", "applied_at",
+                  "company_order")
+
+_FIELD_RE = re.compile(r'^[A-Za-z0-9_]+(/[A-Za-z0-9_]+)*$')
+
+
+def _split(path: str) -> list:
+    return [part for part in path.strip('/').split('/') if part]
+
+
+def _row_depth(parts: list) -> int:
+    return ROW_DEPTH.get(parts[0], DEFAULT_ROW_DEPTH) if parts else DEFAULT_ROW_DEPTH
+
+
+def _clean(value):
+    # Comme la Realtime Database : ni valeurs nulles ni objets vides
+    if isinstance(value, dict):
+        cleaned = {}
+        for key, child in value.items():
+            child = _clean(child)
+            if child is not None:
+                cleaned[str(key)] = child
+        return cleaned or None
+    return value
+
+
+def _server_value(value, current):
+    # Valeurs serveur de la Realtime Database : {".sv": {"increment": n}} et {".sv": "timestamp"}
+    if not (isinstance(value, dict) and set(value) == {".sv"}):
+        return value
+    server_value = value[".sv"]
+    if server_value == "timestamp":
+        return int(time.time() * 1000)
+    if isinstance(server_value, dict) and "increment" in server_value:
+        base = current if isinstance(current, (int, float)) and not isinstance(current, bool) else 0
+        return base + server_value["increment"]
+    raise ValueError(f"Valeur serveur non supportée : {server_value}")
+
+
+def _assign(node, parts: list, value):
+    if not parts:
+        return value
+    node = dict(node) if isinstance(node, dict) else {}
+    child = _assign(node.get(parts[0]), parts[1:], value)
+    if child is None:
+        node.pop(parts[0], None)
+    else:
+        node[parts[0]] = child
+    return node or None
+
+
+def _field_expr(order_by: str) -> str:
+    if order_by in (None, '$key'):
+        return "key"
+    if order_by == '$value':
+        return "json_extract(data, '$')"
+    if not _FIELD_RE.match(order_by):
+        raise ValueError(f"Champ de tri invalide : {order_by}")
+    # Même texte que dans CREATE INDEX pour que SQLite utilise l'index
+    return f"json_extract(data, '$.{order_by.replace('/', '.')}')"
+
+
+class SQLiteStore:
+    """Stockage local indexé, interchangeable avec FirebaseRestClient"""
+
+    def __init__(self, path: str = SQLITE_PATH):
+        self.path = path
+        self._shared = path == ':memory:'
+        self._write_lock = threading.Lock()
+        self._local = threading.local()
+        self._readers = []
+        self._writer = self._connect()
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    def _init_schema(self):
+        self._writer.execute("""
+            CREATE TABLE IF NOT EXISTS nodes (
+                parent TEXT NOT NULL,
+                key TEXT NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (parent, key)
+            )
+        """)
+        for field in INDEXED_FIELDS:
+            self._writer.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_nodes_{field} "
+                f"ON nodes (parent, {_field_expr(field)}, key)"
+            )
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+            self._readers.append(conn)
+        return conn
+
+    def _read(self, fn, *args):
+        if self._shared:
+            with self._write_lock:
+                return fn(self._writer, *args)
+        return fn(self._reader(), *args)
+
+    def _write(self, fn, *args):
+        with self._write_lock:
+            self._writer.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self._writer, *args)
+            except Exception:
+                self._writer.execute("ROLLBACK")
+                raise
+            self._writer.execute("COMMIT")
+            return result
+
+    # Opérations synchrones (exécutées dans un thread)
+
+    def _get(self, conn, parts: list):
+        depth = _row_depth(parts)
+        if len(parts) >= depth:
+            row = conn.execute(
+                "SELECT data FROM nodes WHERE parent = ? AND key = ?",
+                ('/'.join(parts[:depth - 1]), parts[depth - 1])
+            ).fetchone()
+            if row is None:
+                return None
+            value = json.loads(row[0])
+            for part in parts[depth:]:
+                if not isinstance(value, dict):
+                    return None
+                value = value.get(part)
+            return value
+
+        prefix = '/'.join(parts)
+        if prefix:
+            rows = conn.execute(
+                "SELECT parent, key, data FROM nodes "
+                "WHERE parent = ? OR (parent >= ? AND parent < ?) ORDER BY parent, key",
+                (prefix, prefix + '/', prefix + '0')
+            )
+        else:
+            rows = conn.execute("SELECT parent, key, data FROM nodes ORDER BY parent, key")
+        result = {}
+        for parent, key, data in rows:
+            node = result
+            for part in _split(parent[len(prefix):]):
+                node = node.setdefault(part, {})
+            node[key] = json.loads(data)
+        return result or None
+
+    def _set(self, conn, parts: list, value):
+        if isinstance(value, dict) and ".sv" in value:
+            value = _server_value(value, self._get(conn, parts))
+        value = _clean(value)
+        depth = _row_depth(parts)
+        if len(parts) >= depth:
+            parent, key = '/'.join(parts[:depth - 1]), parts[depth - 1]
+            if len(parts) > depth:
+                row = conn.execute(
+                    "SELECT data FROM nodes WHERE parent = ? AND key = ?", (parent, key)
+                ).fetchone()
+                value = _assign(json.loads(row[0]) if row else None, parts[depth:], value)
+            if value is None:
+                conn.execute("DELETE FROM nodes WHERE parent = ? AND key = ?", (parent, key))
+            else:
+                conn.execute(
+                    "INSERT OR REPLACE INTO nodes (parent, key, data) VALUES (?, ?, ?)",
+                    (parent, key, json.dumps(value, default=_json_default))
+                )
+            return
+
+        prefix = '/'.join(parts)
+        if prefix:
+            conn.execute(
+                "DELETE FROM nodes WHERE parent = ? OR (parent >= ? AND parent < ?)",
+                (prefix, prefix + '/', prefix + '0')
+            )
+        else:
+            conn.execute("DELETE FROM nodes")
+        if value is None:
+            return
+        if not isinstance(value, dict):
+            raise ValueError(f"Valeur scalaire impossible à stocker en /{prefix}")
+        for key, child in value.items():
+            self._set(conn, parts + [key], child)
+
+    def _update(self, conn, parts: list, data: dict):
+        for key, value in data.items():
+            self._set(conn, parts + _split(key), value)
+
+    def _query(self, conn, parts: list, order_by, equal_to, start_at, end_at,
+               limit_to_first, limit_to_last) -> dict:
+        if len(parts) != _row_depth(parts) - 1:
+            return self._query_in_memory(
+                self._get(conn, parts) or {}, order_by, equal_to, start_at, end_at,
+                limit_to_first, limit_to_last
+            )
+        expr = _field_expr(order_by)
+        where, params = ["parent = ?"], ['/'.join(parts)]
+        for operator, value in (('=', equal_to), ('>=', start_at), ('<=', end_at)):
+            if value is not None:
+                where.append(f"{expr} {operator} ?")
+                params.append(value)
+        order = "key" if expr == "key" else f"{expr}, key"
+        sql = f"SELECT key, data FROM nodes WHERE {' AND '.join(where)}"
+        if limit_to_last is not None:
+            order = "key DESC" if expr == "key" else f"{expr} DESC, key DESC"
+            rows = conn.execute(f"{sql} ORDER BY {order} LIMIT ?", params + [limit_to_last]).fetchall()
+            rows.reverse()
+        elif limit_to_first is not None:
+            rows = conn.execute(f"{sql} ORDER BY {order} LIMIT ?", params + [limit_to_first]).fetchall()
+        else:
+            rows = conn.execute(f"{sql} ORDER BY {order}", params).fetchall()
+        return {key: json.loads(data) for key, data in rows}
+
+    @staticmethod
+    def _query_in_memory(values: dict, order_by, equal_to, start_at, end_at,
+                         limit_to_first, limit_to_last) -> dict:
+        if order_by in (None, '$key'):
+            sort_value = lambda item: item[0]
+        elif order_by == '$value':
+            sort_value = lambda item: item[1]
+        else:
+            sort_value = lambda item: _child(item[1], order_by)
+        items = [
+            item for item in values.items()
+            if (equal_to is None or sort_value(item) == equal_to)
+            and (start_at is None or _sort_key(sort_value(item)) >= _sort_key(start_at))
+            and (end_at is None or _sort_key(sort_value(item)) <= _sort_key(end_at))
+        ]
+        items.sort(key=lambda item: (_sort_key(sort_value(item)), item[0]))
+        if limit_to_first is not None:
+            items = items[:limit_to_first]
+        if limit_to_last is not None:
+            items = items[-limit_to_last:] if limit_to_last else []
+        return dict(items)
+
+    # Interface asynchrone commune aux moteurs
+
+    async def get(self, path: str):
+        return await asyncio.to_thread(self._read, self._get, _split(path))
+
+    async def set(self, path: str, value):
+        await asyncio.to_thread(self._write, self._set, _split(path), value)
+
+    async def update(self, path: str, data: dict):
+        await asyncio.to_thread(self._write, self._update, _split(path), data)
+
+    async def remove(self, path: str):
+        await asyncio.to_thread(self._write, self._set, _split(path), None)
+
+    async def query(self, path: str, order_by: str = None, equal_to=None, start_at=None,
+                    end_at=None, limit_to_first: int = None, limit_to_last: int = None) -> dict:
+        return await asyncio.to_thread(
+            self._read, self._query, _split(path), order_by, equal_to, start_at, end_at,
+            limit_to_first, limit_to_last
+        )
+
+    async def close(self):
+        with self._write_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+            self._writer.execute("PRAGMA optimize")
+            self._writer.close()
@@ -0,0 +1,162 @@
+import json
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from database.firebase_rest import _json_default
+
+# Traçage des appels à la base par requête HTTP.
+# DbTraceMiddleware ouvre une trace dans un ContextVar ; InstrumentedBackend
+# y enregistre chaque appel (opération, chemin, octets envoyés et reçus,
+# durée). En fin de requête, un avertissement est affiché si la requête
+# dépasse DB_TRACE_MAX_CALLS appels, DB_TRACE_MAX_BYTES octets reçus, ou lit
+# une collection entière (N+1, lectures complètes).
+# assert_call_budget vérifie un budget d'appels autour d'un bloc de code.
+
+DB_TRACE_ENABLED = os.getenv("DB_TRACE_ENABLED", "true").lower() == "true"
+DB_TRACE_MAX_CALLS = int(os.getenv("DB_TRACE_MAX_CALLS", "20"))
+DB_TRACE_MAX_BYTES = int(os.getenv("DB_TRACE_MAX_BYTES", str(1024 * 1024)))
+DB_TRACE_WARN_COLLECTION_READS = os.getenv("DB_TRACE_WARN_COLLECTION_READS", "true").lower() == "true"
+# Collections de référence, petites, lues entièrement à dessein
+DB_TRACE_FULL_READ_ALLOWED = set(os.getenv("DB_TRACE_FULL_READ_ALLOWED", "skills_catalog,pending_skills").split(","))
+
+_current_trace = ContextVar("db_trace", default=None)
+_captures = []  # listes recevant les traces terminées (assert_call_budget)
+
+
+@dataclass
+class DbCall:
+    operation: str
+    path: str
+    bytes_sent: int
+    bytes_received: int
+    duration: float
+
+    @property
+    def collection_read(self) -> bool:
+        # Lecture sans filtre d'une collection complète (ou de la racine)
+        path = self.path.strip("/")
+        return self.operation == "get" and "/" not in path and path not in DB_TRACE_FULL_READ_ALLOWED
+
+
+@dataclass
+class RequestTrace:
+    name: str
+    calls: list = field(default_factory=list)
+
+    def record(self, operation: str, path: str, bytes_sent: int, bytes_received: int, duration: float):
+        self.calls.append(DbCall(operation, path, bytes_sent, bytes_received, duration))
+
+    @property
+    def call_count(self) -> int:
+        return len(self.calls)
+
+    @property
+    def bytes_received(self) -> int:
+        return sum(call.bytes_received for call in self.calls)
+
+    @property
+    def bytes_sent(self) -> int:
+        return sum(call.bytes_sent for call in self.calls)
+
+    @property
+    def duration(self) -> float:
+        return sum(call.duration for call in self.calls)
+
+    @property
+    def collection_reads(self) -> list:
+        return [call.path for call in self.calls if call.collection_read]
+
+    def problems(self, max_calls: int = None, max_bytes: int = None, allow_collection_reads: bool = True) -> list:
+        result = []
+        if max_calls is not None and self.call_count > max_calls:
+            result.append(f"{self.call_count} appels (max {max_calls})")
+        if max_bytes is not None and self.bytes_received > max_bytes:
+            result.append(f"{self.bytes_received} octets reçus (max {max_bytes})")
+        if not allow_collection_reads and self.collection_reads:
+            result.append(f"collections lues entièrement : {', '.join(self.collection_reads)}")
+        return result
+
+    def describe(self) -> str:
+        lines = [f"{self.name} : {self.call_count} appels, {self.bytes_received} octets reçus, "
+                 f"{self.duration * 1000:.1f} ms en base"]
+        for call in self.calls:
+            lines.append(f"  {call.operation} /{call.path.strip('/')} "
+                         f"(+{call.bytes_sent} / -{call.bytes_received} octets, {call.duration * 1000:.1f} ms)")
+        return "\n".join(lines)
+
+
+def payload_size(value) -> int:
+    if value is None:
+        return 0
+    return len(json.dumps(value, default=_json_default, separators=(",", ":")).encode())
+
+
+def current_trace():
+    """Trace de la requête en cours (None hors requête ou si le traçage est désactivé)"""
+    return _current_trace.get()
+
+
+@contextmanager
+def trace_calls(name: str):
+    """Enregistre les appels à la base du bloc dans une nouvelle trace"""
+    trace = RequestTrace(name)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+        for capture in list(_captures):
+            capture.append(trace)
+
+
+@contextmanager
+def capture_traces():
+    """Collecte les traces terminées pendant le bloc (y compris celles des requêtes HTTP)"""
+    traces = []
+    _captures.append(traces)
+    try:
+        yield traces
+    finally:
+        _captures.remove(traces)
+
+
+@contextmanager
+def assert_call_budget(max_calls: int = None, max_bytes: int = None, allow_collection_reads: bool = True):
+    """Échoue (AssertionError) si une requête du bloc dépasse le budget d'appels à la base
+
+        with assert_call_budget(max_calls=2, allow_collection_reads=False):
+            client.get("/professionals/validation-stats", headers=headers)
+    """
+    with capture_traces() as traces:
+        with trace_calls("bloc"):
+            yield traces
+    failures = []
+    for trace in traces:
+        problems = trace.problems(max_calls, max_bytes, allow_collection_reads)
+        if problems:
+            failures.append(f"{'; '.join(problems)}\n{trace.describe()}")
+    if failures:
+        raise AssertionError("Budget d'appels à la base dépassé :\n" + "\n".join(failures))
+
+
+def warn_if_over_thresholds(trace: RequestTrace):
+    problems = trace.problems(DB_TRACE_MAX_CALLS, DB_TRACE_MAX_BYTES, not DB_TRACE_WARN_COLLECTION_READS)
+    if problems:
+        print(f"Avertissement base de données ({'; '.join(problems)}) - {trace.describe()}")
+
+
+class DbTraceMiddleware:
+    """Middleware ASGI : une trace des appels à la base par requête HTTP"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not DB_TRACE_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        with trace_calls(f"{scope['method']} {scope['path']}") as trace:
+            await self.app(scope, receive, send)
+        warn_if_over_thresholds(trace)
@@ -0,0 +1,136 @@
+from database import repository as repo
+from database.pagination import page_by_key_merged, page_newest_first
+from services.skills_catalog import escape_skill_key, normalize_skill
+
+# Demandes de validation et leurs index.
+# validations_by_student/{uid}/{validation_id} est une copie de
+# skill_validations/{validation_id}, écrite dans la même mise à jour
+# multi-chemins : /my-validations ne lit que les entrées de l'étudiant.
+# pending_by_skill/{compétence}/{validation_id} ne contient que les demandes
+# en attente, partitionnées par compétence (nom normalisé et échappé, qui ne
+# dépend pas du catalogue : l'entrée est retirée sous la même clé) ;
+# pending_skills/{compétence} = {name, count} recense les compétences
+# ayant des demandes en attente (count tenu par incréments serveur).
+# /pending-validations lit pending_skills, retient les compétences du domaine
+# du professionnel, puis fait une requête par clé sur chacune : le nombre
+# d'appels dépend du nombre de compétences retenues, pas du nombre de
+# demandes en attente des autres domaines.
+
+BACKFILL_CHUNK_SIZE = 500
+PENDING_STATUS = "en_attente"
+
+
+def _index_path(student_id: str, validation_id: str) -> str:
+    return f"validations_by_student/{student_id}/{validation_id}"
+
+
+def _pending_key(skill_name: str) -> str:
+    return escape_skill_key(normalize_skill(skill_name or "")) or "_"
+
+
+def _pending_updates(validation_id: str, skill_name: str, validation) -> dict:
+    """Ajout (validation) ou retrait (None) d'une demande de l'index des demandes en attente"""
+    skill_key = _pending_key(skill_name)
+    updates = {
+        f"pending_by_skill/{skill_key}/{validation_id}": validation,
+        f"pending_skills/{skill_key}/count": repo.increment(1 if validation is not None else -1)
+    }
+    if validation is not None:
+        updates[f"pending_skills/{skill_key}/name"] = skill_name
+    return updates
+
+
+async def save_validation(validation: dict):
+    """Enregistre une nouvelle demande et ses entrées d'index"""
+    updates = {
+        f"skill_validations/{validation['id']}": validation,
+        _index_path(validation['student_id'], validation['id']): validation
+    }
+    if validation.get('status') == PENDING_STATUS:
+        updates.update(_pending_updates(validation['id'], validation['skill_name'], validation))
+    await repo.update("", updates)
+
+
+async def update_validation(validation_id: str, validation: dict, update_data: dict, extra_updates: dict = None):
+    """Applique `update_data` à la demande `validation` (telle que stockée) et à ses entrées d'index
+
+    `extra_updates` (chemins absolus) est écrit dans la même mise à jour multi-chemins.
+    """
+    updates = dict(extra_updates or {})
+    for field, value in update_data.items():
+        updates[f"skill_validations/{validation_id}/{field}"] = value
+        updates[f"{_index_path(validation['student_id'], validation_id)}/{field}"] = value
+    if (validation.get('status') == PENDING_STATUS and 'status' in update_data
+            and update_data['status'] != PENDING_STATUS):
+        updates.update(_pending_updates(validation_id, validation.get('skill_name'), None))
+    await repo.update("", updates)
+
+
+async def delete_validation(validation_id: str, validation: dict):
+    """Supprime la demande `validation` (telle que stockée) et ses entrées d'index"""
+    updates = {
+        f"skill_validations/{validation_id}": None,
+        _index_path(validation['student_id'], validation_id): None
+    }
+    if validation.get('status') == PENDING_STATUS:
+        updates.update(_pending_updates(validation_id, validation.get('skill_name'), None))
+    await repo.update("", updates)
+
+
+async def list_student_validations(student_id: str, limit: int, cursor: str = None):
+    """Page des demandes de l'étudiant, plus récentes en premier ; retourne (demandes, curseur suivant)"""
+    entries, next_cursor = await page_newest_first(
+        f"validations_by_student/{student_id}", limit, cursor
+    )
+    validations = []
+    for validation_id, validation in entries.items():
+        validation['id'] = validation_id
+        validations.append(validation)
+    return validations, next_cursor
+
+
+async def list_pending_validations(matches_skill, limit: int, cursor: str = None):
+    """Page des demandes en attente des compétences retenues par `matches_skill(nom)`, par clé croissante
+
+    Retourne (demandes, curseur suivant).
+    """
+    pending_skills = await repo.get("pending_skills") or {}
+    paths = [
+        f"pending_by_skill/{skill_key}"
+        for skill_key, entry in sorted(pending_skills.items())
+        if isinstance(entry, dict) and entry.get('count', 0) > 0 and matches_skill(entry.get('name') or skill_key)
+    ]
+    if not paths:
+        return [], None
+    entries, next_cursor = await page_by_key_merged(paths, limit, cursor)
+    validations = []
+    for validation_id, validation in entries.items():
+        validation['id'] = validation_id
+        validations.append(validation)
+    return validations, next_cursor
+
+
+async def backfill_indexes() -> int:
+    """Reconstruit validations_by_student et l'index des demandes en attente à partir de skill_validations"""
+    all_validations = await repo.get("skill_validations") or {}
+    await repo.remove("validations_by_student")
+    await repo.remove("pending_by_skill")
+    await repo.remove("pending_skills")
+    await repo.remove("pending_validations")  # ancien index, remplacé par pending_by_skill
+    updates, pending_skills = {}, {}
+    for validation_id, validation in all_validations.items():
+        if validation.get('student_id'):
+            updates[_index_path(validation['student_id'], validation_id)] = validation
+        if validation.get('status') == PENDING_STATUS:
+            skill_key = _pending_key(validation.get('skill_name'))
+            updates[f"pending_by_skill/{skill_key}/{validation_id}"] = validation
+            entry = pending_skills.setdefault(skill_key, {"name": validation.get('skill_name') or skill_key, "count": 0})
+            entry["count"] += 1
+        if len(updates) >= BACKFILL_CHUNK_SIZE:
+            await repo.update("", updates)
+            updates = {}
+    if updates:
+        await repo.update("", updates)
+    if pending_skills:
+        await repo.set("pending_skills", pending_skills)
+    return len(all_validations)
@@ -1,6 +1,9 @@
 # import du framework
-from fastapi import FastAPI, HTTPException
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 
 # Import des routers
 import routers.router_auth
@@ -9,15 +12,100 @@ import routers.router_matching
 import routers.router_students
 import routers.router_professionals
 import routers.router_companies
+import routers.router_admin
+import routers.router_applications
 
 # Documentation
 from documentation.description import api_description
 
+# Accès aux données
+from database import repository
+from database.firebase import init_firebase
+from database.pagination import NEXT_CURSOR_HEADER
+from database.backfills import AUTO_BACKFILL, run_pending_backfills
+from database.tracing import DbTraceMiddleware
+from services.token_cache import token_cache
+from services.expertise_index import apply_professional_changes, load_expertise_index
+from services.job_queue import job_queue
+from services.counters import counters
+from services.student_skill_index import apply_student_changes, load_student_skill_index
+from services.recommender import load_opportunity_matrix, opportunity_matrix
+from services.skills_catalog import load_skills_catalog
+from services.search_index import load_opportunity_search_index, opportunity_search_index
+from services.recommendation_cache import recommendation_cache
+from services.index_versions import index_versions
+from services.http_cache import version_cache
+from services.serialization import default_response_class
+from services.metrics import METRICS_CONTENT_TYPE, MetricsMiddleware, metrics, render
+
+async def load_opportunity_indexes():
+    """Matrice de recommandation et index de recherche, construits sur une seule lecture des opportunités"""
+    try:
+        opportunities = await repository.get("opportunities") or {}
+    except Exception as e:
+        print(f"Erreur lors de la lecture des opportunités: {str(e)}")
+        return
+    await load_opportunity_matrix(opportunities)
+    await load_opportunity_search_index(opportunities)
+
+async def apply_opportunity_changes(opportunity_ids: list):
+    """Relit les opportunités modifiées par une autre instance et les applique aux index"""
+    opportunities = await asyncio.gather(*(
+        repository.get(f"opportunities/{opportunity_id}") for opportunity_id in opportunity_ids
+    ))
+    for opportunity_id, opportunity in zip(opportunity_ids, opportunities):
+        if opportunity:
+            routers.router_matching.on_opportunity_changed(opportunity_id, opportunity)
+        else:
+            opportunity_matrix.remove(opportunity_id)
+            opportunity_search_index.remove(opportunity_id)
+            recommendation_cache.clear()
+
+# Cycle de vie : ressources partagées ouvertes au démarrage, fermées à l'arrêt
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        # SDK Firebase initialisés ici plutôt qu'à l'import des modules
+        await run_in_threadpool(init_firebase)
+    except Exception as e:
+        print(f"Initialisation Firebase différée au premier usage: {str(e)}")
+    if AUTO_BACKFILL:
+        # Index dérivés construits pour les données antérieures à leur création
+        try:
+            await run_pending_backfills()
+        except Exception as e:
+            print(f"Erreur lors de la reconstruction des index: {str(e)}")
+    # Index mis à jour quand une autre instance modifie leurs données : éléments modifiés, sinon rechargement.
+    # Le catalogue d'abord : les index rangés par clé de compétence sont reconstruits après lui.
+    index_versions.register("skills_catalog", load_skills_catalog, load_student_skill_index,
+                            load_opportunity_indexes, recommendation_cache.clear)
+    index_versions.register("opportunities", load_opportunity_indexes, recommendation_cache.clear,
+                            on_changes=[apply_opportunity_changes])
+    index_versions.register("students", load_student_skill_index, recommendation_cache.clear,
+                            on_changes=[apply_student_changes, recommendation_cache.invalidate_many])
+    index_versions.register("professionals", load_expertise_index, on_changes=[apply_professional_changes])
+    await index_versions.sync()
+    # Catalogue d'abord : les index rangent les compétences par clé du catalogue
+    await load_skills_catalog()
+    await load_expertise_index()
+    await load_student_skill_index()
+    await load_opportunity_indexes()
+    await job_queue.start()
+    await counters.start()
+    await index_versions.start()
+    yield
+    await index_versions.stop()
+    await job_queue.stop()
+    await counters.stop()
+    await repository.close()
+
 # Initialisation de l'API
 app = FastAPI(
     title="StudyConnect - Plateforme de Validation et Mise en Relation",
     description=api_description,
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=default_response_class(),
+    lifespan=lifespan
 )
 
 # Configuration CORS
@@ -27,8 +115,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+# Trace des appels à la base par requête (avertissement au-delà des seuils)
+app.add_middleware(DbTraceMiddleware)
+
+# Métriques par route (nombre, statut, latence), exposées sur /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Ajouter les routers dédiés
 app.include_router(routers.router_auth.router)
 app.include_router(routers.router_skills.router)
@@ -36,6 +131,8 @@ app.include_router(routers.router_matching.router)
 app.include_router(routers.router_students.router)
 app.include_router(routers.router_professionals.router)
 app.include_router(routers.router_companies.router)
+app.include_router(routers.router_admin.router)
+app.include_router(routers.router_applications.router)
 
 # Route racine
 @app.get("/")
@@ -50,7 +147,9 @@ async def root():
             "matching": "/matching",
             "students": "/students",
             "professionals": "/professionals",
-            "companies": "/companies"
+            "companies": "/companies",
+            "admin": "/admin",
+            "applications": "/applications"
         }
     }
 
@@ -58,3 +157,24 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "service": "StudyConnect API"}
+
+# Statistiques internes (caches, file de tâches, compteurs)
+@app.get("/stats")
+async def internal_stats():
+    return {
+        "token_cache": token_cache.stats(),
+        "job_queue": job_queue.stats(),
+        "recommendation_cache": recommendation_cache.stats(),
+        "counters": counters.stats(),
+        "version_cache": version_cache.stats(),
+        "index_versions": index_versions.stats()
+    }
+
+# Métriques Prometheus (format texte)
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return Response(content=render(), media_type=METRICS_CONTENT_TYPE)
+
+# Séries par route créées une fois toutes les routes déclarées
+metrics.register_routes(app.routes)
+metrics.register_job_queue(job_queue)
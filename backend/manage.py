@@ -0,0 +1,102 @@
+"""Commandes de maintenance des données StudyConnect.
+
+    python manage.py backfill-validations-index
+    python manage.py backfill-opportunities-index
+    python manage.py backfill-notifications-index
+    python manage.py rebuild-professional-stats
+    python manage.py backfill-applications-index
+    python manage.py canonicalize-skills
+    python manage.py onboard-students eleves.csv --results resultats.csv
+"""
+import argparse
+import asyncio
+
+from database import repository
+from database.backfills import run_backfill
+from services.skills_catalog import canonicalize_stored_skills
+from services.student_onboarding import MODES, ONBOARDING_BATCH_SIZE, ONBOARDING_WORKERS, onboard_students
+
+
+async def backfill_validations_index(args):
+    count = await run_backfill("validations")
+    print(f"Index validations_by_student et pending_by_skill reconstruits ({count} demandes)")
+
+
+async def backfill_opportunities_index(args):
+    count = await run_backfill("opportunities")
+    print(f"Champ company_order des opportunités écrit ({count} opportunités)")
+
+
+async def backfill_notifications_index(args):
+    count = await run_backfill("notifications")
+    print(f"Index notifications_by_user reconstruit ({count} notifications)")
+
+
+async def rebuild_professional_stats(args):
+    count = await run_backfill("professional_stats")
+    print(f"Statistiques professional_stats recalculées ({count} professionnels)")
+
+
+async def backfill_applications_index(args):
+    count = await run_backfill("applications")
+    print(f"Index des candidatures et décomptes par statut reconstruits ({count} candidatures)")
+
+
+async def canonicalize_skills(args):
+    counts = await canonicalize_stored_skills()
+    print(f"Compétences normalisées : {counts['students']} étudiants, {counts['opportunities']} opportunités")
+
+
+async def onboard_students_command(args):
+    totals = await onboard_students(
+        args.csv, args.results, args.progress, batch_size=args.batch_size,
+        workers=args.workers, mode=args.mode, restart=args.restart
+    )
+    print(f"Inscription terminée : {totals['rows_done']} lignes, {totals['created']} étudiants créés, "
+          f"{totals['failed']} en échec (détail dans {args.results})")
+
+
+COMMANDS = {
+    "backfill-validations-index": backfill_validations_index,
+    "backfill-opportunities-index": backfill_opportunities_index,
+    "backfill-notifications-index": backfill_notifications_index,
+    "rebuild-professional-stats": rebuild_professional_stats,
+    "backfill-applications-index": backfill_applications_index,
+    "canonicalize-skills": canonicalize_skills,
+    "onboard-students": onboard_students_command,
+}
+
+
+async def run(args):
+    try:
+        await COMMANDS[args.command](args)
+    finally:
+        await repository.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintenance des données StudyConnect")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("backfill-validations-index",
+                          help="Construit validations_by_student et pending_by_skill")
+    subparsers.add_parser("backfill-opportunities-index",
+                          help="Écrit company_order (\"{company_id}/{id}\") sur les opportunités")
+    subparsers.add_parser("backfill-notifications-index", help="Construit notifications_by_user")
+    subparsers.add_parser("rebuild-professional-stats",
+                          help="Recalcule professional_stats depuis skill_validations")
+    subparsers.add_parser("backfill-applications-index",
+                          help="Construit applications_by_student, applications_by_opportunity et application_counts")
+    subparsers.add_parser("canonicalize-skills",
+                          help="Range validated_skills par clé du catalogue et normalise les compétences des opportunités")
+    onboard = subparsers.add_parser("onboard-students",
+                                    help="Inscrit les étudiants d'un CSV (colonnes de StudentCreate), avec reprise")
+    onboard.add_argument("csv", help="Fichier CSV des étudiants")
+    onboard.add_argument("--results", required=True, help="Fichier CSV de résultat par ligne (complété à la reprise)")
+    onboard.add_argument("--progress", help="Fichier de progression (défaut : <results>.progress.json)")
+    onboard.add_argument("--batch-size", type=int, default=ONBOARDING_BATCH_SIZE)
+    onboard.add_argument("--workers", type=int, default=ONBOARDING_WORKERS,
+                         help="Threads de hachage / création de comptes")
+    onboard.add_argument("--mode", choices=MODES, default="auto",
+                         help="import_users, create_user en parallèle, ou import avec repli (auto)")
+    onboard.add_argument("--restart", action="store_true", help="Ignore la progression enregistrée")
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,135 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from classes.schemas_dto import Opportunity, SkillValidation, Application, SkillCatalogEntry
+from routers.router_auth import get_current_user
+from database import repository as repo
+from database.pagination import iter_collection
+from services.http_cache import version_cache
+from services.index_versions import index_versions
+from services.job_queue import job_queue
+from services.skills_catalog import canonicalize_stored_skills
+from typing import Optional
+import csv
+import io
+import json
+
+router = APIRouter(prefix='/admin', tags=['Administration'])
+
+def _columns(model) -> list:
+    return ['id'] + [field for field in model.model_fields if field != 'id']
+
+# Collections exportables : chemin, champ de date pour `since`, colonnes CSV
+EXPORTS = {
+    "opportunities": ("opportunities", "created_at", _columns(Opportunity)),
+    "validations": ("skill_validations", "created_at", _columns(SkillValidation)),
+    "applications": ("applications", "applied_at", _columns(Application)),
+}
+
+EXPORT_PAGE_SIZE = 500
+
+def _require_admin(current_user: dict):
+    # Claim personnalisé Firebase `admin` ou type d'utilisateur dédié
+    if not (current_user.get('admin') or current_user.get('user_type') == 'admin'):
+        raise HTTPException(status_code=403, detail="Réservé aux administrateurs")
+
+def _csv_cell(value):
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    return "" if value is None else value
+
+async def _export_rows(path: str, date_field: str, since: Optional[str]):
+    # Parcours page par page : la mémoire reste bornée par EXPORT_PAGE_SIZE
+    if since:
+        rows = iter_collection(path, order_by=date_field, start_at=since, page_size=EXPORT_PAGE_SIZE)
+    else:
+        rows = iter_collection(path, page_size=EXPORT_PAGE_SIZE)
+    async for key, row in rows:
+        if isinstance(row, dict):
+            yield {'id': key, **row}
+
+async def _ndjson(rows):
+    async for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + "\n"
+
+async def _csv(rows, columns: list):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for row in rows:
+        writer.writerow([_csv_cell(row.get(column)) for column in columns])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+    yield buffer.getvalue()
+
+@router.get('/export/{collection}')
+async def export_collection(
+    collection: str,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    since: Optional[str] = Query(None, description="Date ISO : n'exporte que les éléments créés depuis"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Export en flux (NDJSON ou CSV) des opportunités, validations ou candidatures"""
+    _require_admin(current_user)
+    if collection not in EXPORTS:
+        raise HTTPException(status_code=404, detail="Collection non exportable")
+
+    path, date_field, columns = EXPORTS[collection]
+    rows = _export_rows(path, date_field, since)
+    if format == "csv":
+        body, media_type = _csv(rows, columns), "text/csv; charset=utf-8"
+    else:
+        body, media_type = _ndjson(rows), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{collection}.{format}"'}
+    )
+
+async def _write_catalog(path: str, value):
+    # Écriture jointe à la version "skills_catalog" : les autres instances rechargent catalogue et index par clé
+    await repo.update("", {path: value, **index_versions.bump("skills_catalog")})
+
+async def _remap_stored_skills():
+    """Clés des validated_skills et noms des opportunités ramenés au catalogue modifié"""
+    updated = await canonicalize_stored_skills()
+    await index_versions.reload(*[name for name, count in updated.items() if count])
+
+async def _catalog_changed():
+    # Catalogue et index rangés par clé (compétences des étudiants, colonnes de la matrice,
+    # recommandations) reconstruits ici ; version HTTP du catalogue invalidée
+    await index_versions.reload("skills_catalog")
+    version_cache.bump("skills_catalog")
+    # Données stockées sous les anciennes clés réécrites en arrière-plan
+    await job_queue.submit(_remap_stored_skills)
+
+@router.put('/skills-catalog/{category}/{skill_key}')
+async def upsert_catalog_skill(
+    category: str,
+    skill_key: str,
+    entry: SkillCatalogEntry,
+    current_user: dict = Depends(get_current_user)
+):
+    """Ajoute ou modifie une compétence du catalogue (nom canonique, alias)"""
+    _require_admin(current_user)
+    try:
+        await _write_catalog(f"skills_catalog/{category}/{skill_key}", {"category": category, **entry.dict()})
+        await _catalog_changed()
+        return {"message": "Compétence du catalogue enregistrée"}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.delete('/skills-catalog/{category}/{skill_key}')
+async def delete_catalog_skill(
+    category: str,
+    skill_key: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Retire une compétence du catalogue"""
+    _require_admin(current_user)
+    try:
+        await _write_catalog(f"skills_catalog/{category}/{skill_key}", None)
+        await _catalog_changed()
+        return {"message": "Compétence retirée du catalogue"}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,222 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from classes.schemas_dto import Application, ApplicationStatus
+from routers.router_auth import get_current_user
+from database import repository as repo
+from database.applications import (
+    application_summary, save_application, get_application, get_student_application, get_status_entries,
+    get_status_counts, update_application_fields, update_application_status, list_opportunity_applications,
+    list_student_applications
+)
+from database.pagination import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX, InvalidCursor, set_next_cursor
+from services.counters import counters
+from services.serialization import json_response
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import Optional, List
+import uuid
+
+router = APIRouter(prefix='/applications', tags=['Candidatures'])
+
+# Nombre maximal de candidatures désignées dans une mise à jour groupée
+BULK_STATUS_MAX_IDS = 5000
+
+# Schéma d'entrée sans student_id (injecté depuis le token)
+class ApplicationRequest(BaseModel):
+    opportunity_id: str
+    cover_letter: str
+    additional_documents: Optional[List[str]] = []
+
+class ApplicationStatusUpdate(BaseModel):
+    status: ApplicationStatus
+    company_feedback: Optional[str] = None
+    interview_date: Optional[datetime] = None
+
+class BulkStatusUpdate(BaseModel):
+    from_status: ApplicationStatus
+    to_status: ApplicationStatus
+    # Sans liste : toutes les candidatures de `from_status`
+    application_ids: Optional[List[str]] = Field(None, max_length=BULK_STATUS_MAX_IDS)
+    company_feedback: Optional[str] = None
+
+async def _get_owned_opportunity(opportunity_id: str, current_user: dict) -> dict:
+    if current_user.get('user_type') != 'company':
+        raise HTTPException(status_code=403, detail="Réservé aux entreprises")
+    opportunity = await repo.get(f"opportunities/{opportunity_id}")
+    if not opportunity:
+        raise HTTPException(status_code=404, detail="Opportunité non trouvée")
+    if opportunity.get('company_id') != current_user['uid']:
+        raise HTTPException(status_code=403, detail="Non autorisé pour cette opportunité")
+    return opportunity
+
+@router.post('', response_model=Application, status_code=201)
+async def apply_to_opportunity(
+    request_data: ApplicationRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """Étudiant candidate à une opportunité (une candidature par opportunité)"""
+    if current_user.get('user_type') != 'student':
+        raise HTTPException(status_code=403, detail="Réservé aux étudiants")
+    try:
+        opportunity = await repo.get(f"opportunities/{request_data.opportunity_id}")
+        if not opportunity:
+            raise HTTPException(status_code=404, detail="Opportunité non trouvée")
+        if opportunity.get('status', 'active') != 'active':
+            raise HTTPException(status_code=400, detail="Cette opportunité n'accepte plus de candidatures")
+        if await get_student_application(current_user['uid'], request_data.opportunity_id):
+            raise HTTPException(status_code=409, detail="Vous avez déjà candidaté à cette opportunité")
+
+        application = Application(
+            id=str(uuid.uuid4()),
+            student_id=current_user['uid'],
+            applied_at=datetime.now(),
+            **request_data.dict()
+        )
+        await save_application(application.model_dump(mode='json'))
+
+        # Compteur de l'opportunité écrit au prochain vidage des compteurs
+        counters.increment(f"opportunities/{request_data.opportunity_id}/applications_count")
+        return application
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get('/mine')
+async def get_my_applications(
+    response: Response,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Étudiant récupère ses candidatures (paginées, curseur suivant dans X-Next-Cursor)"""
+    if current_user.get('user_type') != 'student':
+        raise HTTPException(status_code=403, detail="Réservé aux étudiants")
+    try:
+        applications, next_cursor = await list_student_applications(current_user['uid'], limit, cursor)
+        set_next_cursor(response, next_cursor)
+        return json_response(applications, response)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Curseur invalide")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get('/opportunity/{opportunity_id}')
+async def get_opportunity_applications(
+    opportunity_id: str,
+    response: Response,
+    status: ApplicationStatus = ApplicationStatus.ENVOYEE,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Entreprise consulte les candidatures d'un statut pour son opportunité (paginées, plus récentes en premier)"""
+    try:
+        await _get_owned_opportunity(opportunity_id, current_user)
+        # Lecture de la seule partition du statut demandé
+        applications, next_cursor = await list_opportunity_applications(
+            opportunity_id, status.value, limit, cursor
+        )
+        set_next_cursor(response, next_cursor)
+        return json_response(applications, response)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Curseur invalide")
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get('/opportunity/{opportunity_id}/counts')
+async def get_opportunity_application_counts(
+    opportunity_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Entreprise consulte le nombre de candidatures par statut"""
+    try:
+        await _get_owned_opportunity(opportunity_id, current_user)
+        stored = await get_status_counts(opportunity_id)
+        counts = {status.value: stored.get(status.value, 0) for status in ApplicationStatus}
+        return {"total": sum(counts.values()), "by_status": counts}
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get('/{application_id}', response_model=Application)
+async def get_application_detail(
+    application_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Candidature complète (l'étudiant candidat ou l'entreprise de l'opportunité)"""
+    try:
+        application = await get_application(application_id)
+        if not application:
+            raise HTTPException(status_code=404, detail="Candidature non trouvée")
+        if application['student_id'] != current_user['uid']:
+            await _get_owned_opportunity(application['opportunity_id'], current_user)
+        return application
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.patch('/{application_id}/status', response_model=Application)
+async def update_status(
+    application_id: str,
+    update: ApplicationStatusUpdate,
+    current_user: dict = Depends(get_current_user)
+):
+    """Entreprise change le statut d'une candidature"""
+    try:
+        application = await get_application(application_id)
+        if not application:
+            raise HTTPException(status_code=404, detail="Candidature non trouvée")
+        await _get_owned_opportunity(application['opportunity_id'], current_user)
+
+        fields = update.model_dump(mode='json', exclude={'status'}, exclude_none=True)
+        if update.status.value == application['status']:
+            # Statut inchangé : ni déplacement ni décompte, seulement les autres champs
+            if fields:
+                await update_application_fields(application, fields)
+                application.update(fields)
+            return application
+        await update_application_status(
+            application['opportunity_id'], application['status'],
+            {application_id: application_summary(application)},
+            update.status.value, fields
+        )
+        application.update(fields, status=update.status.value)
+        return application
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post('/opportunity/{opportunity_id}/bulk-status')
+async def bulk_update_status(
+    opportunity_id: str,
+    update: BulkStatusUpdate,
+    current_user: dict = Depends(get_current_user)
+):
+    """Entreprise déplace des candidatures d'un statut à un autre (ex : envoyée -> vue) en écritures groupées"""
+    if update.from_status == update.to_status:
+        raise HTTPException(status_code=400, detail="Statuts de départ et d'arrivée identiques")
+    try:
+        await _get_owned_opportunity(opportunity_id, current_user)
+
+        # Une lecture de la partition du statut de départ (résumés), au lieu d'une par candidature
+        entries = await get_status_entries(opportunity_id, update.from_status.value)
+        skipped = []
+        if update.application_ids is not None:
+            requested = dict.fromkeys(update.application_ids)
+            skipped = [application_id for application_id in requested if application_id not in entries]
+            entries = {application_id: entries[application_id] for application_id in requested if application_id in entries}
+
+        fields = {"company_feedback": update.company_feedback} if update.company_feedback is not None else None
+        updated = await update_application_status(
+            opportunity_id, update.from_status.value, entries, update.to_status.value, fields
+        )
+        return {"updated": updated, "skipped": skipped}
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
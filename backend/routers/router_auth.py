@@ -1,10 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException
+import base64
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from fastapi.responses import JSONResponse
-from firebase_admin import auth
-from database.firebase import db, authUser
+from starlette.concurrency import run_in_threadpool
+from database.firebase import get_admin_auth, get_auth_user
+from database import repository as repo
+from database.pagination import PAGE_SIZE_MAX, InvalidCursor, page_limit, set_next_cursor
+from database.validations import list_student_validations
+from services.token_cache import token_cache
+from services.serialization import json_response
+from services.expertise_index import expertise_index
+from services.index_versions import index_versions
 from classes.schemas_dto import User, StudentCreate, Professional, CompanyCreate
 from datetime import datetime
+from typing import Optional
 
 # OAuth2 scheme for token extraction
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='auth/login')
@@ -12,14 +22,64 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl='auth/login')
 # APIRouter instance
 router = APIRouter(prefix='/auth', tags=['Auth'])
 
-# Utilitaire: Vérifie le token et retourne l'utilisateur
-def get_current_user(token: str = Depends(oauth2_scheme)):
+async def _load_user(token: str, decoded_token: dict) -> dict:
+    user_data = await repo.get(f"users/{decoded_token['uid']}")
+    if not user_data:
+        raise HTTPException(status_code=404, detail="Utilisateur non trouvé")
+    current_user = {**decoded_token, **user_data, 'token': token}
+    token_cache.put(token, current_user, decoded_token.get('exp'))
+    return current_user
+
+def _unverified_uid(token: str):
+    """uid porté par le jeton, sans vérification de signature (None si illisible)
+
+    Sert uniquement à retirer du cache les jetons d'un utilisateur révoqué.
+    """
+    try:
+        payload = token.split('.')[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+        return claims.get('user_id') or claims.get('sub')
+    except Exception:
+        return None
+
+# Utilitaire: Vérifie le token et retourne l'utilisateur.
+# Un jeton déjà vérifié est servi par le cache sans nouvel appel à Firebase :
+# après révocation ou désactivation du compte, il reste accepté jusqu'à
+# l'expiration de son entrée (TOKEN_CACHE_TTL, au plus l'exp du jeton), sauf
+# si une route vérifiée (get_current_user_checked) l'a vu révoqué entre-temps.
+async def get_current_user(token: str = Depends(oauth2_scheme)):
+    cached_user = token_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+    try:
+        decoded_token = await run_in_threadpool(get_admin_auth().verify_id_token, token)
+        return await _load_user(token, decoded_token)
+    except Exception:
+        raise HTTPException(status_code=401, detail="Token invalide")
+
+# Utilitaire: comme get_current_user, mais vérifie la révocation auprès de Firebase à chaque requête.
+# Réservé aux écritures qui engagent l'utilisateur (validation de compétence par un professionnel) :
+# les autres routes acceptent la fenêtre du cache décrite ci-dessus.
+async def get_current_user_checked(token: str = Depends(oauth2_scheme)):
+    auth = get_admin_auth()
     try:
-        decoded_token = auth.verify_id_token(token)
-        user_data = db.child("users").child(decoded_token['uid']).get().val()
-        if not user_data:
-            raise HTTPException(status_code=404, detail="Utilisateur non trouvé")
-        return {**decoded_token, **user_data, 'token': token}
+        decoded_token = await run_in_threadpool(auth.verify_id_token, token, check_revoked=True)
+    except (auth.RevokedIdTokenError, auth.UserDisabledError):
+        # Jetons révoqués ou compte désactivé : tous les jetons en cache de l'utilisateur sont retirés,
+        # même si ce jeton-ci n'y est pas (uid lu dans les claims non vérifiés)
+        uid = _unverified_uid(token)
+        if uid:
+            token_cache.evict_uid(uid)
+        token_cache.evict(token)
+        raise HTTPException(status_code=401, detail="Token révoqué")
+    except Exception:
+        token_cache.evict(token)
+        raise HTTPException(status_code=401, detail="Token invalide")
+    cached_user = token_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+    try:
+        return await _load_user(token, decoded_token)
     except Exception:
         raise HTTPException(status_code=401, detail="Token invalide")
 
@@ -30,14 +90,15 @@ async def signup(user_data: User):
     password = user_data.password
     if len(password) < 6:
         raise HTTPException(status_code=400, detail="Password must be at least 6 characters long")
+    auth = get_admin_auth()
     try:
-        user = auth.create_user(email=email, password=password)
+        user = await run_in_threadpool(auth.create_user, email=email, password=password)
         user_data_dict = {
             "email": email,
             "uid": user.uid,
             "created_at": str(user.user_metadata.creation_timestamp)
         }
-        db.child("users").child(user.uid).set(user_data_dict)
+        await repo.set(f"users/{user.uid}", user_data_dict)
         return JSONResponse(content={
             "message": f"User account created successfully for user {user.uid}",
             "user_id": user.uid
@@ -51,7 +112,9 @@ async def signup(user_data: User):
 @router.post('/signup/student', status_code=201)
 async def signup_student(student_data: StudentCreate):
     try:
-        user = auth.create_user(
+        auth = get_admin_auth()
+        user = await run_in_threadpool(
+            auth.create_user,
             email=student_data.email,
             password=student_data.password
         )
@@ -60,8 +123,8 @@ async def signup_student(student_data: StudentCreate):
         student_dict['user_type'] = 'student'
         student_dict['created_at'] = datetime.now().isoformat()
         del student_dict['password']  # Ne pas stocker le mot de passe
-        db.child("students").child(user.uid).set(student_dict)
-        db.child("users").child(user.uid).set({
+        await repo.set(f"students/{user.uid}", student_dict)
+        await repo.set(f"users/{user.uid}", {
             "email": student_data.email,
             "user_type": "student",
             "profile_complete": False
@@ -74,17 +137,22 @@ async def signup_student(student_data: StudentCreate):
 @router.post('/signup/professional', status_code=201)
 async def signup_professional(professional_data: Professional):
     try:
-        user = auth.create_user(email=professional_data.email)
+        auth = get_admin_auth()
+        user = await run_in_threadpool(auth.create_user, email=professional_data.email)
         professional_dict = professional_data.dict()
         professional_dict['id'] = user.uid
         professional_dict['user_type'] = 'professional'
         professional_dict['created_at'] = datetime.now().isoformat()
-        db.child("professionals").child(user.uid).set(professional_dict)
-        db.child("users").child(user.uid).set({
-            "email": professional_data.email,
-            "user_type": "professional",
-            "verified": False
+        await repo.update("", {
+            f"professionals/{user.uid}": professional_dict,
+            f"users/{user.uid}": {
+                "email": professional_data.email,
+                "user_type": "professional",
+                "verified": False
+            },
+            **index_versions.bump("professionals", ids=[user.uid])
         })
+        expertise_index.set_professional(user.uid, professional_dict.get('expertise_domains', []))
         return {"message": "Compte professionnel créé avec succès", "user_id": user.uid}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -93,7 +161,9 @@ async def signup_professional(professional_data: Professional):
 @router.post('/signup/company', status_code=201)
 async def signup_company(company_data: CompanyCreate):
     try:
-        user = auth.create_user(
+        auth = get_admin_auth()
+        user = await run_in_threadpool(
+            auth.create_user,
             email=company_data.email,
             password=company_data.password
         )
@@ -102,8 +172,8 @@ async def signup_company(company_data: CompanyCreate):
         company_dict['user_type'] = 'company'
         company_dict['created_at'] = datetime.now().isoformat()
         del company_dict['password']  # Ne pas stocker le mot de passe
-        db.child("companies").child(user.uid).set(company_dict)
-        db.child("users").child(user.uid).set({
+        await repo.set(f"companies/{user.uid}", company_dict)
+        await repo.set(f"users/{user.uid}", {
             "email": company_data.email,
             "user_type": "company",
             "verified": False
@@ -116,7 +186,8 @@ async def signup_company(company_data: CompanyCreate):
 @router.post('/login')
 async def login(user_credentials: OAuth2PasswordRequestForm = Depends()):
     try:
-        user = authUser.sign_in_with_email_and_password(
+        user = await run_in_threadpool(
+            get_auth_user().sign_in_with_email_and_password,
             email=user_credentials.username,
             password=user_credentials.password
         )
@@ -134,22 +205,24 @@ def secure_endpoint(user_data: dict = Depends(get_current_user)):
     return user_data
 
 @router.get('/my-validations')
-async def get_my_validations(current_user: dict = Depends(get_current_user)):
-    """Étudiant récupère ses demandes de validation"""
+async def get_my_validations(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Étudiant récupère ses demandes de validation (toutes, ou paginées avec limit/cursor, curseur suivant dans X-Next-Cursor)"""
     if current_user.get('user_type') != 'student':
         raise HTTPException(status_code=403, detail="Réservé aux étudiants")
     
     try:
-        all_validations = db.child("skill_validations").get().val() or {}
-        my_validations = []
-        
-        for validation_id, validation in all_validations.items():
-            if validation.get('student_id') == current_user['uid']:
-                validation['id'] = validation_id
-                my_validations.append(validation)
-        
-        # Trier par date de création (plus récent en premier)
-        my_validations.sort(key=lambda x: x.get('created_at', ''), reverse=True)
-        return my_validations
+        # Lecture de l'index de l'étudiant uniquement (plus récent en premier)
+        validations, next_cursor = await list_student_validations(
+            current_user['uid'], page_limit(limit, cursor), cursor
+        )
+        set_next_cursor(response, next_cursor)
+        return json_response(validations, response)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Curseur invalide")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
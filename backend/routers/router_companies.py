@@ -1,33 +1,53 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from classes.schemas_dto import Company, CompanyBase, Opportunity
 from routers.router_auth import get_current_user
-from database.firebase import db
-from typing import List
+from database import repository as repo
+from database.opportunities import list_company_opportunities
+from database.pagination import PAGE_SIZE_MAX, InvalidCursor, page_limit, set_next_cursor
+from services.http_cache import cached_not_modified, versioned_response
+from services.serialization import models_response, record_content
+from typing import List, Optional
 
 router = APIRouter(prefix='/companies', tags=['Entreprises'])
 
 @router.get('/profile', response_model=Company)
-async def get_company_profile(current_user: dict = Depends(get_current_user)):
-    """Récupère le profil de l'entreprise connectée"""
+async def get_company_profile(request: Request, current_user: dict = Depends(get_current_user)):
+    """Récupère le profil de l'entreprise connectée (ETag, 304 si inchangé)"""
     if current_user.get('user_type') != 'company':
         raise HTTPException(status_code=403, detail="Réservé aux entreprises")
     
+    key = f"companies/{current_user['uid']}"
+    not_modified = cached_not_modified(request, key)
+    if not_modified is not None:
+        return not_modified
     try:
-        company_data = db.child("companies").child(current_user['uid']).get().val()
+        company_data = await repo.get(key)
         if not company_data:
             raise HTTPException(status_code=404, detail="Profil entreprise non trouvé")
-        return Company(**company_data)
+        return versioned_response(request, key, record_content(Company, company_data))
+    except HTTPException as he:
+        raise he
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get('/opportunities', response_model=List[Opportunity])
-async def get_company_opportunities(current_user: dict = Depends(get_current_user)):
-    """Récupère toutes les opportunités de l'entreprise"""
+async def get_company_opportunities(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Récupère les opportunités de l'entreprise (toutes, ou paginées avec limit/cursor, curseur suivant dans X-Next-Cursor)"""
     if current_user.get('user_type') != 'company':
         raise HTTPException(status_code=403, detail="Réservé aux entreprises")
     
     try:
-        opportunities = db.child("opportunities").order_by_child("company_id").equal_to(current_user['uid']).get().val() or {}
-        return [Opportunity(**opp) for opp in opportunities.values()]
+        opportunities, next_cursor = await list_company_opportunities(
+            current_user['uid'], page_limit(limit, cursor), cursor
+        )
+        set_next_cursor(response, next_cursor)
+        return models_response(Opportunity, opportunities, response)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Curseur invalide")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
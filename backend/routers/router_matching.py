@@ -1,13 +1,100 @@
-from fastapi import APIRouter, Depends, HTTPException
-from classes.schemas_dto import Opportunity, OpportunityBase, Application
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile
+from starlette.concurrency import run_in_threadpool
+from classes.schemas_dto import Opportunity, OpportunityBase, OpportunityType, Application
 from routers.router_auth import get_current_user
-from database.firebase import db
-from typing import List
+from database import repository as repo
+from database.notifications import create_notifications, require_delivered
+from database.opportunities import save_opportunity, save_opportunities, update_opportunity_fields
+from database.pagination import (
+    PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX, InvalidCursor, decode_cursor, encode_cursor, page_limit, page_ranked,
+    ranked_start, set_next_cursor
+)
+from services.job_queue import job_queue
+from services.counters import counters
+from services.student_skill_index import student_skill_index, load_student_skill_index
+from services.recommender import LEVEL_BONUS, opportunity_matrix, load_opportunity_matrix
+from services.recommendation_cache import RECOMMENDATION_PREFIX_ROWS, recommendation_cache
+from services.skills_catalog import skills_catalog
+from services.search_index import opportunity_search_index, load_opportunity_search_index
+from services.serialization import json_response
+from services.opportunity_import import (
+    FORMATS, IMPORT_MAX_ERRORS, IMPORT_MAX_ROWS, ImportFormatError, detect_format, iter_rows, next_batch
+)
+from typing import List, Optional
 from datetime import datetime
 import uuid
 
 router = APIRouter(prefix='/matching', tags=['Mise en Relation'])
 
+# Seuil de correspondance
+MATCH_THRESHOLD = 0.3
+
+def canonical_skills(opportunity_data: OpportunityBase) -> OpportunityBase:
+    """Compétences de l'opportunité ramenées aux noms canoniques du catalogue"""
+    return opportunity_data.model_copy(update={
+        'required_skills': skills_catalog.canonicalize_all(opportunity_data.required_skills),
+        'preferred_skills': skills_catalog.canonicalize_all(opportunity_data.preferred_skills)
+    })
+
+def on_opportunity_changed(opportunity_id: str, opportunity: dict):
+    """Tient à jour les structures en mémoire après une écriture d'opportunité"""
+    previous = opportunity_matrix.get(opportunity_id) or {}
+    skills = set(opportunity.get('required_skills') or []) | set(previous.get('required_skills') or [])
+    opportunity_matrix.upsert(opportunity_id, opportunity)
+    opportunity_search_index.upsert(opportunity_id, opportunity)
+    
+    # Seuls les étudiants ayant une des compétences concernées voient leur classement changer
+    if student_skill_index.loaded:
+        recommendation_cache.invalidate_many(student_skill_index.candidates(skills))
+    else:
+        recommendation_cache.clear()
+
+def matching_students(required_skills: list) -> list:
+    """Étudiants dont les compétences validées dépassent le seuil de correspondance"""
+    return [
+        student_id
+        for student_id, validated_skills in student_skill_index.candidates(required_skills).items()
+        if calculate_match_score(validated_skills, required_skills) > MATCH_THRESHOLD
+    ]
+
+async def notify_matching_students(opportunity: Opportunity):
+    """Notifie les étudiants dont les compétences validées correspondent à l'opportunité"""
+    # Index inversé compétence -> étudiants (chargé au démarrage)
+    if not student_skill_index.loaded:
+        await load_student_skill_index()
+    
+    results = await create_notifications(
+        sorted(matching_students(opportunity.required_skills)),
+        "opportunity_match",
+        f"Nouvelle opportunité correspondant à votre profil : {opportunity.title}",
+        data={"opportunity_id": opportunity.id, "company_id": opportunity.company_id},
+        key=f"opportunity_match:{opportunity.id}"
+    )
+    return require_delivered(results)
+
+async def notify_matching_students_batch(opportunities: list):
+    """Une notification par étudiant pour un lot d'opportunités importées (celles qui lui correspondent)"""
+    if not student_skill_index.loaded:
+        await load_student_skill_index()
+    
+    matched = {}
+    for opportunity in opportunities:
+        for student_id in matching_students(opportunity['required_skills']):
+            matched.setdefault(student_id, []).append(opportunity['id'])
+    
+    results = await create_notifications(
+        sorted(matched),
+        "opportunity_match",
+        "Nouvelles opportunités correspondant à votre profil",
+        data_by_recipient={
+            student_id: {"opportunity_ids": opportunity_ids, "company_id": opportunities[0]['company_id']}
+            for student_id, opportunity_ids in matched.items()
+        },
+        # Lot identifié par sa première opportunité (identifiants créés par l'import)
+        key=f"opportunity_import:{opportunities[0]['id']}"
+    )
+    return require_delivered(results)
+
 @router.post('/opportunities', response_model=Opportunity, status_code=201)
 async def create_opportunity(
     opportunity_data: OpportunityBase,
@@ -22,42 +109,258 @@ async def create_opportunity(
         opportunity = Opportunity(
             id=opportunity_id,
             created_at=datetime.now(),
-            **opportunity_data.dict()
+            **canonical_skills(opportunity_data).dict()
         )
         
-        db.child("opportunities").child(opportunity_id).set(opportunity.dict())
+        opportunity_dict = opportunity.model_dump(mode='json')
+        await save_opportunity(opportunity_dict)
+        on_opportunity_changed(opportunity_id, opportunity_dict)
         
-        # Notifier les étudiants correspondants
-        await notify_matching_students(opportunity)
+        # Notifier les étudiants correspondants (en arrière-plan)
+        await job_queue.submit(notify_matching_students, opportunity)
         
         return opportunity
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post('/opportunities/import')
+async def import_opportunities(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern=f"^({'|'.join(FORMATS)})$"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Entreprise importe des opportunités depuis un fichier NDJSON ou CSV (rapport d'erreurs par ligne)
+
+    En cas d'erreur inattendue, la réponse 500 porte le rapport partiel
+    (lots déjà écrits, erreur, dernière ligne traitée) : l'import peut
+    reprendre après `last_row`.
+    """
+    if current_user.get('user_type') != 'company':
+        raise HTTPException(status_code=403, detail="Réservé aux entreprises")
+    try:
+        file_format = format or detect_format(file.filename, file.content_type)
+    except ImportFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    rows = iter_rows(file.file, file_format)
+    created, errors, read, failed = [], [], 0, 0
+    truncated, last_row = False, None
+    try:
+        while True:
+            if read >= IMPORT_MAX_ROWS:
+                truncated = True
+                break
+            # Lecture et validation d'un lot dans un thread, puis une écriture multi-chemins par lot
+            valid, batch_errors, count, batch_last_row = await run_in_threadpool(
+                next_batch, rows, current_user['uid']
+            )
+            if not count:
+                break
+            failed += len(batch_errors)
+            errors.extend(batch_errors[:IMPORT_MAX_ERRORS - len(errors)])
+            if not valid:
+                read += count
+                last_row = batch_last_row
+                continue
+            
+            now = datetime.now()
+            opportunities = [
+                Opportunity(id=str(uuid.uuid4()), created_at=now, **canonical_skills(data).dict()).model_dump(mode='json')
+                for _, data in valid
+            ]
+            try:
+                await save_opportunities(opportunities)
+            except Exception as e:
+                failed += len(valid)
+                errors.extend(
+                    {"row": line, "errors": [{"field": "", "message": f"Écriture échouée : {e}"}]}
+                    for line, _ in valid[:IMPORT_MAX_ERRORS - len(errors)]
+                )
+                read += count
+                last_row = batch_last_row
+                continue
+            read += count
+            last_row = batch_last_row
+            created.extend(opportunity['id'] for opportunity in opportunities)
+            for opportunity in opportunities:
+                on_opportunity_changed(opportunity['id'], opportunity)
+            
+            # Une tâche de notification par lot (en arrière-plan)
+            await job_queue.submit(notify_matching_students_batch, opportunities)
+    except UnicodeDecodeError:
+        failed += 1
+        errors.append({"row": None, "errors": [{"field": "", "message": "Fichier non encodé en UTF-8"}]})
+    except Exception as e:
+        # Rapport partiel : les lots précédents sont écrits, la suite du fichier n'est pas traitée
+        report = _import_report(file_format, read, created, failed, truncated, errors, last_row)
+        raise HTTPException(status_code=500, detail={**report, "error": str(e)})
+    
+    return _import_report(file_format, read, created, failed, truncated, errors, last_row)
+
+def _import_report(file_format: str, read: int, created: list, failed: int, truncated: bool,
+                   errors: list, last_row) -> dict:
+    return {
+        "format": file_format,
+        "rows": read,
+        "created": len(created),
+        "failed": failed,
+        "truncated": truncated,
+        "last_row": last_row,  # ligne du fichier de la dernière ligne traitée
+        "opportunity_ids": created,
+        "errors": errors  # au plus IMPORT_MAX_ERRORS
+    }
+
+async def _get_owned_opportunity(opportunity_id: str, current_user: dict) -> dict:
+    if current_user.get('user_type') != 'company':
+        raise HTTPException(status_code=403, detail="Réservé aux entreprises")
+    opportunity = await repo.get(f"opportunities/{opportunity_id}")
+    if not opportunity:
+        raise HTTPException(status_code=404, detail="Opportunité non trouvée")
+    if opportunity.get('company_id') != current_user['uid']:
+        raise HTTPException(status_code=403, detail="Non autorisé à modifier cette opportunité")
+    return opportunity
+
+@router.get('/opportunities/{opportunity_id}', response_model=Opportunity)
+async def get_opportunity(
+    opportunity_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Consulte une opportunité (compte une vue)"""
+    try:
+        opportunity = await repo.get(f"opportunities/{opportunity_id}")
+        if not opportunity:
+            raise HTTPException(status_code=404, detail="Opportunité non trouvée")
+        
+        # Vue comptée en mémoire, écrite au prochain vidage des compteurs
+        views_path = f"opportunities/{opportunity_id}/views_count"
+        counters.increment(views_path)
+        opportunity['views_count'] = opportunity.get('views_count', 0) + counters.pending(views_path)
+        return Opportunity(**opportunity)
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.patch('/opportunities/{opportunity_id}', response_model=Opportunity)
+async def update_opportunity(
+    opportunity_id: str,
+    opportunity_data: OpportunityBase,
+    current_user: dict = Depends(get_current_user)
+):
+    """Entreprise modifie une de ses opportunités"""
+    try:
+        opportunity = await _get_owned_opportunity(opportunity_id, current_user)
+        update_data = canonical_skills(opportunity_data).model_dump(mode='json')
+        update_data['company_id'] = current_user['uid']
+        await update_opportunity_fields(opportunity_id, update_data)
+        opportunity.update(update_data)
+        on_opportunity_changed(opportunity_id, opportunity)
+        return Opportunity(**opportunity)
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post('/opportunities/{opportunity_id}/close')
+async def close_opportunity(
+    opportunity_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Entreprise clôture une de ses opportunités"""
+    try:
+        opportunity = await _get_owned_opportunity(opportunity_id, current_user)
+        await update_opportunity_fields(opportunity_id, {"status": "closed"})
+        opportunity['status'] = "closed"
+        on_opportunity_changed(opportunity_id, opportunity)
+        return {"message": "Opportunité clôturée avec succès"}
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get('/recommendations')
-async def get_student_recommendations(current_user: dict = Depends(get_current_user)):
-    """Étudiant récupère les opportunités recommandées"""
+async def get_student_recommendations(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Étudiant récupère les opportunités recommandées (toutes, ou paginées avec limit/cursor, curseur suivant dans X-Next-Cursor)"""
     if current_user.get('user_type') != 'student':
         raise HTTPException(status_code=403, detail="Réservé aux étudiants")
     
     try:
-        student_data = db.child("students").child(current_user['uid']).get().val()
-        validated_skills = student_data.get('validated_skills', {})
+        if not opportunity_matrix.loaded:
+            await load_opportunity_matrix()
         
-        all_opportunities = db.child("opportunities").get().val() or {}
-        recommendations = []
+        async def validated_skills() -> dict:
+            student_data = await repo.get(f"students/{current_user['uid']}") or {}
+            return student_data.get('validated_skills', {})
         
-        for opp_id, opportunity in all_opportunities.items():
-            required_skills = opportunity.get('required_skills', [])
-            match_score = calculate_match_score(validated_skills, required_skills)
-            
-            if match_score > 0.3:  # Seuil de correspondance
-                opportunity['match_score'] = match_score
-                recommendations.append(opportunity)
+        limit = page_limit(limit, cursor)
+        entry = recommendation_cache.get(current_user['uid'])
+        if limit is None and (entry is None or not entry[1]):
+            # Liste complète demandée : classement entier, mis en cache
+            entry = (opportunity_matrix.recommend(await validated_skills(), MATCH_THRESHOLD), True)
+            recommendation_cache.put(current_user['uid'], *entry)
+        elif entry is None:
+            # Début du classement seulement : sélection partielle des meilleures opportunités
+            prefix = opportunity_matrix.recommend(
+                await validated_skills(), MATCH_THRESHOLD, limit=RECOMMENDATION_PREFIX_ROWS
+            )
+            entry = (prefix, len(prefix) < RECOMMENDATION_PREFIX_ROWS)
+            recommendation_cache.put(current_user['uid'], *entry)
+        
+        # Curseur (score, id) : reprise par recherche dichotomique dans le classement en cache
+        recommendations, complete = entry
+        if complete or ranked_start(recommendations, cursor) + limit < len(recommendations):
+            page, next_cursor = page_ranked(recommendations, limit, cursor)
+        else:
+            # Au-delà du début en cache : classement à partir de la position du curseur
+            position = decode_cursor(cursor, ('s', 'k'))
+            ranked = opportunity_matrix.recommend(
+                await validated_skills(), MATCH_THRESHOLD, limit=limit + 1,
+                after=(position['s'], position['k']) if position else None
+            )
+            page, next_cursor = page_ranked(ranked, limit)
+        set_next_cursor(response, next_cursor)
+        return json_response(page, response)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Curseur invalide")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get('/search')
+async def search_opportunities(
+    response: Response,
+    q: str = Query('', max_length=200),
+    opportunity_type: Optional[OpportunityType] = Query(None, alias="type"),
+    location: Optional[str] = None,
+    remote: Optional[bool] = None,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Recherche plein texte des opportunités actives, avec filtres et facettes (curseur suivant dans X-Next-Cursor)"""
+    try:
+        position = decode_cursor(cursor, ('s', 'k'))
+        if not opportunity_search_index.loaded:
+            await load_opportunity_search_index()
         
-        # Trier par score de correspondance
-        recommendations.sort(key=lambda x: x['match_score'], reverse=True)
-        return recommendations
+        # Classement BM25 en mémoire ; une opportunité de plus pour savoir s'il reste une page
+        results, total, facets = opportunity_search_index.search(
+            q,
+            filters={'type': opportunity_type.value if opportunity_type else None, 'location': location, 'remote_possible': remote},
+            limit=limit + 1,
+            after=(position['s'], position['k']) if position else None
+        )
+        if len(results) > limit:
+            results = results[:limit]
+            last = results[-1]
+            set_next_cursor(response, encode_cursor({'s': last['search_score'], 'k': last['id']}))
+        return json_response({"total": total, "results": results, "facets": facets}, response)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Curseur invalide")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -66,16 +369,13 @@ def calculate_match_score(student_skills: dict, required_skills: list) -> float:
     if not required_skills:
         return 0.0
     
+    # Comparaison sur les clés de compétence ("Python" et "python" sont la même)
+    levels = {skills_catalog.skill_key(skill): level for skill, level in student_skills.items()}
     matched_skills = 0
     for skill in required_skills:
-        if skill in student_skills:
+        skill_key = skills_catalog.skill_key(skill)
+        if skill_key in levels:
             # Bonus selon le niveau validé
-            level_bonus = {
-                'débutant': 0.25,
-                'intermédiaire': 0.5,
-                'avancé': 0.75,
-                'expert': 1.0
-            }
-            matched_skills += level_bonus.get(student_skills[skill], 0)
+            matched_skills += LEVEL_BONUS.get(levels[skill_key], 0)
     
     return matched_skills / len(required_skills)
@@ -1,21 +1,52 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from classes.schemas_dto import Professional, ProfessionalBase
 from routers.router_auth import get_current_user
-from database.firebase import db
+from database import repository as repo
+from database.professional_stats import get_professional_stats, summarize
+from services.expertise_index import expertise_index
+from services.index_versions import index_versions
+from services.http_cache import cached_not_modified, versioned_response, version_cache
+from services.serialization import record_content
 
 router = APIRouter(prefix='/professionals', tags=['Professionnels'])
 
 @router.get('/profile', response_model=Professional)
-async def get_professional_profile(current_user: dict = Depends(get_current_user)):
-    """Récupère le profil du professionnel connecté"""
+async def get_professional_profile(request: Request, current_user: dict = Depends(get_current_user)):
+    """Récupère le profil du professionnel connecté (ETag, 304 si inchangé)"""
     if current_user.get('user_type') != 'professional':
         raise HTTPException(status_code=403, detail="Réservé aux professionnels")
     
+    key = f"professionals/{current_user['uid']}"
+    not_modified = cached_not_modified(request, key)
+    if not_modified is not None:
+        return not_modified
     try:
-        professional_data = db.child("professionals").child(current_user['uid']).get().val()
+        professional_data = await repo.get(key)
         if not professional_data:
             raise HTTPException(status_code=404, detail="Profil professionnel non trouvé")
-        return Professional(**professional_data)
+        return versioned_response(request, key, record_content(Professional, professional_data))
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.patch('/profile')
+async def update_professional_profile(
+    profile_data: ProfessionalBase,
+    current_user: dict = Depends(get_current_user)
+):
+    """Met à jour le profil du professionnel"""
+    if current_user.get('user_type') != 'professional':
+        raise HTTPException(status_code=403, detail="Réservé aux professionnels")
+    
+    try:
+        await repo.update("", {
+            **{f"professionals/{current_user['uid']}/{field}": value for field, value in profile_data.dict().items()},
+            **index_versions.bump("professionals", ids=[current_user['uid']])
+        })
+        expertise_index.set_professional(current_user['uid'], profile_data.expertise_domains)
+        version_cache.bump(f"professionals/{current_user['uid']}")
+        return {"message": "Profil mis à jour avec succès"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -26,15 +57,8 @@ async def get_validation_statistics(current_user: dict = Depends(get_current_use
         raise HTTPException(status_code=403, detail="Réservé aux professionnels")
     
     try:
-        validations = db.child("skill_validations").order_by_child("professional_id").equal_to(current_user['uid']).get().val() or {}
-        
-        stats = {
-            "total_validations": len(validations),
-            "validations_this_month": 0,  # À calculer selon la date
-            "average_rating": 0.0,
-            "expertise_domains": []
-        }
-        
-        return stats
+        # Lecture du nœud matérialisé, tenu à jour à chaque validation et notation
+        stats = await get_professional_stats(current_user['uid'])
+        return summarize(stats)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,7 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from classes.schemas_dto import SkillValidationRequest, SkillValidation, ValidationStatus, CompetenceLevel
-from routers.router_auth import get_current_user
-from database.firebase import db
+from routers.router_auth import get_current_user, get_current_user_checked
+from services.expertise_index import domain_matches, expertise_index, load_expertise_index
+from services.job_queue import job_queue
+from services.counters import counters
+from services.http_cache import PUBLIC_CACHE_CONTROL, cached_not_modified, versioned_response, version_cache
+from services.skills_catalog import skills_catalog, refresh_skills_catalog_if_stale
+from services.student_skill_index import student_skill_index
+from services.recommendation_cache import recommendation_cache
+from services.serialization import json_response
+from services.index_versions import index_versions
+from database import repository as repo
+from database.notifications import create_notifications, require_delivered
+from database.professional_stats import validation_updates, rating_updates
+from database.pagination import PAGE_SIZE_MAX, InvalidCursor, page_limit, set_next_cursor
+from database.validations import save_validation, update_validation, delete_validation, list_student_validations, list_pending_validations
 from datetime import datetime
 import uuid
 from pydantic import BaseModel
@@ -9,38 +22,52 @@ from typing import Optional, List
 
 router = APIRouter(prefix='/skills', tags=['Validation des Compétences'])
 
-async def notify_relevant_professionals(skill_name: str):
-    """Notifie les professionnels compétents dans le domaine de la compétence"""
+async def notify_relevant_professionals(skill_name: str, validation_id: str):
+    """Notifie les professionnels compétents dans le domaine de la compétence
+
+    Exécutée par la file de tâches : un lot non écrit fait échouer la tâche,
+    retentée avec les mêmes identifiants (dérivés de la demande), sans doublon.
+    """
+    # Index inversé domaine -> professionnels (chargé au démarrage)
+    if not expertise_index.loaded:
+        await load_expertise_index()
+    relevant_professionals = sorted(expertise_index.match(skill_name))
+    
+    # Créer les notifications en une écriture multi-chemins par lot
+    results = await create_notifications(
+        relevant_professionals,
+        "skill_validation_request",
+        f"Nouvelle demande de validation pour la compétence : {skill_name}",
+        recipient_field="professional_id",
+        fields={"skill_name": skill_name},
+        key=f"skill_validation_request:{validation_id}"
+    )
+    return require_delivered(results)
+
+@router.get('/catalog')
+async def get_skills_catalog(request: Request):
+    """Catalogue des compétences (ETag, 304 si inchangé)"""
+    not_modified = cached_not_modified(request, "skills_catalog", PUBLIC_CACHE_CONTROL)
+    if not_modified is not None:
+        return not_modified
     try:
-        # Récupérer tous les professionnels
-        professionals = db.child("professionals").get().val() or {}
-        
-        relevant_professionals = []
-        for prof_id, prof_data in professionals.items():
-            expertise_domains = prof_data.get('expertise_domains', [])
-            # Vérifier si la compétence correspond aux domaines d'expertise
-            if any(domain.lower() in skill_name.lower() or skill_name.lower() in domain.lower() 
-                   for domain in expertise_domains):
-                relevant_professionals.append(prof_id)
-        
-        # Créer des notifications pour les professionnels pertinents
-        for prof_id in relevant_professionals:
-            notification_id = str(uuid.uuid4())
-            notification_data = {
-                "id": notification_id,
-                "professional_id": prof_id,
-                "type": "skill_validation_request",
-                "skill_name": skill_name,
-                "message": f"Nouvelle demande de validation pour la compétence : {skill_name}",
-                "created_at": datetime.now().isoformat(),
-                "read": False
-            }
-            db.child("notifications").child(notification_id).set(notification_data)
-            
-        return len(relevant_professionals)
+        # Servi depuis le catalogue en mémoire
+        await refresh_skills_catalog_if_stale()
+        return versioned_response(request, "skills_catalog", skills_catalog.raw, PUBLIC_CACHE_CONTROL)
     except Exception as e:
-        print(f"Erreur lors de la notification des professionnels: {str(e)}")
-        return 0
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get('/catalog/search')
+async def search_skills_catalog(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50)
+):
+    """Autocomplétion des compétences du catalogue (préfixe, mots, fautes de frappe)"""
+    try:
+        await refresh_skills_catalog_if_stale()
+        return skills_catalog.search(q, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 # Nouveau schéma d'entrée sans student_id
 class SkillValidationRequestNoId(BaseModel):
@@ -60,47 +87,56 @@ async def request_skill_validation(
         raise HTTPException(status_code=403, detail="Réservé aux étudiants")
     try:
         validation_id = str(uuid.uuid4())
+        # Nom canonique du catalogue (ex : "python3" -> "Python")
+        request_fields = request_data.dict()
+        request_fields['skill_name'] = skills_catalog.canonicalize(request_data.skill_name)
         validation = SkillValidation(
             id=validation_id,
             created_at=datetime.now(),
             student_id=current_user['uid'],
-            **request_data.dict()
+            **request_fields
         )
         # Convertir datetime en string pour Firebase
         validation_dict = validation.dict()
         validation_dict['created_at'] = validation_dict['created_at'].isoformat()
-        db.child("skill_validations").child(validation_id).set(validation_dict)
-        # Notifier les professionnels compétents
-        notified_count = await notify_relevant_professionals(request_data.skill_name)
+        await save_validation(validation_dict)
+        # Notifier les professionnels compétents (en arrière-plan)
+        await job_queue.submit(notify_relevant_professionals, validation.skill_name, validation_id)
         return validation
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get('/pending-validations')
-async def get_pending_validations(current_user: dict = Depends(get_current_user)):
-    """Professionnel récupère les validations en attente dans son domaine"""
+async def get_pending_validations(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Professionnel récupère les validations en attente dans son domaine (toutes, ou paginées avec limit/cursor, curseur suivant dans X-Next-Cursor)"""
     if current_user.get('user_type') != 'professional':
         raise HTTPException(status_code=403, detail="Réservé aux professionnels")
     
     try:
-        professional_data = db.child("professionals").child(current_user['uid']).get().val()
+        professional_data = await repo.get(f"professionals/{current_user['uid']}")
         if not professional_data:
             raise HTTPException(status_code=404, detail="Profil professionnel non trouvé")
             
         expertise_domains = professional_data.get('expertise_domains', [])
         
-        all_validations = db.child("skill_validations").get().val() or {}
-        pending_validations = []
-        
-        for validation_id, validation in all_validations.items():
-            if (validation.get('status') == ValidationStatus.EN_ATTENTE and 
-                any(domain.lower() in validation.get('skill_name', '').lower() or 
-                    validation.get('skill_name', '').lower() in domain.lower() 
-                    for domain in expertise_domains)):
-                validation['id'] = validation_id
-                pending_validations.append(validation)
+        def in_expertise(skill_name: str) -> bool:
+            return any(domain_matches(domain, skill_name) for domain in expertise_domains)
         
-        return pending_validations
+        # Une requête par compétence du domaine dans l'index des demandes en attente
+        pending_validations, next_cursor = await list_pending_validations(
+            in_expertise, page_limit(limit, cursor), cursor
+        )
+        set_next_cursor(response, next_cursor)
+        return json_response(pending_validations, response)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Curseur invalide")
+    except HTTPException as he:
+        raise he
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -109,7 +145,7 @@ async def validate_skill(
     validation_id: str,
     validated_level: CompetenceLevel,
     feedback: str,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user_checked)
 ):
     """Professionnel valide une compétence"""
     if current_user.get('user_type') != 'professional':
@@ -117,30 +153,46 @@ async def validate_skill(
     
     try:
         # Vérifier que la validation existe
-        validation = db.child("skill_validations").child(validation_id).get().val()
+        validation = await repo.get(f"skill_validations/{validation_id}")
         if not validation:
             raise HTTPException(status_code=404, detail="Demande de validation non trouvée")
         
+        if validation.get('status') != ValidationStatus.EN_ATTENTE:
+            raise HTTPException(status_code=400, detail="Demande de validation déjà traitée")
+        
         # Mettre à jour la validation
+        validation_date = datetime.now()
         update_data = {
             'status': ValidationStatus.VALIDEE,
             'professional_id': current_user['uid'],
             'validated_level': validated_level,
             'professional_feedback': feedback,
-            'validation_date': datetime.now().isoformat()
+            'validation_date': validation_date.isoformat()
         }
         
-        db.child("skill_validations").child(validation_id).update(update_data)
-        
-        # Mettre à jour le profil étudiant
         student_id = validation['student_id']
         skill_name = validation['skill_name']
         
-        db.child("students").child(student_id).child("validated_skills").child(skill_name).set(validated_level)
+        # Statistiques matérialisées du professionnel, écrites avec la validation
+        if not expertise_index.loaded:
+            await load_expertise_index()
+        domains = expertise_index.matching_domains(current_user['uid'], skill_name)
+        stats_updates = validation_updates(current_user['uid'], domains, validation_date)
+        await update_validation(validation_id, validation, update_data, stats_updates)
         
-        # Mettre à jour les statistiques du professionnel
-        current_count = db.child("professionals").child(current_user['uid']).child("validation_count").get().val() or 0
-        db.child("professionals").child(current_user['uid']).update({"validation_count": current_count + 1})
+        # Mettre à jour le profil étudiant, sous la clé de la compétence (le nom n'est pas un chemin valide)
+        await refresh_skills_catalog_if_stale()
+        skill_key = skills_catalog.skill_key(skill_name)
+        await repo.update("", {
+            f"students/{student_id}/validated_skills/{skill_key}": validated_level.value,
+            **index_versions.bump("students", ids=[student_id])
+        })
+        student_skill_index.set_skill(student_id, skill_key, validated_level.value)
+        recommendation_cache.invalidate(student_id)
+        version_cache.bump(f"students/{student_id}")
+        
+        # Compteur de validations du professionnel (incrément tamponné)
+        counters.increment(f"professionals/{current_user['uid']}/validation_count")
         
         return {"message": "Compétence validée avec succès"}
     except HTTPException as he:
@@ -148,24 +200,62 @@ async def validate_skill(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get('/my-validations')
-async def get_my_validations(current_user: dict = Depends(get_current_user)):
-    """Étudiant récupère ses demandes de validation"""
+# Source des notes agrégées dans professional_stats (rating_sum, rating_count) :
+# aucune note n'était saisie auparavant, average_rating restait un substitut.
+@router.post('/validation/{validation_id}/rating')
+async def rate_validation(
+    validation_id: str,
+    rating: int = Query(..., ge=1, le=5),
+    current_user: dict = Depends(get_current_user)
+):
+    """Étudiant note la validation reçue (1 à 5)"""
     if current_user.get('user_type') != 'student':
         raise HTTPException(status_code=403, detail="Réservé aux étudiants")
     
     try:
-        all_validations = db.child("skill_validations").get().val() or {}
-        my_validations = []
+        validation = await repo.get(f"skill_validations/{validation_id}")
+        if not validation:
+            raise HTTPException(status_code=404, detail="Demande de validation non trouvée")
         
-        for validation_id, validation in all_validations.items():
-            if validation.get('student_id') == current_user['uid']:
-                validation['id'] = validation_id
-                my_validations.append(validation)
+        if validation.get('student_id') != current_user['uid']:
+            raise HTTPException(status_code=403, detail="Non autorisé à noter cette validation")
         
-        # Trier par date de création (plus récent en premier)
-        my_validations.sort(key=lambda x: x.get('created_at', ''), reverse=True)
-        return my_validations
+        if validation.get('status') != ValidationStatus.VALIDEE or not validation.get('professional_id'):
+            raise HTTPException(status_code=400, detail="Seule une validation accordée peut être notée")
+        
+        if validation.get('rating'):
+            raise HTTPException(status_code=400, detail="Validation déjà notée")
+        
+        await update_validation(
+            validation_id, validation, {'rating': rating},
+            rating_updates(validation['professional_id'], rating)
+        )
+        return {"message": "Note enregistrée avec succès"}
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get('/my-validations')
+async def get_my_validations(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Étudiant récupère ses demandes de validation (toutes, ou paginées avec limit/cursor, curseur suivant dans X-Next-Cursor)"""
+    if current_user.get('user_type') != 'student':
+        raise HTTPException(status_code=403, detail="Réservé aux étudiants")
+    
+    try:
+        # Lecture de l'index de l'étudiant uniquement (plus récent en premier)
+        validations, next_cursor = await list_student_validations(
+            current_user['uid'], page_limit(limit, cursor), cursor
+        )
+        set_next_cursor(response, next_cursor)
+        return json_response(validations, response)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Curseur invalide")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -179,7 +269,7 @@ async def cancel_validation_request(
         raise HTTPException(status_code=403, detail="Réservé aux étudiants")
     
     try:
-        validation = db.child("skill_validations").child(validation_id).get().val()
+        validation = await repo.get(f"skill_validations/{validation_id}")
         if not validation:
             raise HTTPException(status_code=404, detail="Demande de validation non trouvée")
         
@@ -189,7 +279,7 @@ async def cancel_validation_request(
         if validation.get('status') != ValidationStatus.EN_ATTENTE:
             raise HTTPException(status_code=400, detail="Impossible d'annuler une demande déjà traitée")
         
-        db.child("skill_validations").child(validation_id).remove()
+        await delete_validation(validation_id, validation)
         return {"message": "Demande de validation annulée avec succès"}
     except HTTPException as he:
         raise he
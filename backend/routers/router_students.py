@@ -1,22 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from classes.schemas_dto import Student, StudentBase
 from routers.router_auth import get_current_user
-from database.firebase import db
+from database import repository as repo
+from services.http_cache import cached_not_modified, versioned_response, version_cache
+from services.serialization import record_content
 from typing import List
 
 router = APIRouter(prefix='/students', tags=['Étudiants'])
 
 @router.get('/profile', response_model=Student)
-async def get_student_profile(current_user: dict = Depends(get_current_user)):
-    """Récupère le profil de l'étudiant connecté"""
+async def get_student_profile(request: Request, current_user: dict = Depends(get_current_user)):
+    """Récupère le profil de l'étudiant connecté (ETag, 304 si inchangé)"""
     if current_user.get('user_type') != 'student':
         raise HTTPException(status_code=403, detail="Réservé aux étudiants")
     
+    key = f"students/{current_user['uid']}"
+    not_modified = cached_not_modified(request, key)
+    if not_modified is not None:
+        return not_modified
     try:
-        student_data = db.child("students").child(current_user['uid']).get().val()
+        student_data = await repo.get(key)
         if not student_data:
             raise HTTPException(status_code=404, detail="Profil étudiant non trouvé")
-        return Student(**student_data)
+        return versioned_response(request, key, record_content(Student, student_data))
+    except HTTPException as he:
+        raise he
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -30,7 +38,8 @@ async def update_student_profile(
         raise HTTPException(status_code=403, detail="Réservé aux étudiants")
     
     try:
-        db.child("students").child(current_user['uid']).update(profile_data.dict())
+        await repo.update(f"students/{current_user['uid']}", profile_data.dict())
+        version_cache.bump(f"students/{current_user['uid']}")
         return {"message": "Profil mis à jour avec succès"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
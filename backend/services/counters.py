@@ -0,0 +1,108 @@
+import asyncio
+import os
+
+from database import repository as repo
+from services.http_cache import resource_key, version_cache
+
+# Compteurs tamponnés en mémoire (vues, candidatures, validations).
+# Les routes appellent increment() sans accès à la base : les deltas sont
+# cumulés par chemin puis écrits toutes les COUNTER_FLUSH_INTERVAL secondes
+# en une mise à jour multi-chemins d'incréments serveur (.sv), sans lecture
+# préalable ni perte sous concurrence. Un vidage est anticipé dès que
+# COUNTER_MAX_PENDING chemins sont en attente, et le lifespan vide le tampon
+# à l'arrêt. Un lot en échec est réintégré au tampon pour le vidage suivant.
+# Les ressources modifiées perdent leur version en cache (ETag).
+
+COUNTER_FLUSH_INTERVAL = float(os.getenv("COUNTER_FLUSH_INTERVAL", "2"))
+COUNTER_MAX_PENDING = int(os.getenv("COUNTER_MAX_PENDING", "5000"))
+COUNTER_FLUSH_BATCH = int(os.getenv("COUNTER_FLUSH_BATCH", "500"))
+
+
+class CounterBuffer:
+    def __init__(self, flush_interval: float = COUNTER_FLUSH_INTERVAL,
+                 max_pending: int = COUNTER_MAX_PENDING, batch_size: int = COUNTER_FLUSH_BATCH):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self._pending = {}  # chemin -> delta cumulé
+        self._task = None
+        self._flush_lock = asyncio.Lock()
+        self._early_flush = None
+        self.increments = 0
+        self.flushes = 0
+        self.flushed_paths = 0
+        self.failed = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def increment(self, path: str, delta: int = 1):
+        """Ajoute `delta` au compteur stocké à `path` (écrit au prochain vidage)"""
+        self._pending[path] = self._pending.get(path, 0) + delta
+        self.increments += 1
+        if self.running and len(self._pending) >= self.max_pending and self._early_flush is None:
+            self._early_flush = asyncio.get_running_loop().create_task(self._flush_early())
+
+    def pending(self, path: str) -> int:
+        """Delta pas encore écrit pour `path`"""
+        return self._pending.get(path, 0)
+
+    async def _flush_early(self):
+        try:
+            await self.flush()
+        finally:
+            self._early_flush = None
+
+    async def flush(self) -> int:
+        """Écrit les deltas en attente ; retourne le nombre de chemins écrits"""
+        async with self._flush_lock:
+            pending, self._pending = self._pending, {}
+            items = [(path, delta) for path, delta in pending.items() if delta]
+            written = 0
+            for start in range(0, len(items), self.batch_size):
+                batch = items[start:start + self.batch_size]
+                try:
+                    await repo.update("", {path: repo.increment(delta) for path, delta in batch})
+                    version_cache.bump(*{resource_key(path) for path, _ in batch})
+                    written += len(batch)
+                except Exception as e:
+                    print(f"Erreur lors de l'écriture des compteurs: {str(e)}")
+                    self.failed += 1
+                    for path, delta in items[start:]:
+                        self._pending[path] = self._pending.get(path, 0) + delta
+                    break
+            if written:
+                self.flushes += 1
+                self.flushed_paths += written
+            return written
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Arrête le vidage périodique puis écrit ce qui reste en attente"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._early_flush is not None:
+            await asyncio.gather(self._early_flush, return_exceptions=True)
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "pending_paths": len(self._pending),
+            "increments": self.increments,
+            "flushes": self.flushes,
+            "flushed_paths": self.flushed_paths,
+            "failed": self.failed
+        }
+
+
+counters = CounterBuffer()
@@ -0,0 +1,127 @@
+import asyncio
+
+from database import repository as repo
+
+# Index inversé en mémoire : domaine d'expertise normalisé -> professionnels.
+#
+# La règle de correspondance historique est conservée : un professionnel est
+# pertinent pour une compétence si l'un de ses domaines est une sous-chaîne de
+# la compétence, ou l'inverse (comparaison insensible à la casse).
+#  - domaine ⊆ compétence : on cherche chaque sous-chaîne de la compétence
+#    parmi les domaines connus (en se limitant aux longueurs existantes) ;
+#  - compétence ⊆ domaine : chaque domaine est indexé par toutes ses
+#    sous-chaînes, la recherche est une simple lecture de dictionnaire.
+# Le coût d'une recherche dépend de la longueur de la compétence et du nombre
+# de résultats, pas du nombre de professionnels.
+#
+# L'index est propre à chaque processus : il est construit au démarrage puis
+# tenu à jour par les routes qui modifient les domaines d'expertise.
+
+
+def normalize_domain(value: str) -> str:
+    return value.lower()
+
+
+def domain_matches(domain: str, skill_name: str) -> bool:
+    """Règle de correspondance domaine / compétence (sous-chaîne dans un sens ou l'autre)"""
+    domain, skill = normalize_domain(domain), normalize_domain(skill_name)
+    return domain in skill or skill in domain
+
+
+def _substrings(value: str, lengths=None) -> set:
+    result = {""}
+    for size in range(1, len(value) + 1):
+        if lengths is not None and size not in lengths:
+            continue
+        for start in range(len(value) - size + 1):
+            result.add(value[start:start + size])
+    return result
+
+
+class ExpertiseIndex:
+    def __init__(self):
+        self.loaded = False
+        self._professionals_by_domain = {}  # domaine -> {prof_id}
+        self._domains_by_substring = {}  # sous-chaîne -> {domaine}
+        self._domains_by_professional = {}  # prof_id -> {domaine}
+        self._length_counts = {}  # longueur de domaine -> nombre de domaines
+
+    def load(self, professionals: dict):
+        """(Re)construit l'index à partir de la collection professionals"""
+        self.__init__()
+        for prof_id, prof_data in professionals.items():
+            self.set_professional(prof_id, (prof_data or {}).get('expertise_domains', []))
+        self.loaded = True
+
+    def set_professional(self, prof_id: str, expertise_domains: list):
+        """Enregistre (ou remplace) les domaines d'un professionnel"""
+        self.remove_professional(prof_id)
+        domains = {normalize_domain(domain) for domain in expertise_domains or []}
+        if domains:
+            self._domains_by_professional[prof_id] = domains
+        for domain in domains:
+            professionals = self._professionals_by_domain.setdefault(domain, set())
+            if not professionals:
+                self._add_domain(domain)
+            professionals.add(prof_id)
+
+    def remove_professional(self, prof_id: str):
+        for domain in self._domains_by_professional.pop(prof_id, set()):
+            professionals = self._professionals_by_domain[domain]
+            professionals.discard(prof_id)
+            if not professionals:
+                del self._professionals_by_domain[domain]
+                self._remove_domain(domain)
+
+    def _add_domain(self, domain: str):
+        self._length_counts[len(domain)] = self._length_counts.get(len(domain), 0) + 1
+        for substring in _substrings(domain):
+            self._domains_by_substring.setdefault(substring, set()).add(domain)
+
+    def _remove_domain(self, domain: str):
+        self._length_counts[len(domain)] -= 1
+        if not self._length_counts[len(domain)]:
+            del self._length_counts[len(domain)]
+        for substring in _substrings(domain):
+            domains = self._domains_by_substring[substring]
+            domains.discard(domain)
+            if not domains:
+                del self._domains_by_substring[substring]
+
+    def match(self, skill_name: str) -> set:
+        """Professionnels dont un domaine contient la compétence ou y est contenu"""
+        skill = normalize_domain(skill_name)
+        domains = set(self._domains_by_substring.get(skill, ()))
+        for substring in _substrings(skill, self._length_counts):
+            if substring in self._professionals_by_domain:
+                domains.add(substring)
+        professionals = set()
+        for domain in domains:
+            professionals |= self._professionals_by_domain[domain]
+        return professionals
+
+    def matching_domains(self, prof_id: str, skill_name: str) -> list:
+        """Domaines du professionnel correspondant à la compétence"""
+        return sorted(domain for domain in self._domains_by_professional.get(prof_id, ())
+                      if domain_matches(domain, skill_name))
+
+
+expertise_index = ExpertiseIndex()
+
+
+async def load_expertise_index():
+    """Charge l'index depuis la base (au démarrage de l'application)"""
+    try:
+        professionals = await repo.get("professionals") or {}
+        expertise_index.load(professionals)
+    except Exception as e:
+        print(f"Erreur lors du chargement de l'index d'expertise: {str(e)}")
+
+
+async def apply_professional_changes(professional_ids: list):
+    """Relit les domaines d'expertise des professionnels modifiés par une autre instance"""
+    domains = await asyncio.gather(*(
+        repo.get(f"professionals/{prof_id}/expertise_domains") for prof_id in professional_ids
+    ))
+    for prof_id, expertise_domains in zip(professional_ids, domains):
+        expertise_index.set_professional(prof_id, expertise_domains or [])
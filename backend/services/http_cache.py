@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+
+from fastapi import Request, Response
+
+# Réponses conditionnelles (ETag / If-None-Match) pour les lectures rarement
+# modifiées : profils et catalogue de compétences.
+#
+# L'ETag est l'empreinte du corps JSON : identique d'un processus à l'autre.
+# Le cache de versions garde, par ressource ("students/{uid}", ...), l'ETag
+# de la dernière réponse servie : si le client présente cet ETag, la route
+# répond 304 sans lire la base. Les écritures locales retirent l'entrée
+# (bump) ; HTTP_CACHE_TTL borne l'écart lorsqu'une autre instance a écrit.
+
+HTTP_CACHE_SIZE = int(os.getenv("HTTP_CACHE_SIZE", "50000"))
+HTTP_CACHE_TTL = int(os.getenv("HTTP_CACHE_TTL", "60"))
+
+# Le client garde la réponse mais la revalide à chaque usage
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+PUBLIC_CACHE_CONTROL = "public, max-age=300, must-revalidate"
+
+
+class VersionCache:
+    def __init__(self, max_size: int = HTTP_CACHE_SIZE, ttl: int = HTTP_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # ressource -> (expiration, etag)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        """ETag connu de la ressource, ou None"""
+        entry = self._entries.get(key)
+        if entry is None or time.time() >= entry[0]:
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: str, etag: str):
+        self._entries.pop(key, None)
+        self._entries[key] = (time.time() + self.ttl, etag)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def bump(self, *keys: str):
+        """La ressource a changé : la prochaine lecture repasse par la base"""
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+version_cache = VersionCache()
+
+
+def compute_etag(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match or not etag:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or any(value.removeprefix("W/") == etag for value in candidates)
+
+
+def _not_modified(etag: str, cache_control: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+
+def cached_not_modified(request: Request, key: str, cache_control: str = PRIVATE_CACHE_CONTROL):
+    """Réponse 304 si le client a déjà la version en cache de `key`, sinon None"""
+    etag = version_cache.get(key)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return _not_modified(etag, cache_control)
+    return None
+
+
+def resource_key(path: str) -> str:
+    """Ressource versionnée contenant `path` : "professionals/{uid}/validation_count" -> "professionals/{uid}" """
+    return "/".join(path.strip("/").split("/")[:2])
+
+
+def versioned_response(request: Request, key: str, content, cache_control: str = PRIVATE_CACHE_CONTROL) -> Response:
+    """Sérialise `content` (modèle Pydantic ou JSON), mémorise son ETag et répond 200 (ou 304 si inchangé)"""
+    if hasattr(content, "model_dump_json"):
+        body = content.model_dump_json().encode()
+    else:
+        body = json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+    etag = compute_etag(body)
+    version_cache.put(key, etag)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return _not_modified(etag, cache_control)
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": cache_control}
+    )
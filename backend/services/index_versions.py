@@ -0,0 +1,213 @@
+import asyncio
+import inspect
+import os
+import time
+import uuid
+
+from database import repository as repo
+
+# Versions des index en mémoire partagées entre processus.
+#
+# Les index (matrice des opportunités, recherche, compétences des étudiants,
+# expertise, cache des recommandations) sont propres à chaque processus. Une
+# écriture qui les concerne joint à sa mise à jour multi-chemins un incrément
+# serveur de index_versions/{nom} (bump) et une entrée du journal
+# index_changes/{nom}/{clé} : identifiants modifiés et processus d'origine.
+# La clé est ordonnée dans le temps (la version serveur n'est connue qu'après
+# l'écriture) ; chaque processus retient la dernière clé lue.
+#
+# Toutes les INDEX_REFRESH_INTERVAL secondes, chaque processus relit
+# index_versions. Pour un nom dont la version a avancé, il lit les entrées du
+# journal qui suivent sa dernière clé et passe les identifiants des autres
+# processus aux fonctions de mise à jour enregistrées (on_changes) : seuls
+# les éléments modifiés sont relus. Ses propres écritures, déjà appliquées,
+# sont seulement comptées. Les index sont rechargés entièrement si l'écart de
+# version dépasse INDEX_CHANGES_MAX_GAP, si les entrées lues n'expliquent pas
+# tout l'écart (purgées après INDEX_CHANGES_RETENTION secondes, horloges
+# décalées), si une entrée ne porte pas d'identifiants, ou au-delà de
+# INDEX_CHANGES_MAX_IDS identifiants. Les modifications faites par une autre
+# instance ou par manage.py sont visibles au plus tard après un intervalle.
+
+INDEX_REFRESH_INTERVAL = float(os.getenv("INDEX_REFRESH_INTERVAL", "5"))
+INDEX_CHANGES_MAX_GAP = int(os.getenv("INDEX_CHANGES_MAX_GAP", "500"))
+INDEX_CHANGES_MAX_IDS = int(os.getenv("INDEX_CHANGES_MAX_IDS", "2000"))
+INDEX_CHANGES_RETENTION = int(os.getenv("INDEX_CHANGES_RETENTION", "3600"))
+INDEX_VERSIONS_PATH = "index_versions"
+INDEX_CHANGES_PATH = "index_changes"
+
+# Purge du journal toutes les PRUNE_EVERY vérifications, par lots
+PRUNE_EVERY = 60
+PRUNE_CHUNK_SIZE = 500
+
+
+def _time_key(timestamp_ns: int) -> str:
+    return f"{timestamp_ns:020d}"
+
+
+def _change_key() -> str:
+    # Suffixe aléatoire : deux écritures de la même nanoseconde ne se remplacent pas
+    return f"{_time_key(time.time_ns())}-{uuid.uuid4().hex[:8]}"
+
+
+async def _call_all(functions, *args):
+    for function in functions:
+        result = function(*args)
+        if inspect.isawaitable(result):
+            await result
+
+
+class IndexVersions:
+    def __init__(self, refresh_interval: float = INDEX_REFRESH_INTERVAL):
+        self.refresh_interval = refresh_interval
+        self.origin = uuid.uuid4().hex  # processus auteur des entrées du journal
+        self._loaders = {}  # nom -> [fonctions de rechargement]
+        self._appliers = {}  # nom -> [fonctions de mise à jour par identifiants]
+        self._expected = {}  # nom -> version expliquée par les entrées lues
+        self._cursors = {}  # nom -> dernière clé lue du journal
+        self._task = None
+        self.checks = 0
+        self.reloads = {}
+        self.applied = {}
+        self.failed = 0
+
+    def register(self, name: str, *loaders, on_changes=()):
+        """Fonctions (synchrones ou coroutines) rechargeant les index de `name`
+
+        `on_changes` : fonctions appelées avec la liste des identifiants
+        modifiés par une autre instance, à la place d'un rechargement complet.
+        """
+        self._loaders.setdefault(name, []).extend(loaders)
+        self._appliers.setdefault(name, []).extend(on_changes)
+
+    def bump(self, *names, ids=None) -> dict:
+        """Incréments de version et entrées du journal à joindre à une écriture (chemins absolus)
+
+        Sans `ids`, les autres instances rechargent entièrement les index.
+        """
+        change = {"origin": self.origin}
+        if ids:
+            change["ids"] = sorted(set(ids))
+        else:
+            change["full"] = True
+        key = _change_key()
+        updates = {}
+        for name in names:
+            updates[f"{INDEX_VERSIONS_PATH}/{name}"] = repo.increment()
+            updates[f"{INDEX_CHANGES_PATH}/{name}/{key}"] = change
+        return updates
+
+    async def reload(self, *names):
+        """Recharge entièrement les index de `names` dans ce processus (après une écriture qu'il a faite)"""
+        for name in names:
+            await _call_all(self._loaders.get(name, ()))
+
+    async def sync(self):
+        """Mémorise les versions stockées et la fin du journal ; appelé avant le chargement initial des index"""
+        try:
+            versions = await repo.get(INDEX_VERSIONS_PATH) or {}
+            self._expected = {name: versions.get(name, 0) for name in self._loaders}
+            for name in self._loaders:
+                last = await repo.query(f"{INDEX_CHANGES_PATH}/{name}", order_by='$key', limit_to_last=1)
+                self._cursors[name] = next(iter(last), None)
+        except Exception as e:
+            print(f"Erreur lors de la lecture des versions d'index: {str(e)}")
+
+    async def check(self) -> list:
+        """Met à jour les index dont la version stockée a avancé ; retourne leurs noms"""
+        versions = await repo.get(INDEX_VERSIONS_PATH) or {}
+        self.checks += 1
+        # Version inférieure : entrées lues avant l'incrément correspondant, rattrapé au prochain tour
+        stale = [name for name in self._loaders if versions.get(name, 0) > self._expected.get(name, 0)]
+        for name in stale:
+            await self._refresh(name, versions.get(name, 0))
+        if self.checks % PRUNE_EVERY == 0:
+            await self.prune()
+        return stale
+
+    async def _refresh(self, name: str, version: int):
+        gap = version - self._expected.get(name, 0)
+        ids = None
+        if gap <= INDEX_CHANGES_MAX_GAP and self._appliers.get(name):
+            ids = await self._read_changes(name, gap)
+            if self._expected[name] < version:
+                ids = None  # entrées manquantes
+        if ids is None or len(ids) > INDEX_CHANGES_MAX_IDS:
+            await self._reload(name, version)
+            return
+        if ids:
+            await _call_all(self._appliers[name], sorted(ids))
+            self.applied[name] = self.applied.get(name, 0) + len(ids)
+
+    async def _read_changes(self, name: str, gap: int):
+        """Identifiants modifiés par les autres processus depuis la dernière clé lue (None : rechargement complet)"""
+        cursor = self._cursors.get(name)
+        entries = await repo.query(
+            f"{INDEX_CHANGES_PATH}/{name}", order_by='$key', start_at=cursor,
+            limit_to_first=gap + (1 if cursor is not None else 0)
+        )
+        entries.pop(cursor, None)
+        ids, full = set(), False
+        for key, change in entries.items():
+            self._expected[name] = self._expected.get(name, 0) + 1
+            self._cursors[name] = key
+            if not isinstance(change, dict) or change.get("origin") == self.origin:
+                continue
+            if not change.get("ids"):
+                full = True
+            ids.update(change.get("ids") or ())
+        return None if full else ids
+
+    async def _reload(self, name: str, version: int):
+        # Version notée avant le rechargement : une écriture pendant celui-ci en déclenche un autre
+        self._expected[name] = version
+        last = await repo.query(f"{INDEX_CHANGES_PATH}/{name}", order_by='$key', limit_to_last=1)
+        self._cursors[name] = next(iter(last), self._cursors.get(name))
+        await _call_all(self._loaders[name])
+        self.reloads[name] = self.reloads.get(name, 0) + 1
+
+    async def prune(self) -> int:
+        """Supprime les entrées du journal plus anciennes que INDEX_CHANGES_RETENTION ; retourne leur nombre"""
+        cutoff = _time_key(time.time_ns() - INDEX_CHANGES_RETENTION * 1_000_000_000)
+        removed = 0
+        for name in self._loaders:
+            while True:
+                old = await repo.query(
+                    f"{INDEX_CHANGES_PATH}/{name}", order_by='$key', end_at=cutoff, limit_to_first=PRUNE_CHUNK_SIZE
+                )
+                if not old:
+                    break
+                await repo.update("", {f"{INDEX_CHANGES_PATH}/{name}/{key}": None for key in old})
+                removed += len(old)
+                if len(old) < PRUNE_CHUNK_SIZE:
+                    break
+        return removed
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.check()
+            except Exception as e:
+                print(f"Erreur lors du rafraîchissement des index: {str(e)}")
+                self.failed += 1
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "versions": dict(self._expected),
+            "checks": self.checks,
+            "reloads": dict(self.reloads),
+            "applied": dict(self.applied),
+            "failed": self.failed
+        }
+
+
+index_versions = IndexVersions()
@@ -0,0 +1,123 @@
+import asyncio
+import os
+import time
+
+from services.metrics import Histogram
+
+# File de tâches asynchrone en mémoire, démarrée par le lifespan FastAPI.
+# Sort les envois de notifications du chemin de la requête : la route met la
+# tâche en file et répond immédiatement, N workers l'exécutent ensuite avec
+# nouvelles tentatives (backoff exponentiel). À l'arrêt, la file est vidée.
+# Une tâche doit laisser remonter ses erreurs pour être retentée, et être
+# rejouable (écritures idempotentes). Profondeur, issues et temps d'attente
+# avant exécution sont exportés par le collecteur Prometheus (services.metrics).
+
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "1000"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_MAX_RETRIES = int(os.getenv("JOB_MAX_RETRIES", "3"))
+JOB_RETRY_DELAY = float(os.getenv("JOB_RETRY_DELAY", "0.5"))
+JOB_DRAIN_TIMEOUT = float(os.getenv("JOB_DRAIN_TIMEOUT", "30"))
+
+JOB_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0)
+
+
+class JobQueue:
+    def __init__(self, max_size: int = JOB_QUEUE_SIZE, workers: int = JOB_WORKERS,
+                 max_retries: int = JOB_MAX_RETRIES, retry_delay: float = JOB_RETRY_DELAY):
+        self.max_size = max_size
+        self.workers = workers
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._queue = None
+        self._tasks = []
+        self.enqueued = 0
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+        self.inline = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.wait_time = Histogram(JOB_WAIT_BUCKETS)  # attente en file avant la première tentative
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self):
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self, timeout: float = JOB_DRAIN_TIMEOUT):
+        """Attend la fin des tâches en file (au plus `timeout` secondes) puis arrête les workers"""
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            print(f"File de tâches non vidée à l'arrêt ({self._queue.qsize()} restantes)")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, job, *args, **kwargs) -> bool:
+        """Met `job(*args, **kwargs)` en file ; si la file est pleine ou arrêtée, l'exécute tout de suite"""
+        if self.running:
+            try:
+                self._queue.put_nowait((job, args, kwargs, time.perf_counter()))
+                self.enqueued += 1
+                return True
+            except asyncio.QueueFull:
+                pass
+        # Contre-pression : la requête attend plutôt que de perdre la tâche
+        self.inline += 1
+        await self._run(job, args, kwargs, time.perf_counter())
+        return False
+
+    async def _worker(self):
+        while True:
+            job, args, kwargs, enqueued_at = await self._queue.get()
+            try:
+                await self._run(job, args, kwargs, enqueued_at)
+            finally:
+                self._queue.task_done()
+
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _run(self, job, args, kwargs, enqueued_at: float):
+        self.wait_time.observe(time.perf_counter() - enqueued_at)
+        for attempt in range(self.max_retries + 1):
+            try:
+                await job(*args, **kwargs)
+                break
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if attempt == self.max_retries:
+                    self.failed += 1
+                    print(f"Échec de la tâche {getattr(job, '__name__', job)}: {str(e)}")
+                    return
+                self.retried += 1
+                await asyncio.sleep(self.retry_delay * 2 ** attempt)
+        self.completed += 1
+        latency = time.perf_counter() - enqueued_at
+        self.latency_total += latency
+        self.latency_max = max(self.latency_max, latency)
+
+    def stats(self) -> dict:
+        return {
+            "depth": self.depth(),
+            "max_size": self.max_size,
+            "workers": len(self._tasks),
+            "enqueued": self.enqueued,
+            "inline": self.inline,
+            "completed": self.completed,
+            "retried": self.retried,
+            "failed": self.failed,
+            "latency_avg_seconds": round(self.latency_total / self.completed, 4) if self.completed else 0.0,
+            "latency_max_seconds": round(self.latency_max, 4)
+        }
+
+
+job_queue = JobQueue()
@@ -0,0 +1,191 @@
+import time
+from bisect import bisect_left
+
+from prometheus_client import CollectorRegistry, CONTENT_TYPE_LATEST, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, HistogramMetricFamily
+from prometheus_client.gc_collector import GCCollector
+from prometheus_client.process_collector import ProcessCollector
+
+# Métriques Prometheus de l'API, exposées sur /metrics.
+#
+# Les mesures sont de simples compteurs Python mis à jour depuis la boucle
+# d'événements (un seul thread) : aucun verrou sur le chemin de la requête.
+# Les séries par route sont créées au démarrage pour chaque route déclarée ;
+# le chemin de la requête ne fait qu'une lecture de dictionnaire. Le format
+# texte Prometheus n'est produit qu'au moment de la collecte.
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# Routes non reconnues (404) regroupées sous un seul libellé
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def buckets(self) -> list:
+        result, total = [], 0
+        for bound, count in zip(self.bounds, self.counts):
+            total += count
+            result.append((repr(float(bound)), total))
+        result.append(("+Inf", total + self.counts[-1]))
+        return result
+
+
+class RouteMetrics:
+    __slots__ = ("duration", "statuses")
+
+    def __init__(self):
+        self.duration = Histogram(REQUEST_BUCKETS)
+        self.statuses = {}  # code HTTP -> nombre de réponses
+
+
+class Metrics:
+    def __init__(self):
+        self.routes = {}  # (méthode, route) -> RouteMetrics
+        self.in_progress = {}  # méthode -> requêtes en cours
+        self.db_calls = {}  # (opération, collection) -> Histogram
+        self.db_errors = {}  # (opération, collection) -> nombre d'erreurs
+        self.job_queue = None  # file de tâches exportée (services.job_queue)
+
+    def register_job_queue(self, job_queue):
+        """Exporte la profondeur, les issues et le temps d'attente de la file de tâches"""
+        self.job_queue = job_queue
+
+    def register_routes(self, routes):
+        """Crée les séries de chaque route déclarée (appelé au démarrage)"""
+        for route in routes:
+            for method in getattr(route, "methods", None) or ():
+                self.route(method, route.path)
+                self.in_progress.setdefault(method, 0)
+
+    def route(self, method: str, path: str) -> RouteMetrics:
+        metrics = self.routes.get((method, path))
+        if metrics is None:
+            metrics = self.routes[(method, path)] = RouteMetrics()
+        return metrics
+
+    def observe_db_call(self, operation: str, collection: str, duration: float, failed: bool = False):
+        key = (operation, collection)
+        histogram = self.db_calls.get(key)
+        if histogram is None:
+            histogram = self.db_calls[key] = Histogram(DB_BUCKETS)
+        histogram.observe(duration)
+        if failed:
+            self.db_errors[key] = self.db_errors.get(key, 0) + 1
+
+    def collect(self):
+        """Interface Collector de prometheus_client"""
+        requests = CounterMetricFamily(
+            "studyconnect_http_requests", "Requêtes HTTP traitées", labels=["method", "route", "status"]
+        )
+        in_progress = GaugeMetricFamily(
+            "studyconnect_http_requests_in_progress", "Requêtes HTTP en cours", labels=["method"]
+        )
+        duration = HistogramMetricFamily(
+            "studyconnect_http_request_duration_seconds", "Durée des requêtes HTTP", labels=["method", "route"]
+        )
+        for (method, path), metrics in list(self.routes.items()):
+            for status, count in list(metrics.statuses.items()):
+                requests.add_metric([method, path, str(status)], count)
+            duration.add_metric([method, path], metrics.duration.buckets(), metrics.duration.sum)
+        for method, count in list(self.in_progress.items()):
+            in_progress.add_metric([method], count)
+        yield requests
+        yield in_progress
+        yield duration
+
+        db_duration = HistogramMetricFamily(
+            "studyconnect_db_call_duration_seconds", "Durée des appels à la base",
+            labels=["operation", "collection"]
+        )
+        for (operation, collection), histogram in list(self.db_calls.items()):
+            db_duration.add_metric([operation, collection], histogram.buckets(), histogram.sum)
+        yield db_duration
+        db_errors = CounterMetricFamily(
+            "studyconnect_db_call_errors", "Appels à la base en erreur", labels=["operation", "collection"]
+        )
+        for (operation, collection), count in list(self.db_errors.items()):
+            db_errors.add_metric([operation, collection], count)
+        yield db_errors
+
+        if self.job_queue is not None:
+            yield from self._collect_job_queue(self.job_queue)
+
+    @staticmethod
+    def _collect_job_queue(job_queue):
+        depth = GaugeMetricFamily("studyconnect_job_queue_depth", "Tâches en attente dans la file")
+        depth.add_metric([], job_queue.depth())
+        yield depth
+        jobs = CounterMetricFamily("studyconnect_jobs", "Tâches de la file par issue", labels=["outcome"])
+        for outcome in ("enqueued", "inline", "completed", "retried", "failed"):
+            jobs.add_metric([outcome], getattr(job_queue, outcome))
+        yield jobs
+        wait = HistogramMetricFamily(
+            "studyconnect_job_wait_seconds", "Attente des tâches avant leur première exécution"
+        )
+        wait.add_metric([], job_queue.wait_time.buckets(), job_queue.wait_time.sum)
+        yield wait
+
+
+metrics = Metrics()
+
+registry = CollectorRegistry()
+registry.register(metrics)
+ProcessCollector(registry=registry)
+GCCollector(registry=registry)
+
+METRICS_CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+
+def render() -> bytes:
+    """Exposition au format texte Prometheus"""
+    return generate_latest(registry)
+
+
+class MetricsMiddleware:
+    """Middleware ASGI : nombre, statut et durée des requêtes par route, requêtes en cours"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_progress = metrics.in_progress
+        in_progress[method] = in_progress.get(method, 0) + 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress[method] -= 1
+            # La route est connue une fois le routage fait (scope["route"])
+            route_metrics = self._route_metrics(scope, method)
+            route_metrics.duration.observe(time.perf_counter() - start)
+            route_metrics.statuses[status] = route_metrics.statuses.get(status, 0) + 1
+
+    @staticmethod
+    def _route_metrics(scope, method: str) -> RouteMetrics:
+        route = scope.get("route")
+        return metrics.route(method, route.path if route is not None else UNMATCHED_ROUTE)
@@ -0,0 +1,115 @@
+import csv
+import io
+import json
+import os
+from itertools import islice
+
+from pydantic import ValidationError
+
+from classes.schemas_dto import OpportunityBase
+
+# Lecture des fichiers d'import d'opportunités (NDJSON ou CSV).
+#
+# Le fichier téléversé est lu ligne à ligne par un générateur : seules
+# IMPORT_BATCH_SIZE lignes sont décodées et validées à la fois (dans un
+# thread, next_batch), puis écrites par le router avant de lire la suite.
+# Chaque ligne est validée contre OpportunityBase ; une ligne invalide est
+# consignée dans le rapport sans interrompre l'import.
+#
+# En CSV, les colonnes de liste (required_skills...) contiennent un tableau
+# JSON ou des valeurs séparées par des points-virgules ; une cellule vide
+# vaut "non renseigné".
+
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "200"))
+IMPORT_MAX_ROWS = int(os.getenv("IMPORT_MAX_ROWS", "20000"))
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "1000"))
+
+FORMATS = ("ndjson", "csv")
+
+LIST_FIELDS = {"required_skills", "preferred_skills", "requirements", "benefits"}
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+def detect_format(filename: str, content_type: str) -> str:
+    name = (filename or "").lower()
+    if name.endswith(".csv") or content_type == "text/csv":
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl", ".json")) or content_type in ("application/x-ndjson", "application/json"):
+        return "ndjson"
+    raise ImportFormatError("Format inconnu : fichier .ndjson ou .csv attendu")
+
+
+def _ndjson_rows(text):
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f"JSON invalide : {e}"
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, "Objet JSON attendu"
+            continue
+        yield line_number, row, None
+
+
+def _csv_cell(field: str, value: str):
+    value = value.strip()
+    if field in LIST_FIELDS:
+        if value.startswith("["):
+            return json.loads(value)
+        return [item.strip() for item in value.split(";") if item.strip()]
+    return value
+
+
+def _csv_rows(text):
+    reader = csv.DictReader(text)
+    for record in reader:
+        try:
+            row = {
+                field: _csv_cell(field, value)
+                for field, value in record.items()
+                if field and value is not None and value.strip()
+            }
+        except ValueError as e:
+            yield reader.line_num, None, f"Liste JSON invalide : {e}"
+            continue
+        yield reader.line_num, row, None
+
+
+def iter_rows(binary_file, file_format: str):
+    """Générateur (ligne, données, erreur de lecture) sur le fichier téléversé"""
+    text = io.TextIOWrapper(binary_file, encoding="utf-8-sig", newline="" if file_format == "csv" else None)
+    return _csv_rows(text) if file_format == "csv" else _ndjson_rows(text)
+
+
+def _error_messages(error: ValidationError) -> list:
+    return [
+        {"field": ".".join(str(part) for part in detail["loc"]), "message": detail["msg"]}
+        for detail in error.errors()
+    ]
+
+
+def next_batch(rows, company_id: str):
+    """Lit et valide le lot suivant ; retourne ([(ligne, OpportunityBase)], [erreurs], lignes lues, dernière ligne)
+
+    Bloquant (lecture du fichier) : appelé dans un thread.
+    """
+    valid, errors, count, last_line = [], [], 0, None
+    for line_number, row, read_error in islice(rows, IMPORT_BATCH_SIZE):
+        count += 1
+        last_line = line_number
+        if read_error:
+            errors.append({"row": line_number, "errors": [{"field": "", "message": read_error}]})
+            continue
+        # L'entreprise est celle du token, quel que soit le contenu du fichier
+        row["company_id"] = company_id
+        try:
+            valid.append((line_number, OpportunityBase.model_validate(row)))
+        except ValidationError as e:
+            errors.append({"row": line_number, "errors": _error_messages(e)})
+    return valid, errors, count, last_line
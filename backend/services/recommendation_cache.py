@@ -0,0 +1,82 @@
+import os
+from collections import OrderedDict
+
+# Cache LRU des recommandations classées, par étudiant.
+# Le classement ne change que si l'étudiant obtient une compétence validée ou
+# si une opportunité portant sur ses compétences est créée, modifiée ou
+# clôturée : les entrées sont invalidées précisément dans ces cas.
+# Une entrée est le début du classement (RECOMMENDATION_PREFIX_ROWS lignes,
+# obtenues par sélection partielle) et l'indication qu'il est complet ; les
+# pages au-delà sont classées à partir du curseur.
+# La mémoire est plafonnée par le nombre total de lignes en cache.
+
+RECOMMENDATION_CACHE_MAX_ROWS = int(os.getenv("RECOMMENDATION_CACHE_MAX_ROWS", "200000"))
+RECOMMENDATION_PREFIX_ROWS = int(os.getenv("RECOMMENDATION_PREFIX_ROWS", "200"))
+
+
+class RecommendationCache:
+    def __init__(self, max_rows: int = RECOMMENDATION_CACHE_MAX_ROWS):
+        self.max_rows = max_rows
+        self._entries = OrderedDict()  # student_id -> (début du classement, complet ?)
+        self._rows = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def get(self, student_id: str):
+        """(début du classement, complet ?) ou None"""
+        entry = self._entries.get(student_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(student_id)
+        self.hits += 1
+        return entry
+
+    def put(self, student_id: str, recommendations: list, complete: bool = True):
+        self._discard(student_id)
+        if len(recommendations) > self.max_rows:
+            return
+        self._entries[student_id] = (recommendations, complete)
+        self._rows += len(recommendations)
+        while self._rows > self.max_rows:
+            oldest = next(iter(self._entries))
+            self._discard(oldest)
+            self.evictions += 1
+
+    def invalidate(self, student_id: str):
+        if self._discard(student_id):
+            self.invalidations += 1
+
+    def invalidate_many(self, student_ids):
+        for student_id in student_ids:
+            self.invalidate(student_id)
+
+    def clear(self):
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+        self._rows = 0
+
+    def _discard(self, student_id: str) -> bool:
+        entry = self._entries.pop(student_id, None)
+        if entry is None:
+            return False
+        self._rows -= len(entry[0])
+        return True
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "rows": self._rows,
+            "max_rows": self.max_rows,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+recommendation_cache = RecommendationCache()
@@ -0,0 +1,167 @@
+import numpy as np
+
+from database import repository as repo
+from services.skills_catalog import skills_catalog
+
+# Score de recommandation vectorisé.
+#
+# Les opportunités forment une matrice creuse CSR (ligne = opportunité,
+# colonne = compétence, valeur = nombre d'occurrences dans required_skills).
+# Pour un étudiant, le vecteur de niveaux porte le bonus de chaque compétence
+# validée ; le score de toutes les opportunités est alors un seul produit
+# matrice-vecteur divisé par le nombre de compétences requises, identique à
+# calculate_match_score (les bonus sont des multiples exacts de 0.25). Les
+# colonnes sont les clés de compétence (skills_catalog.skill_key), des deux
+# côtés : une opportunité "Python" correspond à une compétence validée
+# "python" enregistrée avant la normalisation.
+#
+# Les modifications sont incrémentales : une nouvelle version d'opportunité
+# est ajoutée en fin de matrice et l'ancienne ligne est masquée ; la matrice
+# n'est compactée que lorsque les lignes masquées deviennent majoritaires.
+# scipy n'est importé qu'à la première construction de la matrice (lifespan),
+# pas à l'import du module.
+
+# Bonus selon le niveau validé
+LEVEL_BONUS = {
+    'débutant': 0.25,
+    'intermédiaire': 0.5,
+    'avancé': 0.75,
+    'expert': 1.0
+}
+
+
+class OpportunityMatrix:
+    def __init__(self):
+        self.loaded = False
+        self._columns = {}  # clé de compétence -> colonne
+        self._opportunities = {}  # opp_id -> opportunité
+        self._rows = {}  # opp_id -> ligne
+        self._row_ids = []  # ligne -> opp_id (None si masquée)
+        self._lengths = np.zeros(0)
+        self._matrix = None  # créée au premier _flush
+        self._pending = []  # lignes pas encore ajoutées à la matrice
+        self._hidden = 0
+
+    def load(self, opportunities: dict):
+        """(Re)construit la matrice à partir de la collection opportunities"""
+        self.__init__()
+        for opp_id, opportunity in opportunities.items():
+            self.upsert(opp_id, opportunity)
+        self._flush()
+        self.loaded = True
+
+    def get(self, opp_id: str):
+        return self._opportunities.get(opp_id)
+
+    def upsert(self, opp_id: str, opportunity: dict):
+        """Ajoute ou remplace une opportunité"""
+        self._hide(opp_id)
+        self._opportunities[opp_id] = opportunity
+        self._rows[opp_id] = len(self._row_ids)
+        self._row_ids.append(opp_id)
+        required_skills = opportunity.get('required_skills') or []
+        counts = {}
+        for skill in required_skills:
+            column = self._columns.setdefault(skills_catalog.skill_key(skill), len(self._columns))
+            counts[column] = counts.get(column, 0) + 1
+        self._pending.append((counts, len(required_skills)))
+
+    def remove(self, opp_id: str):
+        self._hide(opp_id)
+        self._opportunities.pop(opp_id, None)
+
+    def _hide(self, opp_id: str):
+        row = self._rows.pop(opp_id, None)
+        if row is not None:
+            self._row_ids[row] = None
+            self._hidden += 1
+            # Une ligne de longueur nulle a un score nul : elle n'est plus jamais retenue
+            if row < len(self._lengths):
+                self._lengths[row] = 0
+
+    def _flush(self):
+        if self._hidden > len(self._row_ids) // 2:
+            opportunities, loaded = self._opportunities, self.loaded
+            self.__init__()
+            for opp_id, opportunity in opportunities.items():
+                self.upsert(opp_id, opportunity)
+            self.loaded = loaded
+        if not self._pending:
+            return
+        from scipy import sparse
+
+        if self._matrix is None:
+            self._matrix = sparse.csr_matrix((0, 0))
+        width = len(self._columns)
+        data, indices, indptr = [], [], [0]
+        for counts, _ in self._pending:
+            indices.extend(counts.keys())
+            data.extend(counts.values())
+            indptr.append(len(indices))
+        first_row = self._matrix.shape[0]
+        lengths = [
+            length if self._row_ids[first_row + offset] is not None else 0
+            for offset, (_, length) in enumerate(self._pending)
+        ]
+        new_rows = sparse.csr_matrix(
+            (np.array(data, dtype=np.float64), np.array(indices, dtype=np.int64), np.array(indptr)),
+            shape=(len(self._pending), width)
+        )
+        matrix = self._matrix
+        matrix.resize((matrix.shape[0], width))
+        self._matrix = sparse.vstack([matrix, new_rows], format='csr')
+        self._lengths = np.concatenate([self._lengths, np.array(lengths, dtype=np.float64)])
+        self._pending = []
+
+    def scores(self, validated_skills: dict) -> np.ndarray:
+        """Score de chaque ligne pour les compétences validées d'un étudiant"""
+        self._flush()
+        if self._matrix is None:
+            return np.zeros(0)
+        levels = np.zeros(len(self._columns))
+        for skill, level in validated_skills.items():
+            column = self._columns.get(skills_catalog.skill_key(skill))
+            if column is not None and isinstance(level, str):
+                levels[column] = LEVEL_BONUS.get(level, 0)
+        matched = self._matrix @ levels
+        return np.divide(matched, self._lengths, out=np.zeros_like(matched), where=self._lengths > 0)
+
+    def recommend(self, validated_skills: dict, threshold: float, limit: int = None, after: tuple = None) -> list:
+        """Opportunités au-dessus du seuil, triées par score décroissant puis par identifiant
+
+        `limit` : seules les `limit` premières sont triées (sélection partielle).
+        `after` (score, id) : seules celles classées après cette position.
+        """
+        scores = self.scores(validated_skills)
+        eligible = (scores > threshold) & (self._lengths > 0)
+        if after is not None:
+            after_score, after_id = after
+            eligible &= scores <= after_score
+            # Ex aequo du score du curseur : départage par identifiant
+            ties = np.flatnonzero(eligible & (scores == after_score))
+            eligible[ties] = [self._row_ids[row] > after_id for row in ties]
+        candidates = np.flatnonzero(eligible)
+        if limit is not None and len(candidates) > limit:
+            # Sélection partielle, en gardant les ex aequo du k-ième score
+            kth = np.partition(scores[candidates], len(candidates) - limit)[len(candidates) - limit]
+            candidates = candidates[scores[candidates] >= kth]
+        ranked = sorted(candidates, key=lambda row: (-scores[row], self._row_ids[row]))
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [
+            {**self._opportunities[self._row_ids[row]], 'match_score': float(scores[row])}
+            for row in ranked
+        ]
+
+
+opportunity_matrix = OpportunityMatrix()
+
+
+async def load_opportunity_matrix(opportunities: dict = None):
+    """Charge la matrice depuis la base, ou depuis `opportunities` déjà lues"""
+    try:
+        if opportunities is None:
+            opportunities = await repo.get("opportunities") or {}
+        opportunity_matrix.load(opportunities)
+    except Exception as e:
+        print(f"Erreur lors du chargement de la matrice des opportunités: {str(e)}")
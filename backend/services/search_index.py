@@ -0,0 +1,247 @@
+import heapq
+import math
+
+import numpy as np
+
+from database import repository as repo
+from services.skills_catalog import normalize_skill
+
+# Recherche plein texte des opportunités actives (index inversé en mémoire).
+#
+# Les termes (mots normalisés comme les compétences du catalogue) du titre,
+# de la description et des compétences sont pondérés par champ puis classés
+# par BM25. Chaque opportunité occupe une ligne ; les postings d'un terme
+# (lignes, fréquences) sont convertis en tableaux numpy à la première
+# recherche qui les utilise après modification, et le score de toutes les
+# lignes concernées est calculé en une opération vectorisée.
+# Chaque facette (type, lieu, télétravail) est un tableau de codes par ligne :
+# filtres et décomptes de facettes sont des masques et des bincount. Les
+# décomptes d'une facette ignorent son propre filtre (on voit combien de
+# résultats donnerait une autre valeur).
+#
+# Comme la matrice de recommandation, l'index est construit au démarrage puis
+# tenu à jour par on_opportunity_changed ; une opportunité clôturée en sort.
+# Les lignes libérées sont compactées lorsqu'elles deviennent majoritaires.
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Une occurrence dans le titre compte triple, dans les compétences requises double
+FIELD_WEIGHTS = {
+    'title': 3,
+    'required_skills': 2,
+    'preferred_skills': 1,
+    'description': 1
+}
+
+FACETS = ('type', 'location', 'remote_possible')
+
+STOP_WORDS = {
+    'au', 'aux', 'avec', 'ce', 'ces', 'dans', 'de', 'des', 'du', 'en', 'et', 'la', 'le', 'les',
+    'leur', 'ou', 'par', 'pas', 'pour', 'sa', 'se', 'ses', 'son', 'sur', 'un', 'une', 'vos', 'votre',
+    'the', 'and', 'of', 'to', 'in', 'for', 'with'
+}
+
+# Précision des scores renvoyés (et des curseurs de pagination)
+SCORE_DECIMALS = 6
+
+
+def tokenize(text: str) -> list:
+    return [word for word in normalize_skill(text or '').split() if len(word) > 1 and word not in STOP_WORDS]
+
+
+def facet_value(facet: str, value) -> str:
+    if facet == 'remote_possible':
+        return 'true' if value else 'false'
+    if facet == 'location':
+        return normalize_skill(value or '')
+    return str(value or '')
+
+
+class OpportunitySearchIndex:
+    def __init__(self):
+        self.loaded = False
+        self._opportunities = {}  # opp_id -> opportunité
+        self._rows = {}  # opp_id -> ligne
+        self._row_ids = []  # ligne -> opp_id (None si libérée)
+        self._terms_of = {}  # opp_id -> termes indexés
+        self._postings = {}  # terme -> {ligne: fréquence pondérée}
+        self._arrays = {}  # terme -> (lignes, fréquences) en tableaux, invalidé à la modification
+        self._lengths = np.zeros(0)
+        self._total_length = 0
+        self._codes = {facet: {} for facet in FACETS}  # facette -> valeur -> code
+        self._labels = {facet: [] for facet in FACETS}  # facette -> code -> libellé affiché
+        self._facet_rows = {facet: np.zeros(0, dtype=np.int32) for facet in FACETS}  # -1 si libérée
+
+    def load(self, opportunities: dict):
+        """(Re)construit l'index à partir de la collection opportunities"""
+        self.__init__()
+        for opp_id, opportunity in opportunities.items():
+            self.upsert(opp_id, opportunity or {})
+        self.loaded = True
+
+    def __len__(self):
+        return len(self._opportunities)
+
+    def _grow(self):
+        size = max(1024, 2 * len(self._lengths))
+        self._lengths = np.concatenate([self._lengths, np.zeros(size - len(self._lengths))])
+        for facet, codes in self._facet_rows.items():
+            self._facet_rows[facet] = np.concatenate([codes, np.full(size - len(codes), -1, dtype=np.int32)])
+
+    def _code(self, facet: str, value) -> int:
+        key = facet_value(facet, value)
+        code = self._codes[facet].get(key)
+        if code is None:
+            code = self._codes[facet][key] = len(self._labels[facet])
+            self._labels[facet].append(value if facet == 'location' and value else key)
+        return code
+
+    def upsert(self, opp_id: str, opportunity: dict):
+        """Ajoute ou remplace une opportunité (retirée si elle n'est plus active)"""
+        self.remove(opp_id)
+        if opportunity.get('status', 'active') != 'active':
+            return
+        row = len(self._row_ids)
+        if row >= len(self._lengths):
+            self._grow()
+        self._rows[opp_id] = row
+        self._row_ids.append(opp_id)
+        self._opportunities[opp_id] = opportunity
+
+        frequencies = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            value = opportunity.get(field) or ''
+            text = ' '.join(value) if isinstance(value, list) else str(value)
+            for term in tokenize(text):
+                frequencies[term] = frequencies.get(term, 0) + weight
+        for term, frequency in frequencies.items():
+            self._postings.setdefault(term, {})[row] = frequency
+            self._arrays.pop(term, None)
+        self._terms_of[opp_id] = list(frequencies)
+        length = sum(frequencies.values())
+        self._lengths[row] = length
+        self._total_length += length
+
+        for facet in FACETS:
+            self._facet_rows[facet][row] = self._code(facet, opportunity.get(facet))
+
+    def remove(self, opp_id: str):
+        row = self._rows.pop(opp_id, None)
+        if row is None:
+            return
+        del self._opportunities[opp_id]
+        self._row_ids[row] = None
+        for term in self._terms_of.pop(opp_id):
+            postings = self._postings[term]
+            del postings[row]
+            if not postings:
+                del self._postings[term]
+            self._arrays.pop(term, None)
+        self._total_length -= self._lengths[row]
+        self._lengths[row] = 0
+        for codes in self._facet_rows.values():
+            codes[row] = -1
+        if len(self._row_ids) > 1024 and len(self._rows) < len(self._row_ids) // 2:
+            self._compact()
+
+    def _compact(self):
+        opportunities, loaded = self._opportunities, self.loaded
+        self.load(opportunities)
+        self.loaded = loaded
+
+    def _term_arrays(self, term: str):
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            postings = self._postings[term]
+            arrays = self._arrays[term] = (
+                np.fromiter(postings.keys(), dtype=np.int64, count=len(postings)),
+                np.fromiter(postings.values(), dtype=np.float64, count=len(postings))
+            )
+        return arrays
+
+    def _scores(self, terms: list) -> np.ndarray:
+        """Score BM25 de chaque ligne (nul si elle ne contient aucun terme)"""
+        scores = np.zeros(len(self._row_ids))
+        count = len(self._opportunities)
+        if not count:
+            return scores
+        average_length = self._total_length / count
+        for term in terms:
+            if term not in self._postings:
+                continue
+            rows, frequencies = self._term_arrays(term)
+            idf = math.log(1 + (count - len(rows) + 0.5) / (len(rows) + 0.5))
+            norms = BM25_K1 * (1 - BM25_B + BM25_B * self._lengths[rows] / average_length)
+            # Une ligne apparaît au plus une fois par terme : l'addition indexée suffit
+            scores[rows] += idf * frequencies * (BM25_K1 + 1) / (frequencies + norms)
+        return np.round(scores, SCORE_DECIMALS)
+
+    def search(self, query: str = '', filters: dict = None, limit: int = 20, after: tuple = None):
+        """Top `limit` après la position (score, id) `after` ; retourne (résultats, total, facettes)
+
+        Sans terme de recherche, toutes les opportunités filtrées sont retenues
+        avec un score nul (classées par identifiant)."""
+        rows_count = len(self._row_ids)
+        facet_rows = {facet: codes[:rows_count] for facet, codes in self._facet_rows.items()}
+        terms = list(dict.fromkeys(tokenize(query)))
+        if terms:
+            scores = self._scores(terms)
+            matched = scores > 0
+        else:
+            scores = np.zeros(rows_count)
+            matched = facet_rows[FACETS[0]] >= 0
+
+        masks = {}
+        for facet, value in (filters or {}).items():
+            if value is not None and facet in FACETS:
+                masks[facet] = facet_rows[facet] == self._codes[facet].get(facet_value(facet, value), -2)
+
+        facets = {}
+        for facet in FACETS:
+            selected = matched
+            for other, mask in masks.items():
+                if other != facet:
+                    selected = selected & mask
+            counts = np.bincount(facet_rows[facet][selected], minlength=len(self._labels[facet]))
+            facets[facet] = {self._labels[facet][code]: int(counts[code]) for code in np.flatnonzero(counts)}
+
+        for mask in masks.values():
+            matched = matched & mask
+        candidates = np.flatnonzero(matched)
+        total = len(candidates)
+        if after is not None:
+            after_score, after_id = after
+            candidate_scores = scores[candidates]
+            ties = candidates[candidate_scores == after_score]
+            candidates = np.concatenate([
+                candidates[candidate_scores < after_score],
+                np.array([row for row in ties if self._row_ids[row] > after_id], dtype=np.int64)
+            ])
+        if len(candidates) > limit:
+            # Sélection partielle : les lignes au-dessus du k-ième score, puis
+            # les ex aequo de ce score départagés par identifiant
+            kth = -np.partition(-scores[candidates], limit - 1)[limit - 1]
+            above = candidates[scores[candidates] > kth]
+            ties = heapq.nsmallest(limit - len(above), candidates[scores[candidates] == kth],
+                                   key=self._row_ids.__getitem__)
+            candidates = np.concatenate([above, np.array(ties, dtype=np.int64)])
+        ranked = sorted(candidates, key=lambda row: (-scores[row], self._row_ids[row]))[:limit]
+        results = [
+            {**self._opportunities[self._row_ids[row]], 'id': self._row_ids[row], 'search_score': float(scores[row])}
+            for row in ranked
+        ]
+        return results, total, facets
+
+
+opportunity_search_index = OpportunitySearchIndex()
+
+
+async def load_opportunity_search_index(opportunities: dict = None):
+    """Charge l'index de recherche depuis la base, ou depuis `opportunities` déjà lues"""
+    try:
+        if opportunities is None:
+            opportunities = await repo.get("opportunities") or {}
+        opportunity_search_index.load(opportunities)
+    except Exception as e:
+        print(f"Erreur lors du chargement de l'index de recherche des opportunités: {str(e)}")
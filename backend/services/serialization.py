@@ -0,0 +1,115 @@
+import json
+import os
+from functools import lru_cache
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # dépendance optionnelle
+    orjson = None
+
+# Sérialisation rapide des réponses (option FAST_SERIALIZATION).
+#
+# Par défaut, une route renvoyant des enregistrements de la base les
+# revalide (Model(**record), puis response_model) et les encode avec
+# jsonable_encoder + json.dumps. Les enregistrements écrits par l'API ont
+# déjà été validés et stockés au format JSON du modèle : avec l'option, ils
+# sont seulement mis à la forme du modèle (champs connus, valeurs par défaut
+# des champs absents) par un plan calculé une fois par modèle, puis encodés
+# par orjson ; la route renvoie une Response prête, que FastAPI ne retraite
+# pas. model_construct n'est pas utilisé : avec pydantic 2.9, il coûte
+# autant que la validation. L'option active aussi ORJSONResponse comme
+# classe de réponse par défaut.
+
+FAST_SERIALIZATION = os.getenv("FAST_SERIALIZATION", "false").lower() == "true"
+
+_REQUIRED = object()
+
+
+def default_response_class():
+    """Classe de réponse par défaut de l'application"""
+    if FAST_SERIALIZATION and orjson is not None:
+        from fastapi.responses import ORJSONResponse
+        return ORJSONResponse
+    return JSONResponse
+
+
+@lru_cache(maxsize=None)
+def type_adapter(type_) -> TypeAdapter:
+    """TypeAdapter (validateur et sérialiseur compilés) mis en cache par type"""
+    return TypeAdapter(type_)
+
+
+@lru_cache(maxsize=None)
+def record_plan(model) -> tuple:
+    """(clé JSON, champ, défaut au format JSON) de chaque champ de `model`, calculés une fois par modèle"""
+    plan = []
+    for name, field in model.model_fields.items():
+        if field.is_required() or field.default_factory is not None:
+            default = _REQUIRED
+        else:
+            default = type_adapter(field.annotation).dump_python(field.default, mode="json")
+        plan.append((field.serialization_alias or field.alias or name, name, default))
+    return tuple(plan)
+
+
+def dump_record(model, record: dict) -> dict:
+    """Enregistrement de la base au format JSON de `model`, sans validation
+
+    Les champs inconnus sont écartés, les champs absents prennent leur valeur
+    par défaut ; un champ obligatoire absent est omis (comme model_construct).
+    """
+    content = {}
+    for key, name, default in record_plan(model):
+        if name in record:
+            content[key] = record[name]
+        elif default is not _REQUIRED:
+            content[key] = default
+        else:
+            field = model.model_fields[name]
+            if field.default_factory is not None:
+                content[key] = type_adapter(field.annotation).dump_python(field.default_factory(), mode="json")
+    return content
+
+
+def record_content(model, record: dict):
+    """Contenu de réponse pour un enregistrement : modèle validé, ou dict au format du modèle avec l'option"""
+    if FAST_SERIALIZATION:
+        return dump_record(model, record)
+    return model(**record)
+
+
+def dumps(content) -> bytes:
+    """JSON compact de données déjà sérialisables (dicts, listes, scalaires)"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=str).encode()
+
+
+def _json_body_response(body: bytes, response: Response = None) -> Response:
+    # Une Response renvoyée par la route remplace celle injectée : on reprend ses en-têtes (X-Next-Cursor)
+    headers = None
+    if response is not None:
+        headers = {name: value for name, value in response.headers.items() if name != "content-length"}
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def models_response(model, records: list, response: Response = None, fast: bool = None):
+    """Liste d'enregistrements de la base au format `List[model]`
+
+    Sans l'option : modèles validés, sérialisés ensuite par FastAPI
+    (response_model). Avec : Response JSON construite sans revalidation.
+    """
+    if not (FAST_SERIALIZATION if fast is None else fast):
+        return [model(**record) for record in records]
+    return _json_body_response(dumps([dump_record(model, record) for record in records]), response)
+
+
+def json_response(content, response: Response = None, fast: bool = None):
+    """Contenu JSON (dicts de la base) renvoyé sans passer par jsonable_encoder avec l'option"""
+    if not (FAST_SERIALIZATION if fast is None else fast):
+        return content
+    return _json_body_response(dumps(content), response)
@@ -0,0 +1,289 @@
+import os
+import re
+import time
+import unicodedata
+from collections import deque
+
+from classes.schemas_dto import CompetenceLevel
+from database import repository as repo
+from database.pagination import iter_collection
+from services.index_versions import index_versions
+
+# Catalogue des compétences en mémoire (skills_catalog/{catégorie}/{clé}).
+#
+# Chaque compétence a un nom canonique (champ `name`, sinon la clé) et des
+# alias. Les termes (noms et alias normalisés : minuscules, sans accents ni
+# ponctuation) alimentent :
+#  - un trie, indexé aussi à chaque début de mot ("marketing" trouve
+#    "digital marketing"), pour l'autocomplétion par préfixe ;
+#  - un index de trigrammes pour tolérer les fautes de frappe (similarité de
+#    Dice entre ensembles de trigrammes).
+# canonicalize() ramène un nom saisi librement au nom canonique, pour
+# normaliser les compétences à l'écriture (validations, opportunités).
+# skill_key() donne la clé de base de données d'une compétence (clé du
+# catalogue, sinon nom normalisé) : les noms canoniques ("UI/UX Design",
+# "Node.js") ne sont que des valeurs, jamais des segments de chemin. Les
+# comparaisons (correspondance étudiant/opportunité) se font sur cette clé.
+#
+# canonicalize_stored_skills() (python manage.py canonicalize-skills) applique
+# la même normalisation aux données écrites avant le catalogue.
+#
+# Chargé au démarrage et rechargé après une modification du catalogue (par
+# index_versions "skills_catalog", avec les index rangés par clé), sinon au
+# plus tard après CATALOG_REFRESH_INTERVAL secondes.
+
+CATALOG_REFRESH_INTERVAL = int(os.getenv("CATALOG_REFRESH_INTERVAL", "300"))
+
+# Taille du mémo de skill_key (noms saisis librement) ; vidé à chaque rechargement
+SKILL_KEYS_MAX = int(os.getenv("SKILL_KEYS_MAX", "50000"))
+
+# Similarité minimale d'un résultat approché
+FUZZY_MIN_SIMILARITY = 0.4
+
+# Scores : correspondance exacte > préfixe du terme > préfixe d'un mot > approchée
+EXACT_SCORE = 1.0
+PREFIX_SCORE = 0.9
+WORD_PREFIX_SCORE = 0.8
+FUZZY_SCORE = 0.7
+
+BACKFILL_CHUNK_SIZE = 500
+
+LEVEL_ORDER = [level.value for level in CompetenceLevel]
+
+
+def normalize_skill(value: str) -> str:
+    value = unicodedata.normalize("NFKD", value.lower())
+    value = "".join(char for char in value if not unicodedata.combining(char))
+    return " ".join(re.findall(r"[a-z0-9+#]+", value))
+
+
+def escape_skill_key(term: str) -> str:
+    # Les clés de la Realtime Database ne peuvent pas contenir . $ # [ ] / ;
+    # un terme normalisé ne garde que [a-z0-9+#] et des espaces
+    return term.replace("#", "sharp").replace(" ", "_")
+
+
+def _trigrams(term: str) -> set:
+    padded = f"  {term} "
+    return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+
+class SkillsCatalog:
+    def __init__(self):
+        self.loaded = False
+        self.loaded_at = 0.0
+        self.raw = {}  # catalogue tel que stocké (servi par /skills/catalog)
+        self._skills = {}  # id "catégorie/clé" -> fiche
+        self._ids_by_term = {}  # terme normalisé -> {id}
+        self._trie = {}  # caractère -> nœud ; "" -> {(terme, score)}
+        self._terms_by_trigram = {}  # trigramme -> {terme}
+        self._trigram_counts = {}  # terme -> nombre de trigrammes
+        self._keys = {}  # nom saisi -> clé (mémo de skill_key)
+
+    def load(self, catalog: dict):
+        """(Re)construit les index à partir du nœud skills_catalog"""
+        self.__init__()
+        self.raw = catalog
+        for category, skills in catalog.items():
+            for key, entry in (skills or {}).items():
+                self._add_skill(category, key, entry or {})
+        self.loaded = True
+        self.loaded_at = time.time()
+
+    @property
+    def stale(self) -> bool:
+        return not self.loaded or time.time() - self.loaded_at > CATALOG_REFRESH_INTERVAL
+
+    def _add_skill(self, category: str, key: str, entry: dict):
+        skill_id = f"{category}/{key}"
+        name = entry.get("name") or key.replace("_", " ")
+        self._skills[skill_id] = {
+            "key": key,
+            "name": name,
+            "category": entry.get("category", category),
+            "description": entry.get("description", ""),
+            "aliases": list(entry.get("aliases") or [])
+        }
+        values = [name, key.replace("_", " ")] + list(entry.get("aliases") or [])
+        for term in {normalize_skill(value) for value in values}:
+            if term:
+                self._add_term(term, skill_id)
+
+    def _add_term(self, term: str, skill_id: str):
+        is_new = term not in self._ids_by_term
+        self._ids_by_term.setdefault(term, set()).add(skill_id)
+        if not is_new:
+            return
+        words = term.split(" ")
+        for position in range(len(words)):
+            suffix = " ".join(words[position:])
+            node = self._trie
+            for char in suffix:
+                node = node.setdefault(char, {})
+            node.setdefault("", set()).add((term, PREFIX_SCORE if position == 0 else WORD_PREFIX_SCORE))
+        trigrams = _trigrams(term)
+        self._trigram_counts[term] = len(trigrams)
+        for trigram in trigrams:
+            self._terms_by_trigram.setdefault(trigram, set()).add(term)
+
+    def _prefix_terms(self, prefix: str, limit: int) -> dict:
+        node = self._trie
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return {}
+        # Parcours en largeur : les complétions les plus courtes d'abord
+        found, queue = {}, deque([node])
+        while queue and len(found) < limit:
+            current = queue.popleft()
+            for term, score in current.get("", ()):
+                found[term] = max(score, found.get(term, 0))
+            queue.extend(child for char, child in current.items() if char)
+        return found
+
+    def _fuzzy_terms(self, query: str) -> dict:
+        trigrams = _trigrams(query)
+        shared = {}
+        for trigram in trigrams:
+            for term in self._terms_by_trigram.get(trigram, ()):
+                shared[term] = shared.get(term, 0) + 1
+        found = {}
+        for term, count in shared.items():
+            similarity = 2 * count / (len(trigrams) + self._trigram_counts[term])
+            if similarity >= FUZZY_MIN_SIMILARITY:
+                found[term] = FUZZY_SCORE * similarity
+        return found
+
+    def search(self, query: str, limit: int = 10) -> list:
+        """Compétences correspondant au début saisi, avec tolérance aux fautes de frappe"""
+        term = normalize_skill(query)
+        if not term:
+            return []
+        scores = self._prefix_terms(term, limit * 4)
+        if term in self._ids_by_term:
+            scores[term] = EXACT_SCORE
+        if len(scores) < limit:
+            for fuzzy_term, score in self._fuzzy_terms(term).items():
+                scores[fuzzy_term] = max(score, scores.get(fuzzy_term, 0))
+
+        best = {}
+        for matched_term, score in scores.items():
+            for skill_id in self._ids_by_term[matched_term]:
+                if score > best.get(skill_id, 0):
+                    best[skill_id] = score
+        ranked = sorted(best.items(), key=lambda item: (-item[1], self._skills[item[0]]["name"]))
+        return [{**self._skills[skill_id], "score": round(score, 3)} for skill_id, score in ranked[:limit]]
+
+    def canonicalize(self, skill_name: str) -> str:
+        """Nom canonique d'une compétence (nom ou alias connu), sinon le nom nettoyé"""
+        cleaned = " ".join(skill_name.split())
+        skill_ids = self._ids_by_term.get(normalize_skill(cleaned))
+        if not skill_ids:
+            return cleaned
+        return self._skills[min(skill_ids)]["name"]
+
+    def skill_key(self, skill_name: str) -> str:
+        """Clé de base de données d'une compétence : clé du catalogue, sinon nom normalisé échappé
+
+        Idempotente : la clé d'une clé est elle-même.
+        """
+        key = self._keys.get(skill_name)
+        if key is None:
+            term = normalize_skill(skill_name)
+            skill_ids = self._ids_by_term.get(term)
+            key = self._skills[min(skill_ids)]["key"] if skill_ids else escape_skill_key(term)
+            if len(self._keys) >= SKILL_KEYS_MAX:
+                # Entrée la plus ancienne retirée : le mémo reste borné entre deux rechargements
+                del self._keys[next(iter(self._keys))]
+            self._keys[skill_name] = key
+        return key
+
+    def canonicalize_all(self, skill_names) -> list:
+        """Noms canoniques, dans l'ordre d'origine
+
+        Les doublons sont conservés : calculate_match_score compte chaque
+        occurrence, les dédoublonner changerait les scores.
+        """
+        return [canonical for canonical in map(self.canonicalize, skill_names or []) if canonical]
+
+    def keyed_skills(self, validated_skills: dict) -> dict:
+        """validated_skills rangées par clé, en gardant le meilleur niveau
+
+        Les entrées imbriquées ({"UI": {"UX Design": niveau}}, écrites avec un
+        nom contenant "/") sont ramenées au nom complet.
+        """
+        keyed = {}
+        stack = [("", validated_skills or {})]
+        while stack:
+            prefix, entries = stack.pop()
+            for name, level in entries.items():
+                if isinstance(level, dict):
+                    stack.append((f"{prefix}{name}/", level))
+                    continue
+                if level not in LEVEL_ORDER:
+                    continue
+                skill_key = self.skill_key(f"{prefix}{name}")
+                if LEVEL_ORDER.index(level) >= LEVEL_ORDER.index(keyed.get(skill_key, LEVEL_ORDER[0])):
+                    keyed[skill_key] = level
+        return keyed
+
+
+skills_catalog = SkillsCatalog()
+
+
+async def load_skills_catalog():
+    """Charge le catalogue depuis la base (au démarrage et après modification)"""
+    try:
+        skills_catalog.load(await repo.get("skills_catalog") or {})
+    except Exception as e:
+        print(f"Erreur lors du chargement du catalogue de compétences: {str(e)}")
+
+
+async def refresh_skills_catalog_if_stale():
+    if skills_catalog.stale:
+        await load_skills_catalog()
+
+
+async def canonicalize_stored_skills() -> dict:
+    """Normalise les compétences déjà stockées : validated_skills par clé, compétences des opportunités canoniques
+
+    N'écrit que les enregistrements modifiés ; retourne le nombre par collection.
+    """
+    await load_skills_catalog()
+    updated = {"students": 0, "opportunities": 0}
+    updates = {}
+
+    async def flush(force: bool = False):
+        nonlocal updates
+        if updates and (force or len(updates) >= BACKFILL_CHUNK_SIZE):
+            await repo.update("", updates)
+            updates = {}
+
+    async for student_id, student in iter_collection("students", page_size=BACKFILL_CHUNK_SIZE):
+        validated_skills = student.get("validated_skills") if isinstance(student, dict) else None
+        if not validated_skills:
+            continue
+        keyed = skills_catalog.keyed_skills(validated_skills)
+        if keyed != validated_skills:
+            updates[f"students/{student_id}/validated_skills"] = keyed
+            updated["students"] += 1
+            await flush()
+
+    async for opportunity_id, opportunity in iter_collection("opportunities", page_size=BACKFILL_CHUNK_SIZE):
+        if not isinstance(opportunity, dict):
+            continue
+        changed = False
+        for field in ("required_skills", "preferred_skills"):
+            skills = opportunity.get(field)
+            canonical = skills_catalog.canonicalize_all(skills)
+            if skills and canonical != skills:
+                updates[f"opportunities/{opportunity_id}/{field}"] = canonical
+                changed = True
+        updated["opportunities"] += changed
+        await flush()
+    # Index en mémoire des instances en cours d'exécution rechargés
+    changed = [name for name, count in updated.items() if count]
+    if changed:
+        updates.update(index_versions.bump(*changed))
+    await flush(force=True)
+    return updated
@@ -0,0 +1,208 @@
+import asyncio
+import csv
+import hashlib
+import json
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import islice
+
+from pydantic import ValidationError
+
+from classes.schemas_dto import StudentCreate
+from database import repository as repo
+from database.firebase import get_admin_auth
+
+# Inscription groupée des étudiants d'une école depuis un CSV (colonnes de
+# StudentCreate).
+#
+# Les comptes Firebase Auth sont créés par auth.import_users, par lots d'au
+# plus 1000, avec des mots de passe hachés localement en PBKDF2-SHA256 (dans
+# un pool de threads). Si l'import n'est pas possible (droits, émulateur), le
+# lot et les suivants passent par auth.create_user dans un pool de threads
+# borné. Les fiches students/ et users/ sont écrites en mises à jour
+# multi-chemins de ONBOARDING_WRITE_CHUNK étudiants.
+#
+# L'uid est dérivé de l'email : relancer un lot interrompu réécrit les mêmes
+# comptes au lieu d'en créer de nouveaux. Après chaque lot, le fichier de
+# résultats (une ligne par ligne du CSV) est complété et la progression
+# enregistrée ; une nouvelle exécution reprend après la dernière ligne traitée.
+
+ONBOARDING_BATCH_SIZE = int(os.getenv("ONBOARDING_BATCH_SIZE", "1000"))
+ONBOARDING_WORKERS = int(os.getenv("ONBOARDING_WORKERS", "8"))
+ONBOARDING_PBKDF2_ROUNDS = int(os.getenv("ONBOARDING_PBKDF2_ROUNDS", "10000"))
+ONBOARDING_WRITE_CHUNK = 500
+
+# Limite de auth.import_users
+IMPORT_USERS_MAX = 1000
+
+MODES = ("auto", "import", "create")
+RESULT_COLUMNS = ["row", "email", "status", "uid", "error"]
+
+_UID_NAMESPACE = uuid.UUID("5f1b6f0e-8d2a-4c1e-9a57-3c2f7d4b8e10")
+
+
+def student_uid(email: str) -> str:
+    return str(uuid.uuid5(_UID_NAMESPACE, email.strip().lower()))
+
+
+def hash_password(password: str, salt: bytes) -> bytes:
+    return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, ONBOARDING_PBKDF2_ROUNDS)
+
+
+def load_progress(progress_path: str, source: str) -> dict:
+    """Progression enregistrée pour `source` (lignes déjà traitées et totaux)"""
+    try:
+        with open(progress_path, encoding="utf-8") as progress_file:
+            progress = json.load(progress_file)
+    except FileNotFoundError:
+        return {"rows_done": 0, "created": 0, "failed": 0}
+    if progress.get("source") != source:
+        raise ValueError(f"{progress_path} correspond à un autre fichier ({progress.get('source')})")
+    return progress
+
+
+def save_progress(progress_path: str, source: str, progress: dict):
+    temporary_path = f"{progress_path}.tmp"
+    with open(temporary_path, "w", encoding="utf-8") as progress_file:
+        json.dump({**progress, "source": source, "updated_at": datetime.now().isoformat()}, progress_file)
+    os.replace(temporary_path, progress_path)
+
+
+def _import_accounts(auth, students: list, executor: ThreadPoolExecutor) -> list:
+    """Crée les comptes par auth.import_users ; retourne l'erreur de chaque étudiant (ou None)"""
+    errors = []
+    for start in range(0, len(students), IMPORT_USERS_MAX):
+        chunk = students[start:start + IMPORT_USERS_MAX]
+        salts = [os.urandom(16) for _ in chunk]
+        hashes = list(executor.map(hash_password, [student.password for _, student in chunk], salts))
+        records = [
+            auth.ImportUserRecord(
+                uid=uid,
+                email=student.email,
+                display_name=f"{student.first_name} {student.last_name}",
+                password_hash=password_hash,
+                password_salt=salt
+            )
+            for (uid, student), password_hash, salt in zip(chunk, hashes, salts)
+        ]
+        result = auth.import_users(
+            records, hash_alg=auth.UserImportHash.pbkdf2_sha256(rounds=ONBOARDING_PBKDF2_ROUNDS)
+        )
+        reasons = {error.index: error.reason for error in result.errors}
+        errors.extend(reasons.get(index) for index in range(len(chunk)))
+    return errors
+
+
+def _create_accounts(auth, students: list, executor: ThreadPoolExecutor) -> list:
+    """Crée les comptes un par un dans le pool de threads ; retourne l'erreur de chaque étudiant (ou None)"""
+    def create(entry):
+        uid, student = entry
+        try:
+            auth.create_user(
+                uid=uid,
+                email=student.email,
+                password=student.password,
+                display_name=f"{student.first_name} {student.last_name}"
+            )
+        except auth.UidAlreadyExistsError:
+            pass  # Créé par une exécution interrompue
+        except Exception as e:
+            return str(e)
+        return None
+
+    return list(executor.map(create, students))
+
+
+async def _save_profiles(students: list):
+    now = datetime.now().isoformat()
+    for start in range(0, len(students), ONBOARDING_WRITE_CHUNK):
+        updates = {}
+        for uid, student in students[start:start + ONBOARDING_WRITE_CHUNK]:
+            student_dict = student.dict()
+            del student_dict['password']  # Ne pas stocker le mot de passe
+            student_dict.update(id=uid, user_type='student', created_at=now)
+            updates[f"students/{uid}"] = student_dict
+            updates[f"users/{uid}"] = {"email": student.email, "user_type": "student", "profile_complete": False}
+        await repo.update("", updates)
+
+
+def _validate(row: dict):
+    try:
+        return StudentCreate.model_validate({key: value for key, value in row.items() if key and value != ""}), None
+    except ValidationError as e:
+        return None, "; ".join(
+            f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}" for detail in e.errors()
+        )
+
+
+async def onboard_students(csv_path: str, results_path: str, progress_path: str = None,
+                           batch_size: int = ONBOARDING_BATCH_SIZE, workers: int = ONBOARDING_WORKERS,
+                           mode: str = "auto", restart: bool = False) -> dict:
+    """Inscrit les étudiants du CSV ; retourne les totaux (lignes, créés, en échec)"""
+    source = os.path.abspath(csv_path)
+    progress_path = progress_path or f"{results_path}.progress.json"
+    progress = {"rows_done": 0, "created": 0, "failed": 0} if restart else load_progress(progress_path, source)
+    auth = get_admin_auth()
+
+    write_header = restart or not os.path.exists(results_path) or os.path.getsize(results_path) == 0
+    with open(csv_path, newline="", encoding="utf-8-sig") as source_file, \
+            open(results_path, "w" if restart else "a", newline="", encoding="utf-8") as results_file, \
+            ThreadPoolExecutor(max_workers=workers) as executor:
+        results = csv.writer(results_file)
+        if write_header:
+            results.writerow(RESULT_COLUMNS)
+        rows = enumerate(csv.DictReader(source_file), start=1)
+        # Reprise : les lignes déjà traitées sont sautées, leurs emails comptent pour les doublons
+        seen = {
+            (row.get("email") or "").strip().lower()
+            for _, row in islice(rows, progress["rows_done"])
+        }
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            outcomes, students = {}, []
+            for row_number, row in batch:
+                student, error = _validate(row)
+                if error is None and student.email.strip().lower() in seen:
+                    error = "Email en double dans le fichier"
+                if error is not None:
+                    outcomes[row_number] = (row.get("email", ""), "failed", "", error)
+                    continue
+                seen.add(student.email.strip().lower())
+                students.append((row_number, student_uid(student.email), student))
+
+            entries = [(uid, student) for _, uid, student in students]
+            errors = []
+            if entries and mode in ("auto", "import"):
+                try:
+                    errors = await asyncio.to_thread(_import_accounts, auth, entries, executor)
+                except Exception as e:
+                    if mode == "import":
+                        raise
+                    print(f"import_users indisponible, création compte par compte: {str(e)}")
+                    mode = "create"
+            if entries and mode == "create":
+                errors = await asyncio.to_thread(_create_accounts, auth, entries, executor)
+
+            created = []
+            for (row_number, uid, student), error in zip(students, errors):
+                if error:
+                    outcomes[row_number] = (student.email, "failed", uid, error)
+                else:
+                    created.append((uid, student))
+                    outcomes[row_number] = (student.email, "created", uid, "")
+            # Une écriture en échec interrompt l'exécution sans enregistrer le lot : la reprise le rejoue
+            await _save_profiles(created)
+
+            for row_number, _ in batch:
+                results.writerow([row_number, *outcomes[row_number]])
+            results_file.flush()
+            progress["rows_done"] += len(batch)
+            progress["created"] += len(created)
+            progress["failed"] += len(batch) - len(created)
+            save_progress(progress_path, source, progress)
+            print(f"{progress['rows_done']} lignes traitées ({progress['created']} créés, {progress['failed']} en échec)")
+    return progress
@@ -0,0 +1,75 @@
+import asyncio
+
+from database import repository as repo
+from services.skills_catalog import skills_catalog
+
+# Index inversé en mémoire : compétence validée -> étudiants (avec leur niveau).
+# Sert à retrouver les étudiants concernés par une opportunité sans parcourir
+# toute la collection students : le coût dépend du nombre de candidats.
+#
+# Comme l'index d'expertise, il est propre au processus : construit au
+# démarrage puis tenu à jour par validate_skill. Les compétences y sont
+# rangées par clé (skills_catalog.skill_key), quelle que soit la forme
+# stockée ("python", "Python", "python3").
+
+
+class StudentSkillIndex:
+    def __init__(self):
+        self.loaded = False
+        self._students_by_skill = {}  # clé de compétence -> {student_id: niveau}
+        self._skills_by_student = {}  # student_id -> {clé de compétence: niveau}
+
+    def load(self, students: dict):
+        """(Re)construit l'index à partir de la collection students"""
+        self.__init__()
+        for student_id, student_data in students.items():
+            self.set_student(student_id, (student_data or {}).get('validated_skills') or {})
+        self.loaded = True
+
+    def set_student(self, student_id: str, validated_skills: dict):
+        """Remplace l'ensemble des compétences validées d'un étudiant"""
+        self.remove_student(student_id)
+        for skill_name, level in validated_skills.items():
+            if isinstance(level, str):
+                self.set_skill(student_id, skill_name, level)
+
+    def set_skill(self, student_id: str, skill_name: str, level: str):
+        skill_key = skills_catalog.skill_key(skill_name)
+        self._students_by_skill.setdefault(skill_key, {})[student_id] = level
+        self._skills_by_student.setdefault(student_id, {})[skill_key] = level
+
+    def remove_student(self, student_id: str):
+        for skill_name in self._skills_by_student.pop(student_id, {}):
+            students = self._students_by_skill[skill_name]
+            students.pop(student_id, None)
+            if not students:
+                del self._students_by_skill[skill_name]
+
+    def candidates(self, skill_names) -> dict:
+        """Étudiants ayant au moins une des compétences, avec leurs compétences validées (par clé)"""
+        candidates = {}
+        for skill_key in {skills_catalog.skill_key(skill_name) for skill_name in skill_names}:
+            for student_id in self._students_by_skill.get(skill_key, ()):
+                candidates[student_id] = self._skills_by_student[student_id]
+        return candidates
+
+
+student_skill_index = StudentSkillIndex()
+
+
+async def load_student_skill_index():
+    """Charge l'index depuis la base (au démarrage de l'application)"""
+    try:
+        students = await repo.get("students") or {}
+        student_skill_index.load(students)
+    except Exception as e:
+        print(f"Erreur lors du chargement de l'index des compétences étudiants: {str(e)}")
+
+
+async def apply_student_changes(student_ids: list):
+    """Relit les compétences validées des étudiants modifiés par une autre instance"""
+    validated = await asyncio.gather(*(
+        repo.get(f"students/{student_id}/validated_skills") for student_id in student_ids
+    ))
+    for student_id, validated_skills in zip(student_ids, validated):
+        student_skill_index.set_student(student_id, validated_skills or {})
@@ -0,0 +1,96 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+
+# Cache LRU des jetons Firebase déjà vérifiés.
+# Évite, pour un même jeton, la vérification de signature et la lecture de
+# users/{uid} à chaque requête authentifiée. Une révocation n'est donc vue
+# qu'à l'expiration de l'entrée (TOKEN_CACHE_TTL, au plus l'exp du jeton),
+# sauf sur les routes vérifiées (get_current_user_checked), qui retirent tous
+# les jetons de l'utilisateur (evict_uid).
+
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+TOKEN_CACHE_TTL = int(os.getenv("TOKEN_CACHE_TTL", "300"))
+
+
+def _token_key(token: str) -> str:
+    # On ne garde jamais le jeton en clair comme clé
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class TokenCache:
+    def __init__(self, max_size: int = TOKEN_CACHE_SIZE, ttl: int = TOKEN_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # clé -> (expiration, utilisateur)
+        self._keys_by_uid = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, token: str):
+        """Retourne l'utilisateur associé au jeton, ou None si absent/expiré"""
+        key = _token_key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, user = entry
+        if time.time() >= expires_at:
+            self._discard(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return dict(user)
+
+    def put(self, token: str, user: dict, token_exp: float = None):
+        """Mémorise un utilisateur jusqu'à min(exp du jeton, maintenant + TTL)"""
+        expires_at = time.time() + self.ttl
+        if token_exp is not None:
+            expires_at = min(expires_at, float(token_exp))
+        key = _token_key(token)
+        self._discard(key)
+        self._entries[key] = (expires_at, dict(user))
+        self._keys_by_uid.setdefault(user.get('uid'), []).append(key)
+        while len(self._entries) > self.max_size:
+            oldest = next(iter(self._entries))
+            self._discard(oldest)
+            self.evictions += 1
+
+    def evict(self, token: str):
+        """Retire un jeton du cache"""
+        self._discard(_token_key(token))
+
+    def evict_uid(self, uid: str):
+        """Retire tous les jetons d'un utilisateur (révocation, désactivation)"""
+        for key in self._keys_by_uid.pop(uid, []):
+            self._entries.pop(key, None)
+
+    def _discard(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        uid = entry[1].get('uid')
+        keys = self._keys_by_uid.get(uid)
+        if keys is not None:
+            if key in keys:
+                keys.remove(key)
+            if not keys:
+                del self._keys_by_uid[uid]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+token_cache = TokenCache()
@@ -0,0 +1,77 @@
+"""Application de test : base SQLite temporaire, jeu synthétique réduit, jetons préchargés.
+
+Firebase n'est pas utilisé : les routes tournent sur SQLiteStore et
+l'authentification passe par le cache de jetons (comme benchmarks.bench_endpoints).
+"""
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+
+os.environ.setdefault("STORAGE_BACKEND", "sqlite")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks.datagen import Scale, generate, load
+from database import repository
+from database.sqlite_store import SQLiteStore
+from services.expertise_index import domain_matches
+from services.token_cache import token_cache
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "bench: mesures de performance (processus neufs, quelques secondes)")
+
+
+TEST_SCALE = Scale(students=200, professionals=40, companies=10, validations=1000, opportunities=200)
+
+
+@pytest.fixture(scope="session")
+def dataset():
+    directory = tempfile.mkdtemp(prefix="studyconnect-tests-")
+    repository.configure(SQLiteStore(os.path.join(directory, "tests.db")))
+    data = generate(TEST_SCALE, seed=7)
+    asyncio.run(load(data))
+    yield data
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def client(dataset):
+    import main
+    from routers.router_auth import get_current_user, get_current_user_checked
+
+    # Pas de vérification de révocation auprès de Firebase : le cache de jetons fait foi
+    main.app.dependency_overrides[get_current_user_checked] = get_current_user
+    with TestClient(main.app) as test_client:
+        yield test_client
+    main.app.dependency_overrides.clear()
+
+
+def _busiest_professional(dataset: dict) -> str:
+    """Professionnel ayant le plus de demandes en attente dans ses domaines"""
+    pending = [validation["skill_name"] for validation in dataset["skill_validations"].values()
+               if validation["status"] == "en_attente"]
+    return max(dataset["professionals"], key=lambda uid: sum(
+        any(domain_matches(domain, skill) for domain in dataset["professionals"][uid]["expertise_domains"])
+        for skill in pending
+    ))
+
+
+@pytest.fixture(scope="session")
+def headers(dataset):
+    """Type d'utilisateur -> en-têtes d'un utilisateur existant du jeu de données"""
+    result = {}
+    for user_type, collection in (("student", "students"), ("professional", "professionals"),
+                                  ("company", "companies")):
+        if user_type == "professional":
+            uid = _busiest_professional(dataset)
+        else:
+            uid = next(iter(dataset[collection]))
+        token = f"test-{uid}"
+        token_cache.put(token, {"uid": uid, "user_type": user_type, **dataset["users"][uid]})
+        result[user_type] = {"Authorization": f"Bearer {token}"}
+    return result
@@ -0,0 +1,129 @@
+from database import repository as repo
+from database.tracing import assert_call_budget
+from services.token_cache import token_cache
+
+OPPORTUNITY_ID = "applications-test-opportunity"
+
+
+def _student_headers(dataset: dict, count: int) -> list:
+    result = []
+    for uid in list(dataset["students"])[:count]:
+        token = f"test-applications-{uid}"
+        token_cache.put(token, {"uid": uid, "user_type": "student", **dataset["users"][uid]})
+        result.append({"Authorization": f"Bearer {token}"})
+    return result
+
+
+def _counts(client, headers) -> dict:
+    response = client.get(f"/applications/opportunity/{OPPORTUNITY_ID}/counts", headers=headers["company"])
+    assert response.status_code == 200
+    return response.json()
+
+
+def _listed(client, headers, status: str) -> list:
+    # Opportunité puis partition du statut : pas de lecture par candidature
+    with assert_call_budget(max_calls=2, allow_collection_reads=False):
+        response = client.get(f"/applications/opportunity/{OPPORTUNITY_ID}",
+                              params={"status": status, "limit": 100}, headers=headers["company"])
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_bulk_status_moves_partitions_and_counts(client, dataset, headers):
+    company_id = next(iter(dataset["companies"]))
+    client.portal.call(repo.set, f"opportunities/{OPPORTUNITY_ID}", {
+        "id": OPPORTUNITY_ID, "company_id": company_id, "title": "Stage test", "description": "Candidatures",
+        "type": "stage", "required_skills": [], "preferred_skills": [], "status": "active",
+        "applications_count": 0, "views_count": 0, "created_at": "2026-01-01T00:00:00"
+    })
+    students = _student_headers(dataset, 4)
+    application_ids = []
+    for student in students:
+        response = client.post("/applications", headers=student, json={
+            "opportunity_id": OPPORTUNITY_ID, "cover_letter": "Motivé"
+        })
+        assert response.status_code == 201
+        application_ids.append(response.json()["id"])
+    duplicate = client.post("/applications", headers=students[0], json={
+        "opportunity_id": OPPORTUNITY_ID, "cover_letter": "Encore"
+    })
+    assert duplicate.status_code == 409
+
+    assert _counts(client, headers)["by_status"]["envoyée"] == 4
+    listed = _listed(client, headers, "envoyée")
+    assert sorted(application["id"] for application in listed) == sorted(application_ids)
+    # Plus récentes en premier
+    assert [application["applied_at"] for application in listed] == \
+        sorted((application["applied_at"] for application in listed), reverse=True)
+
+    # Liste explicite : les identifiants absents de la partition sont ignorés
+    response = client.post(f"/applications/opportunity/{OPPORTUNITY_ID}/bulk-status", headers=headers["company"], json={
+        "from_status": "envoyée", "to_status": "vue",
+        "application_ids": application_ids[:2] + ["inconnue"], "company_feedback": "Lu"
+    })
+    assert response.json() == {"updated": 2, "skipped": ["inconnue"]}
+    counts = _counts(client, headers)
+    assert counts["total"] == 4
+    assert counts["by_status"]["envoyée"] == 2 and counts["by_status"]["vue"] == 2
+    seen = _listed(client, headers, "vue")
+    assert sorted(application["id"] for application in seen) == sorted(application_ids[:2])
+    assert {application["status"] for application in seen} == {"vue"}
+    assert {application["company_feedback"] for application in seen} == {"Lu"}
+    assert all(application["cover_letter"] == "Motivé" for application in seen)
+
+    # Sans liste : toute la partition
+    response = client.post(f"/applications/opportunity/{OPPORTUNITY_ID}/bulk-status", headers=headers["company"], json={
+        "from_status": "envoyée", "to_status": "refusée"
+    })
+    assert response.json() == {"updated": 2, "skipped": []}
+    counts = _counts(client, headers)
+    assert counts["by_status"] == {"envoyée": 0, "vue": 2, "en_cours": 0, "acceptée": 0, "refusée": 2}
+    assert _listed(client, headers, "envoyée") == []
+
+    # Candidature et copie de l'étudiant à jour
+    detail = client.get(f"/applications/{application_ids[0]}", headers=students[0]).json()
+    assert detail["status"] == "vue" and detail["company_feedback"] == "Lu"
+    mine = client.get("/applications/mine", headers=students[0], params={"limit": 100}).json()
+    assert {application["id"]: application["status"] for application in mine}[application_ids[0]] == "vue"
+
+    # Statut inchangé : la copie de la partition suit les autres champs
+    response = client.patch(f"/applications/{application_ids[0]}/status", headers=headers["company"], json={
+        "status": "vue", "interview_date": "2026-03-01T10:00:00"
+    })
+    assert response.status_code == 200
+    interview = {application["id"]: application for application in _listed(client, headers, "vue")}
+    assert interview[application_ids[0]]["interview_date"] == "2026-03-01T10:00:00"
+
+    same = client.post(f"/applications/opportunity/{OPPORTUNITY_ID}/bulk-status", headers=headers["company"], json={
+        "from_status": "vue", "to_status": "vue"
+    })
+    assert same.status_code == 400
+
+
+def test_legacy_partition_entries_are_read_in_full(client, headers):
+    application = client.portal.call(repo.get, f"applications_by_opportunity/{OPPORTUNITY_ID}/vue")
+    application_id, entry = next(iter(application.items()))
+    # Résumé écrit avant COMPANY_VIEW_FIELDS
+    client.portal.call(repo.set, f"applications_by_opportunity/{OPPORTUNITY_ID}/vue/{application_id}",
+                       {"student_id": entry["student_id"], "applied_at": entry["applied_at"]})
+    response = client.get(f"/applications/opportunity/{OPPORTUNITY_ID}",
+                          params={"status": "vue", "limit": 100}, headers=headers["company"])
+    listed = {application["id"]: application for application in response.json()}
+    assert listed[application_id]["cover_letter"] == "Motivé"
+    assert listed[application_id]["status"] == "vue"
+
+
+def test_pending_backfill_rebuilds_legacy_summaries(client):
+    from database.backfills import run_pending_backfills
+
+    async def scenario():
+        # Base où seule la première révision de la reconstruction des candidatures a tourné
+        await repo.set("backfills", {name: "2026-01-01" for name in (
+            "validations", "opportunities", "notifications", "professional_stats", "applications"
+        )})
+        pending = await run_pending_backfills()
+        return pending, await repo.get(f"applications_by_opportunity/{OPPORTUNITY_ID}/vue")
+
+    pending, entries = client.portal.call(scenario)
+    assert pending == ["applications"]
+    assert all(entry["cover_letter"] == "Motivé" and entry["status"] == "vue" for entry in entries.values())
@@ -0,0 +1,121 @@
+"""Budgets d'appels à la base des principaux endpoints (database.tracing.assert_call_budget).
+
+Un dépassement signale une régression : boucle d'appels par élément (N+1)
+ou lecture d'une collection entière sur le chemin d'une requête.
+"""
+import pytest
+
+from database.tracing import assert_call_budget
+from services.expertise_index import domain_matches
+
+READ_ENDPOINTS = [
+    ("student", "/auth/me", 0),
+    ("student", "/students/profile", 1),
+    ("student", "/skills/my-validations?limit=20", 3),
+    ("student", "/auth/my-validations?limit=20", 3),
+    ("student", "/matching/recommendations?limit=20", 2),
+    ("student", "/matching/search?q=développeur python&type=stage&limit=20", 0),
+    ("student", "/applications/mine?limit=20", 3),
+    ("student", "/skills/catalog", 1),
+    ("professional", "/professionals/profile", 1),
+    ("professional", "/skills/pending-validations?limit=20", 8),
+    ("professional", "/professionals/validation-stats", 2),
+    ("company", "/companies/profile", 1),
+    ("company", "/companies/opportunities?limit=20", 1),
+]
+
+
+@pytest.mark.parametrize("user_type,url,max_calls", READ_ENDPOINTS)
+def test_read_endpoint_call_budget(client, headers, user_type, url, max_calls):
+    with assert_call_budget(max_calls=max_calls, allow_collection_reads=False):
+        response = client.get(url, headers=headers[user_type])
+    assert response.status_code == 200, response.text
+
+
+def test_pending_validations_pages_stay_within_budget(client, headers, dataset):
+    professional = client.get("/professionals/profile", headers=headers["professional"]).json()
+    expected = {
+        validation_id for validation_id, validation in dataset["skill_validations"].items()
+        if validation["status"] == "en_attente" and any(
+            domain_matches(domain, validation["skill_name"]) for domain in professional["expertise_domains"]
+        )
+    }
+    seen = set()
+    cursor = None
+    while True:
+        url = "/skills/pending-validations?limit=20" + (f"&cursor={cursor}" if cursor else "")
+        with assert_call_budget(max_calls=8, allow_collection_reads=False):
+            response = client.get(url, headers=headers["professional"])
+        assert response.status_code == 200, response.text
+        ids = [validation["id"] for validation in response.json()]
+        assert not seen & set(ids)
+        seen.update(ids)
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert expected <= seen
+
+
+def test_opportunity_detail_call_budget(client, headers, dataset):
+    opportunity_id = next(iter(dataset["opportunities"]))
+    with assert_call_budget(max_calls=2, allow_collection_reads=False):
+        response = client.get(f"/matching/opportunities/{opportunity_id}", headers=headers["student"])
+    assert response.status_code == 200, response.text
+
+
+def test_validation_request_call_budget(client, headers):
+    payload = {"skill_name": "Python", "level_claimed": "avancé",
+               "evidence_description": "Projets personnels et stage"}
+    with assert_call_budget(max_calls=6, allow_collection_reads=False):
+        response = client.post("/skills/validation-request", json=payload, headers=headers["student"])
+    assert response.status_code == 201, response.text
+
+
+def test_company_opportunities_pages_cover_the_company(client, headers, dataset):
+    company_id = next(iter(dataset["companies"]))
+    expected = {opportunity_id for opportunity_id, opportunity in dataset["opportunities"].items()
+                if opportunity["company_id"] == company_id}
+    seen, cursor = [], None
+    while True:
+        url = "/companies/opportunities?limit=7" + (f"&cursor={cursor}" if cursor else "")
+        with assert_call_budget(max_calls=1, allow_collection_reads=False):
+            response = client.get(url, headers=headers["company"])
+        assert response.status_code == 200, response.text
+        seen.extend(opportunity["id"] for opportunity in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == sorted(expected)
+
+
+def test_user_notifications_page_is_one_query(client):
+    from database.notifications import create_notifications, get_user_notifications
+
+    async def scenario():
+        await create_notifications(["test-user"], "info", "Bienvenue", key="test-welcome")
+        await create_notifications(["test-user"], "info", "Rappel", key="test-reminder")
+        with assert_call_budget(max_calls=1, allow_collection_reads=False):
+            return await get_user_notifications("test-user", limit=10)
+
+    notifications, next_cursor = client.portal.call(scenario)
+    assert [notification["message"] for notification in notifications] == ["Rappel", "Bienvenue"]
+    assert next_cursor is None
+
+
+def test_list_without_limit_or_cursor_returns_everything(client, headers, dataset):
+    company_id = next(iter(dataset["companies"]))
+    expected = sorted(opportunity_id for opportunity_id, opportunity in dataset["opportunities"].items()
+                      if opportunity["company_id"] == company_id)
+    with assert_call_budget(max_calls=1, allow_collection_reads=False):
+        response = client.get("/companies/opportunities", headers=headers["company"])
+    assert response.status_code == 200, response.text
+    assert [opportunity["id"] for opportunity in response.json()] == expected
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_search_type_filter(client, headers):
+    response = client.get("/matching/search?type=stage&limit=50", headers=headers["student"])
+    assert response.status_code == 200, response.text
+    results = response.json()["results"]
+    assert results
+    assert {opportunity["type"] for opportunity in results} == {"stage"}
@@ -0,0 +1,44 @@
+from database import repository as repo
+from services.counters import CounterBuffer
+
+
+def test_flush_writes_coalesced_increments(client):
+    buffer = CounterBuffer(batch_size=2)
+
+    async def scenario():
+        await repo.set("counter_tests/flush", {"a": 5})
+        for _ in range(3):
+            buffer.increment("counter_tests/flush/a")
+        buffer.increment("counter_tests/flush/b", 2)
+        buffer.increment("counter_tests/flush/c", 0)
+        written = await buffer.flush()
+        return written, await repo.get("counter_tests/flush")
+
+    written, stored = client.portal.call(scenario)
+    assert written == 2  # les deltas nuls ne sont pas écrits
+    assert stored == {"a": 8, "b": 2}
+    assert buffer.pending("counter_tests/flush/a") == 0
+    assert buffer.stats()["increments"] == 5
+
+
+def test_failed_flush_requeues_deltas(client, monkeypatch):
+    buffer = CounterBuffer()
+    update = repo.update
+
+    async def failing_update(path, data):
+        raise RuntimeError("base indisponible")
+
+    async def scenario():
+        buffer.increment("counter_tests/requeue/a", 2)
+        monkeypatch.setattr(repo, "update", failing_update)
+        failed_written = await buffer.flush()
+        buffer.increment("counter_tests/requeue/a")
+        monkeypatch.setattr(repo, "update", update)
+        written = await buffer.flush()
+        return failed_written, written, await repo.get("counter_tests/requeue/a")
+
+    failed_written, written, stored = client.portal.call(scenario)
+    assert failed_written == 0
+    assert buffer.failed == 1
+    assert written == 1
+    assert stored == 3
@@ -0,0 +1,63 @@
+"""Chaque requête triée envoyée à la Realtime Database a sa règle .indexOn (database.rules.json).
+
+Sans index, Firebase trie côté serveur sur toutes les données du nœud (et
+refuse les requêtes REST orderBy sur un champ non indexé).
+"""
+import json
+import os
+
+from database import repository as repo
+from database.applications import list_opportunity_applications, list_student_applications
+from database.notifications import get_user_notifications
+from database.opportunities import list_company_opportunities
+from database.pagination import iter_collection
+from database.validations import list_pending_validations, list_student_validations
+
+RULES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "database.rules.json")
+
+
+def _indexed(rules: dict, path: str, field: str) -> bool:
+    node = rules["rules"]
+    for part in path.strip("/").split("/"):
+        child = node.get(part)
+        if child is None:
+            child = next((value for key, value in node.items() if key.startswith("$")), None)
+        if child is None:
+            return False
+        node = child
+    return field in node.get(".indexOn", [])
+
+
+def test_ordered_queries_are_indexed(client, dataset, monkeypatch):
+    with open(RULES_PATH, encoding="utf-8") as rules_file:
+        rules = json.load(rules_file)
+    query = repo.query
+    queried = set()
+
+    async def recording_query(path, order_by=None, **kwargs):
+        queried.add((path, order_by))
+        return await query(path, order_by=order_by, **kwargs)
+
+    monkeypatch.setattr(repo, "query", recording_query)
+    company_id = next(iter(dataset["companies"]))
+    student_id = next(iter(dataset["students"]))
+    opportunity_id = next(iter(dataset["opportunities"]))
+
+    async def scenario():
+        for limit in (None, 5):
+            await list_company_opportunities(company_id, limit)
+            await get_user_notifications(student_id, limit=limit)
+            await list_student_validations(student_id, limit)
+            await list_pending_validations(lambda name: True, limit)
+            await list_student_applications(student_id, limit)
+            await list_opportunity_applications(opportunity_id, "envoyée", limit)
+        for path, field in (("opportunities", "created_at"), ("skill_validations", "created_at"),
+                            ("applications", "applied_at")):
+            async for _ in iter_collection(path, order_by=field, start_at="2026", page_size=5):
+                break
+
+    client.portal.call(scenario)
+    fields = {(path, order_by) for path, order_by in queried if order_by not in (None, "$key")}
+    assert len(fields) == 8
+    missing = [(path, field) for path, field in fields if not _indexed(rules, path, field)]
+    assert missing == []
@@ -0,0 +1,54 @@
+import csv
+import io
+import json
+
+import pytest
+
+from database import repository as repo
+from services.token_cache import token_cache
+
+
+@pytest.fixture(scope="module")
+def admin_headers(dataset):
+    token_cache.put("test-admin", {"uid": "admin", "user_type": "admin", "email": "admin@studyconnect.test"})
+    return {"Authorization": "Bearer test-admin"}
+
+
+def _since(stored: dict, field: str) -> str:
+    # Médiane des dates : une partie des éléments seulement est exportée
+    return sorted(row[field] for row in stored.values())[len(stored) // 2]
+
+
+def test_ndjson_export_streams_rows_since(client, admin_headers):
+    stored = client.portal.call(repo.get, "skill_validations")
+    since = _since(stored, "created_at")
+    expected = {key for key, row in stored.items() if row["created_at"] >= since}
+
+    with client.stream("GET", "/admin/export/validations", headers=admin_headers,
+                       params={"since": since}) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert response.headers["content-disposition"] == 'attachment; filename="validations.ndjson"'
+        rows = [json.loads(line) for line in response.iter_lines() if line]
+    assert {row["id"] for row in rows} == expected
+    assert 0 < len(rows) < len(stored)
+    # Ordre du champ de date
+    assert [row["created_at"] for row in rows] == sorted(row["created_at"] for row in rows)
+
+
+def test_csv_export_columns_and_rows(client, admin_headers):
+    stored = client.portal.call(repo.get, "opportunities")
+    response = client.get("/admin/export/opportunities", headers=admin_headers, params={"format": "csv"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == len(stored)
+    first = rows[0]
+    assert list(first)[0] == "id"
+    # Listes sérialisées en JSON dans la cellule
+    assert json.loads(first["required_skills"]) == stored[first["id"]]["required_skills"]
+
+
+def test_export_requires_admin_and_known_collection(client, headers, admin_headers):
+    assert client.get("/admin/export/opportunities", headers=headers["company"]).status_code == 403
+    assert client.get("/admin/export/users", headers=admin_headers).status_code == 404
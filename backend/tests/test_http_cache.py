@@ -0,0 +1,47 @@
+from database.tracing import assert_call_budget
+from services.http_cache import etag_matches
+
+
+def test_profile_revalidation_returns_304_without_db_read(client, headers):
+    first = client.get("/students/profile", headers=headers["student"])
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    with assert_call_budget(max_calls=0):
+        response = client.get("/students/profile", headers={**headers["student"], "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+
+    stale = client.get("/students/profile", headers={**headers["student"], "If-None-Match": '"autre"'})
+    assert stale.status_code == 200 and stale.headers["etag"] == etag
+
+
+def test_profile_update_changes_etag(client, headers):
+    profile = client.get("/students/profile", headers=headers["student"])
+    etag = profile.headers["etag"]
+    body = {field: value for field, value in profile.json().items()
+            if field in ("email", "first_name", "last_name", "school", "formation", "year_of_study")}
+    assert client.patch("/students/profile", headers=headers["student"],
+                        json={**body, "phone": "0600000000"}).status_code == 200
+
+    response = client.get("/students/profile", headers={**headers["student"], "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["phone"] == "0600000000"
+
+
+def test_catalog_etag_is_public(client, headers):
+    first = client.get("/skills/catalog", headers=headers["student"])
+    assert first.headers["cache-control"] == "public, max-age=300, must-revalidate"
+    response = client.get("/skills/catalog", headers={**headers["student"], "If-None-Match": f'W/{first.headers["etag"]}'})
+    assert response.status_code == 304
+
+
+def test_etag_matching():
+    assert etag_matches('"a", "b"', '"b"')
+    assert etag_matches('W/"b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"b"')
@@ -0,0 +1,91 @@
+import time
+
+from database import repository as repo
+from services import index_versions as index_versions_module
+from services.index_versions import INDEX_CHANGES_PATH, IndexVersions
+
+
+class Recorder:
+    def __init__(self):
+        self.reloads = 0
+        self.applied = []
+
+    def reload(self):
+        self.reloads += 1
+
+    async def apply(self, ids):
+        self.applied.append(ids)
+
+
+def _instance(name: str):
+    versions, recorder = IndexVersions(), Recorder()
+    versions.register(name, recorder.reload, on_changes=[recorder.apply])
+    return versions, recorder
+
+
+def test_changes_are_applied_by_id(client):
+    writer, own = _instance("test_changes")
+    reader, other = _instance("test_changes")
+
+    async def scenario():
+        await writer.sync()
+        await reader.sync()
+        await repo.update("", writer.bump("test_changes", ids=["b", "a"]))
+        await repo.update("", writer.bump("test_changes", ids=["a", "c"]))
+        return await reader.check(), await writer.check(), await reader.check()
+
+    reader_stale, writer_stale, again = client.portal.call(scenario)
+    assert reader_stale == ["test_changes"] and again == []
+    assert other.applied == [["a", "b", "c"]] and other.reloads == 0
+    # Écritures du processus : déjà appliquées, seulement comptées
+    assert writer_stale == ["test_changes"]
+    assert own.applied == [] and own.reloads == 0
+    assert reader.stats()["applied"] == {"test_changes": 3}
+
+
+def test_full_reload_fallbacks(client, monkeypatch):
+    writer, _ = _instance("test_fallbacks")
+    reader, other = _instance("test_fallbacks")
+
+    async def scenario():
+        await writer.sync()
+        await reader.sync()
+        # Entrée sans identifiants
+        await repo.update("", writer.bump("test_fallbacks"))
+        await reader.check()
+        # Écart trop grand
+        monkeypatch.setattr(index_versions_module, "INDEX_CHANGES_MAX_GAP", 2)
+        for index in range(3):
+            await repo.update("", writer.bump("test_fallbacks", ids=[str(index)]))
+        await reader.check()
+        # Entrée purgée avant lecture : l'écart n'est pas expliqué
+        await repo.update("", writer.bump("test_fallbacks", ids=["x"]))
+        monkeypatch.setattr(index_versions_module, "INDEX_CHANGES_RETENTION", -60)
+        assert await writer.prune() >= 1
+        await reader.check()
+
+    client.portal.call(scenario)
+    assert other.reloads == 3 and other.applied == []
+    assert client.portal.call(repo.get, f"{INDEX_CHANGES_PATH}/test_fallbacks") is None
+
+
+def test_opportunity_change_reaches_other_instance_indexes(client, dataset, headers):
+    import main
+    from services.recommender import opportunity_matrix
+    from services.search_index import opportunity_search_index
+
+    other = IndexVersions()
+    other.register("opportunities", main.load_opportunity_indexes, on_changes=[main.apply_opportunity_changes])
+    opportunity_id = next(iter(dataset["opportunities"]))
+    client.portal.call(other.sync)
+    # Écriture d'une autre instance (hors de ce processus) : base seule, index locaux inchangés
+    client.portal.call(repo.update, "", {
+        f"opportunities/{opportunity_id}/title": f"Référence unique {time.time_ns()}",
+        **IndexVersions().bump("opportunities", ids=[opportunity_id])
+    })
+    title = client.portal.call(repo.get, f"opportunities/{opportunity_id}/title")
+    assert opportunity_matrix.get(opportunity_id)["title"] != title
+    assert client.portal.call(other.check) == ["opportunities"]
+    assert other.stats()["reloads"] == {}
+    assert opportunity_matrix.get(opportunity_id)["title"] == title
+    assert opportunity_search_index.search(title, limit=1)[0][0]["id"] == opportunity_id
@@ -0,0 +1,85 @@
+import asyncio
+
+from services.job_queue import JobQueue
+
+
+def test_failing_job_is_retried_with_backoff(monkeypatch):
+    delays = []
+    sleep = asyncio.sleep
+
+    async def recorded_sleep(delay):
+        delays.append(delay)
+        await sleep(0)
+
+    monkeypatch.setattr(asyncio, "sleep", recorded_sleep)
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RuntimeError("indisponible")
+
+    queue = JobQueue(max_size=10, workers=1, max_retries=3, retry_delay=0.5)
+    asyncio.run(queue.submit(flaky))  # file arrêtée : exécution immédiate
+
+    assert len(attempts) == 3
+    assert delays == [0.5, 1.0]
+    assert (queue.retried, queue.completed, queue.failed) == (2, 1, 0)
+
+
+def test_job_failing_every_attempt_is_counted_as_failed():
+    async def broken():
+        raise RuntimeError("toujours en échec")
+
+    queue = JobQueue(max_size=10, workers=1, max_retries=2, retry_delay=0)
+    asyncio.run(queue.submit(broken))
+    assert (queue.retried, queue.completed, queue.failed) == (2, 0, 1)
+
+
+def test_full_queue_runs_the_job_inline():
+    async def scenario():
+        queue = JobQueue(max_size=1, workers=1, max_retries=0)
+        release = asyncio.Event()
+        done = []
+
+        async def blocking():
+            await release.wait()
+
+        async def quick(name):
+            done.append(name)
+
+        await queue.start()
+        await queue.submit(blocking)
+        await asyncio.sleep(0)  # le worker prend la tâche bloquante
+        assert await queue.submit(quick, "en file") is True
+        assert await queue.submit(quick, "immédiate") is False
+        assert done == ["immédiate"]
+        release.set()
+        await queue.stop()
+        return queue, done
+
+    queue, done = asyncio.run(scenario())
+    assert done == ["immédiate", "en file"]
+    assert queue.inline == 1
+
+
+def test_stop_drains_queued_jobs():
+    async def scenario():
+        queue = JobQueue(max_size=100, workers=2, max_retries=0)
+        done = []
+
+        async def job(index):
+            await asyncio.sleep(0.001)
+            done.append(index)
+
+        await queue.start()
+        for index in range(20):
+            await queue.submit(job, index)
+        await queue.stop()
+        return queue, done
+
+    queue, done = asyncio.run(scenario())
+    assert sorted(done) == list(range(20))
+    assert queue.completed == 20
+    assert not queue.running
+    assert queue.wait_time.buckets()[-1][1] == 20
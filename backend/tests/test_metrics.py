@@ -0,0 +1,51 @@
+from prometheus_client.parser import text_string_to_metric_families
+
+from services.metrics import METRICS_CONTENT_TYPE
+
+
+def _samples(client) -> dict:
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == METRICS_CONTENT_TYPE
+    return {family.name: family.samples for family in text_string_to_metric_families(response.text)}
+
+
+def _value(samples: list, name: str, **labels) -> float:
+    return sum(sample.value for sample in samples
+               if sample.name == name and all(sample.labels.get(key) == value for key, value in labels.items()))
+
+
+def test_metrics_exposition_format(client, headers):
+    before = _samples(client)
+    # Séries créées au démarrage pour chaque route déclarée, avec le gabarit de chemin
+    assert any(sample.labels.get("route") == "/applications/{application_id}"
+               for sample in before["studyconnect_http_request_duration_seconds"])
+
+    client.get("/students/profile", headers=headers["student"])
+    client.get("/applications/inconnue", headers=headers["student"])
+    client.get("/pas-de-route")
+    after = _samples(client)
+
+    requests = after["studyconnect_http_requests"]
+    assert _value(requests, "studyconnect_http_requests_total", method="GET", route="/students/profile", status="200") \
+        == _value(before["studyconnect_http_requests"], "studyconnect_http_requests_total",
+                  method="GET", route="/students/profile", status="200") + 1
+    assert _value(requests, "studyconnect_http_requests_total",
+                  method="GET", route="/applications/{application_id}", status="404") \
+        == _value(before["studyconnect_http_requests"], "studyconnect_http_requests_total",
+                  method="GET", route="/applications/{application_id}", status="404") + 1
+    assert _value(requests, "studyconnect_http_requests_total", route="<unmatched>", status="404") >= 1
+
+    duration = after["studyconnect_http_request_duration_seconds"]
+    buckets = [sample for sample in duration if sample.name.endswith("_bucket")
+               and sample.labels["route"] == "/students/profile" and sample.labels["method"] == "GET"]
+    assert buckets[-1].labels["le"] == "+Inf"
+    assert [sample.value for sample in buckets] == sorted(sample.value for sample in buckets)
+
+    # Appels à la base par opération et collection
+    assert _value(after["studyconnect_db_call_duration_seconds"], "studyconnect_db_call_duration_seconds_count",
+                  operation="get", collection="students") >= 1
+    assert "studyconnect_http_requests_in_progress" in after
+    assert "studyconnect_job_queue_depth" in after
+    assert {sample.labels["outcome"] for sample in after["studyconnect_jobs"]} == \
+        {"enqueued", "inline", "completed", "retried", "failed"}
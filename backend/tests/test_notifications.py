@@ -0,0 +1,36 @@
+import pytest
+
+from database import notifications
+from database import repository as repo
+
+
+def test_failed_batch_marks_its_recipients_and_retry_is_idempotent(client, monkeypatch):
+    monkeypatch.setattr(notifications, "NOTIFICATION_BATCH_SIZE", 2)  # un destinataire par lot
+    update = repo.update
+    calls = []
+
+    async def flaky_update(path, data):
+        calls.append(path)
+        if len(calls) == 2:
+            raise RuntimeError("écriture refusée")
+        return await update(path, data)
+
+    monkeypatch.setattr(repo, "update", flaky_update)
+    recipients = ["notif-a", "notif-b", "notif-c"]
+    results = client.portal.call(
+        lambda: notifications.create_notifications(recipients, "info", "Message", key="test-retry")
+    )
+    assert results["notif-b"] is None
+    assert results["notif-a"] and results["notif-c"]
+    with pytest.raises(notifications.NotificationDeliveryError):
+        notifications.require_delivered(results)
+
+    monkeypatch.setattr(repo, "update", update)
+    retried = client.portal.call(
+        lambda: notifications.create_notifications(recipients, "info", "Message", key="test-retry")
+    )
+    assert notifications.require_delivered(retried) == 3
+    assert retried["notif-a"] == results["notif-a"]
+    for recipient_id in recipients:
+        entries, _ = client.portal.call(notifications.get_user_notifications, recipient_id)
+        assert [entry["id"] for entry in entries] == [retried[recipient_id]]
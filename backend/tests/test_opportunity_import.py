@@ -0,0 +1,94 @@
+import json
+
+from database import repository as repo
+from routers import router_matching
+from services import opportunity_import
+
+VALID = {
+    "title": "Stage data", "type": "stage", "description": "Analyse de données",
+    "required_skills": ["python3", "SQL"], "location": "Paris"
+}
+
+
+def _import(client, headers, content: str, filename: str, **params):
+    return client.post("/matching/opportunities/import", headers=headers["company"], params=params,
+                       files={"file": (filename, content.encode(), "application/octet-stream")})
+
+
+def test_ndjson_report_lists_invalid_rows(client, dataset, headers):
+    content = "\n".join([
+        json.dumps(VALID),
+        "",
+        "{pas du json",
+        json.dumps(["liste"]),
+        json.dumps({**VALID, "type": "inconnu"}),
+        json.dumps({**VALID, "title": "Autre stage", "company_id": "usurpé"}),
+    ])
+    report = _import(client, headers, content, "offres.ndjson").json()
+    assert report["format"] == "ndjson"
+    assert report["rows"] == 5  # ligne vide ignorée
+    assert report["created"] == 2 and report["failed"] == 3
+    assert report["last_row"] == 6
+    assert [error["row"] for error in report["errors"]] == [3, 4, 5]
+    assert report["errors"][2]["errors"][0]["field"] == "type"
+
+    company_id = next(iter(dataset["companies"]))
+    for opportunity_id in report["opportunity_ids"]:
+        stored = client.portal.call(repo.get, f"opportunities/{opportunity_id}")
+        # Entreprise du token, compétences canoniques
+        assert stored["company_id"] == company_id
+        assert stored["status"] == "active"
+
+
+def test_csv_list_cells_and_errors(client, headers):
+    content = (
+        "title,type,description,required_skills,preferred_skills,location,remote_possible\n"
+        'Stage web,stage,Front-end,"[""JavaScript"", ""CSS""]",React;Vue,Lyon,true\n'
+        "Alternance,alternance,Back-end,Java;Spring,,Nantes,false\n"
+        'Projet,projet,Cassé,"[non json",,Lille,false\n'
+        "Sans lieu,emploi,Description,Go,,,false\n"
+    )
+    report = _import(client, headers, content, "offres.csv").json()
+    assert report["format"] == "csv"
+    assert report["rows"] == 4 and report["created"] == 2 and report["failed"] == 2
+    assert [error["row"] for error in report["errors"]] == [4, 5]
+    assert report["errors"][1]["errors"][0]["field"] == "location"
+
+    first = client.portal.call(repo.get, f"opportunities/{report['opportunity_ids'][0]}")
+    assert first["preferred_skills"] == ["React", "Vue"]
+    assert first["remote_possible"] is True
+
+
+def test_unknown_format_is_rejected(client, headers):
+    assert _import(client, headers, "x", "offres.txt").status_code == 400
+
+
+def test_failure_returns_partial_report(client, headers, monkeypatch):
+    monkeypatch.setattr(opportunity_import, "IMPORT_BATCH_SIZE", 2)
+    save = router_matching.save_opportunities
+    calls = []
+
+    async def failing_after_first_batch(opportunities):
+        calls.append(len(opportunities))
+        if len(calls) > 1:
+            raise RuntimeError("base indisponible")
+        await save(opportunities)
+
+    async def unexpected(*args, **kwargs):
+        raise RuntimeError("file indisponible")
+
+    monkeypatch.setattr(router_matching, "save_opportunities", failing_after_first_batch)
+    content = "\n".join(json.dumps({**VALID, "title": f"Stage {index}"}) for index in range(5))
+    report = _import(client, headers, content, "offres.ndjson").json()
+    # Une écriture échouée est consignée par ligne, l'import continue
+    assert report["created"] == 2 and report["failed"] == 3
+    assert [error["row"] for error in report["errors"]] == [3, 4, 5]
+
+    monkeypatch.setattr(router_matching.job_queue, "submit", unexpected)
+    calls.clear()
+    response = _import(client, headers, content, "offres.ndjson")
+    assert response.status_code == 500
+    detail = response.json()["detail"]
+    # Premier lot écrit avant l'erreur : reprise possible après last_row
+    assert detail["created"] == 2 and detail["rows"] == 2 and detail["last_row"] == 2
+    assert detail["error"] == "file indisponible"
@@ -0,0 +1,57 @@
+import pytest
+
+from routers.router_matching import MATCH_THRESHOLD, calculate_match_score
+from services.recommender import OpportunityMatrix
+
+
+def _brute_force(opportunities: dict, validated_skills: dict) -> list:
+    scored = [
+        (calculate_match_score(validated_skills, opportunity['required_skills']), opportunity_id)
+        for opportunity_id, opportunity in opportunities.items()
+    ]
+    return sorted(((score, opportunity_id) for score, opportunity_id in scored if score > MATCH_THRESHOLD),
+                  key=lambda item: (-item[0], item[1]))
+
+
+@pytest.fixture(scope="module")
+def matrix(dataset):
+    matrix = OpportunityMatrix()
+    matrix.load(dataset["opportunities"])
+    return matrix
+
+
+def test_recommend_matches_calculate_match_score(matrix, dataset):
+    students = list(dataset["students"].values())[:50]
+    assert any(_brute_force(dataset["opportunities"], student["validated_skills"]) for student in students)
+    for student in students:
+        expected = _brute_force(dataset["opportunities"], student["validated_skills"])
+        ranked = matrix.recommend(student["validated_skills"], MATCH_THRESHOLD)
+        assert [(item['match_score'], item['id']) for item in ranked] == pytest.approx(expected)
+
+
+def test_limit_and_after_page_through_the_full_ranking(matrix, dataset):
+    student = max(dataset["students"].values(), key=lambda student: len(student["validated_skills"]))
+    full = matrix.recommend(student["validated_skills"], MATCH_THRESHOLD)
+    pages, after = [], None
+    while True:
+        page = matrix.recommend(student["validated_skills"], MATCH_THRESHOLD, limit=3, after=after)
+        if not page:
+            break
+        pages.extend(page)
+        after = (page[-1]['match_score'], page[-1]['id'])
+    assert [item['id'] for item in pages] == [item['id'] for item in full]
+
+
+def test_upsert_and_remove_update_the_ranking():
+    matrix = OpportunityMatrix()
+    matrix.load({
+        "o1": {"id": "o1", "required_skills": ["Python", "SQL"]},
+        "o2": {"id": "o2", "required_skills": ["Java"]},
+    })
+    skills = {"python": "expert", "Java": "avancé"}
+    assert [item['id'] for item in matrix.recommend(skills, MATCH_THRESHOLD)] == ["o2", "o1"]
+
+    matrix.upsert("o1", {"id": "o1", "required_skills": ["Python"]})
+    matrix.remove("o2")
+    ranked = matrix.recommend(skills, MATCH_THRESHOLD)
+    assert [(item['id'], item['match_score']) for item in ranked] == [("o1", 1.0)]
@@ -0,0 +1,92 @@
+import math
+
+import pytest
+
+from services.search_index import BM25_B, BM25_K1, FIELD_WEIGHTS, OpportunitySearchIndex, tokenize
+
+OPPORTUNITIES = {
+    "o1": {"title": "Développeur Python", "description": "API et données", "required_skills": ["Python"],
+           "type": "stage", "location": "Paris", "remote_possible": True},
+    "o2": {"title": "Analyste", "description": "Reporting en Python et SQL", "required_skills": ["SQL"],
+           "type": "stage", "location": "Lyon", "remote_possible": False},
+    "o3": {"title": "Développeur Java", "description": "Back-end", "required_skills": ["Java", "Spring"],
+           "type": "emploi", "location": "Paris", "remote_possible": False},
+    "o4": {"title": "Data engineer", "description": "Pipelines Python", "required_skills": ["Python", "SQL"],
+           "type": "alternance", "location": "Paris", "remote_possible": True},
+    "o5": {"title": "Développeur Python", "description": "Mission terminée", "required_skills": ["Python"],
+           "type": "stage", "location": "Paris", "status": "closed"},
+}
+
+
+def _reference_scores(opportunities: dict, query: str) -> dict:
+    """BM25 calculé directement sur les opportunités actives"""
+    documents = {}
+    for opp_id, opportunity in opportunities.items():
+        if opportunity.get("status", "active") != "active":
+            continue
+        frequencies = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            value = opportunity.get(field) or ""
+            for term in tokenize(" ".join(value) if isinstance(value, list) else value):
+                frequencies[term] = frequencies.get(term, 0) + weight
+        documents[opp_id] = frequencies
+    average_length = sum(sum(doc.values()) for doc in documents.values()) / len(documents)
+    scores = {}
+    for opp_id, frequencies in documents.items():
+        score = 0.0
+        for term in dict.fromkeys(tokenize(query)):
+            containing = sum(1 for doc in documents.values() if term in doc)
+            if term not in frequencies:
+                continue
+            idf = math.log(1 + (len(documents) - containing + 0.5) / (containing + 0.5))
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * sum(frequencies.values()) / average_length)
+            score += idf * frequencies[term] * (BM25_K1 + 1) / (frequencies[term] + norm)
+        if score > 0:
+            scores[opp_id] = score
+    return scores
+
+
+@pytest.fixture
+def index():
+    index = OpportunitySearchIndex()
+    index.load({opp_id: dict(opportunity) for opp_id, opportunity in OPPORTUNITIES.items()})
+    return index
+
+
+def test_bm25_scores_and_ranking(index):
+    results, total, _ = index.search("développeur python", limit=10)
+    expected = _reference_scores(OPPORTUNITIES, "développeur python")
+    assert total == len(expected)
+    assert {result["id"]: result["search_score"] for result in results} == pytest.approx(expected)
+    # Titre pondéré : "Développeur Python" devant les mentions dans la description
+    assert results[0]["id"] == "o1"
+    assert [result["search_score"] for result in results] == pytest.approx(sorted(expected.values(), reverse=True))
+
+
+def test_closed_opportunities_are_not_indexed(index):
+    results, _, _ = index.search("python", limit=10)
+    assert "o5" not in {result["id"] for result in results}
+
+
+def test_facet_counts_ignore_their_own_filter(index):
+    results, total, facets = index.search("python", filters={"type": "stage", "location": "Paris"}, limit=10)
+    assert [result["id"] for result in results] == ["o1"]
+    assert total == 1
+    # Compte par type parmi les résultats à Paris, par lieu parmi les stages
+    assert facets["type"] == {"stage": 1, "alternance": 1}
+    assert facets["location"] == {"Paris": 1, "Lyon": 1}
+    assert facets["remote_possible"] == {"true": 1}
+
+
+def test_after_cursor_resumes_the_ranking(index):
+    full, _, _ = index.search("python", limit=10)
+    first, _, _ = index.search("python", limit=2)
+    last = first[-1]
+    rest, _, _ = index.search("python", limit=10, after=(last["search_score"], last["id"]))
+    assert [result["id"] for result in first + rest] == [result["id"] for result in full]
+
+
+def test_upsert_replaces_terms(index):
+    index.upsert("o3", {**OPPORTUNITIES["o3"], "title": "Développeur Python", "required_skills": ["Python"]})
+    results, _, _ = index.search("java", limit=10)
+    assert results == []
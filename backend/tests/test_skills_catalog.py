@@ -0,0 +1,135 @@
+from services.skills_catalog import EXACT_SCORE, SkillsCatalog
+
+CATALOG = {
+    "programming": {
+        "python": {"name": "Python", "aliases": ["python3", "py"]},
+        "javascript": {"name": "JavaScript", "aliases": ["js", "ecmascript"]},
+        "node_js": {"name": "Node.js", "aliases": ["nodejs"]},
+        "csharp": {"name": "C#"},
+    },
+    "design": {
+        "ui_ux_design": {"name": "UI/UX Design", "aliases": ["ux"]},
+    },
+    "marketing": {
+        "digital_marketing": {"name": "Digital Marketing"},
+        "seo": {"name": "SEO", "aliases": ["référencement naturel"]},
+    },
+}
+
+
+def _catalog() -> SkillsCatalog:
+    catalog = SkillsCatalog()
+    catalog.load(CATALOG)
+    return catalog
+
+
+def _names(results: list) -> list:
+    return [result["name"] for result in results]
+
+
+def test_exact_match_ranks_first():
+    results = _catalog().search("python")
+    assert results[0]["name"] == "Python"
+    assert results[0]["score"] == EXACT_SCORE
+
+
+def test_prefix_alias_and_word_prefix():
+    catalog = _catalog()
+    assert _names(catalog.search("jav")) == ["JavaScript"]
+    assert "Node.js" in _names(catalog.search("nodej"))
+    # Début d'un mot autre que le premier
+    assert "Digital Marketing" in _names(catalog.search("market"))
+    # Alias accentué, recherche sans accent
+    assert "SEO" in _names(catalog.search("referencement"))
+
+
+def test_typo_tolerance():
+    assert _names(_catalog().search("pyhton"))[0] == "Python"
+
+
+def test_limit_and_empty_query():
+    catalog = _catalog()
+    assert len(catalog.search("a", limit=2)) <= 2
+    assert catalog.search("  ") == []
+
+
+def test_canonicalize_and_skill_key():
+    catalog = _catalog()
+    assert catalog.canonicalize("python3") == "Python"
+    assert catalog.canonicalize("  Rust ") == "Rust"
+    assert catalog.skill_key("UI/UX Design") == "ui_ux_design"
+    assert catalog.skill_key("c#") == "csharp"
+    assert catalog.skill_key("Objective C#") == "objective_csharp"
+    # Idempotente
+    assert catalog.skill_key(catalog.skill_key("Node.js")) == "node_js"
+
+
+def test_keyed_skills_keeps_best_level_and_flattens_nested_names():
+    keyed = _catalog().keyed_skills({
+        "python3": "débutant",
+        "Python": "avancé",
+        "UI": {"UX Design": "intermédiaire"},
+    })
+    assert keyed == {"python": "avancé", "ui_ux_design": "intermédiaire"}
+
+
+def test_memo_is_bounded(monkeypatch):
+    from services import skills_catalog as skills_catalog_module
+
+    monkeypatch.setattr(skills_catalog_module, "SKILL_KEYS_MAX", 3)
+    catalog = _catalog()
+    for index in range(10):
+        catalog.skill_key(f"compétence {index}")
+    assert len(catalog._keys) == 3
+    assert catalog.skill_key("compétence 0") == "competence_0"
+    catalog.load(CATALOG)
+    assert catalog._keys == {}
+
+
+def test_catalog_edit_remaps_dependent_indexes(client, dataset):
+    import time
+
+    from database import repository as repo
+    from routers.router_matching import on_opportunity_changed
+    from services.recommender import opportunity_matrix
+    from services.student_skill_index import student_skill_index
+    from services.token_cache import token_cache
+
+    token_cache.put("test-catalog-admin", {"uid": "admin", "user_type": "admin"})
+    admin = {"Authorization": "Bearer test-catalog-admin"}
+    student_id = next(iter(dataset["students"]))
+    opportunity_id = next(iter(dataset["opportunities"]))
+    opportunity = {**client.portal.call(repo.get, f"opportunities/{opportunity_id}"),
+                   "required_skills": ["Quantum Computing"]}
+
+    async def setup():
+        await repo.update("", {
+            f"students/{student_id}/validated_skills/qc": "expert",
+            f"opportunities/{opportunity_id}/required_skills": opportunity["required_skills"]
+        })
+        student_skill_index.set_skill(student_id, "qc", "expert")
+        on_opportunity_changed(opportunity_id, opportunity)
+
+    client.portal.call(setup)
+    assert student_id not in student_skill_index.candidates(["Quantum Computing"])
+    version = client.portal.call(repo.get, "index_versions/skills_catalog") or 0
+
+    response = client.put("/admin/skills-catalog/science/quantum_computing", headers=admin,
+                          json={"name": "Quantum Computing", "aliases": ["qc"]})
+    assert response.status_code == 200
+    # Index par clé reconstruits dans ce processus : l'alias et le nom ont la même clé
+    assert student_skill_index.candidates(["Quantum Computing"])[student_id]["quantum_computing"] == "expert"
+    assert opportunity_matrix.get(opportunity_id)["required_skills"] == ["Quantum Computing"]
+    assert client.portal.call(repo.get, "index_versions/skills_catalog") == version + 1
+
+    # validated_skills réécrites sous la clé du catalogue (tâche de fond)
+    deadline = time.time() + 5
+    while time.time() < deadline:
+        stored = client.portal.call(repo.get, f"students/{student_id}/validated_skills")
+        if "qc" not in stored:
+            break
+        time.sleep(0.05)
+    assert stored.get("quantum_computing") == "expert" and "qc" not in stored
+
+    assert client.delete("/admin/skills-catalog/science/quantum_computing", headers=admin).status_code == 200
+    assert client.portal.call(repo.get, "skills_catalog/science") is None
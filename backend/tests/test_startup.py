@@ -0,0 +1,10 @@
+import pytest
+
+from benchmarks import bench_startup
+
+
+@pytest.mark.bench
+def test_cold_import_within_budget(capsys):
+    # Médiane de 3 imports à froid de main, sans identifiants Firebase
+    assert bench_startup.main("main", runs=3, budget_ms=bench_startup.STARTUP_IMPORT_BUDGET_MS, top=5) == 0, \
+        capsys.readouterr().out
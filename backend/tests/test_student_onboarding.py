@@ -0,0 +1,89 @@
+import csv
+
+import pytest
+
+from database import repository as repo
+from services import student_onboarding
+from services.student_onboarding import onboard_students, student_uid
+
+
+class FakeAuth:
+    """firebase_admin.auth réduit : import_users indisponible, create_user idempotent par uid"""
+
+    class UidAlreadyExistsError(Exception):
+        pass
+
+    def __init__(self):
+        self.users = {}
+        self.create_calls = 0
+
+    def import_users(self, records, hash_alg=None):
+        raise PermissionError("import_users non autorisé")
+
+    def create_user(self, uid, email, password, display_name):
+        self.create_calls += 1
+        if uid in self.users:
+            raise self.UidAlreadyExistsError(uid)
+        self.users[uid] = email
+
+
+def _write_csv(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=[
+            "email", "first_name", "last_name", "school", "formation", "year_of_study", "password"
+        ])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def _student(index: int, **fields) -> dict:
+    return {"email": f"eleve{index}@ecole.test", "first_name": "Élève", "last_name": str(index),
+            "school": "École test", "formation": "Informatique", "year_of_study": "2",
+            "password": "motdepasse", **fields}
+
+
+def test_resume_after_interruption(client, tmp_path, monkeypatch):
+    auth = FakeAuth()
+    monkeypatch.setattr(student_onboarding, "get_admin_auth", lambda: auth)
+    rows = [_student(index) for index in range(7)]
+    rows[2] = _student(2, year_of_study="deux")
+    rows[5] = _student(0)  # email en double
+    source, results = tmp_path / "eleves.csv", tmp_path / "resultats.csv"
+    _write_csv(source, rows)
+
+    update = repo.update
+    writes = []
+
+    async def interrupted_update(path, data):
+        writes.append(len(data))
+        if len(writes) == 2:
+            raise RuntimeError("coupure réseau")
+        await update(path, data)
+
+    monkeypatch.setattr(repo, "update", interrupted_update)
+    with pytest.raises(RuntimeError):
+        client.portal.call(lambda: onboard_students(str(source), str(results), batch_size=3))
+    # Premier lot enregistré ; le deuxième (comptes créés, fiches non écrites) sera rejoué
+    progress = student_onboarding.load_progress(f"{results}.progress.json", str(source.resolve()))
+    assert progress["rows_done"] == 3
+
+    monkeypatch.setattr(repo, "update", update)
+    totals = client.portal.call(lambda: onboard_students(str(source), str(results), batch_size=3))
+    assert totals["rows_done"] == 7
+    assert totals["created"] == 5 and totals["failed"] == 2
+
+    with open(results, newline="", encoding="utf-8") as results_file:
+        outcomes = list(csv.DictReader(results_file))
+    assert [int(outcome["row"]) for outcome in outcomes] == list(range(1, 8))
+    assert [outcome["status"] for outcome in outcomes] == \
+        ["created", "created", "failed", "created", "created", "failed", "created"]
+    assert outcomes[5]["error"] == "Email en double dans le fichier"
+
+    # Les comptes du lot rejoué ont gardé leur uid ; pas de doublon
+    assert len(auth.users) == 5
+    assert auth.create_calls == 5 + 2
+    for index in (0, 3, 6):
+        uid = student_uid(f"eleve{index}@ecole.test")
+        profile = client.portal.call(repo.get, f"students/{uid}")
+        assert profile["id"] == uid and "password" not in profile
+        assert client.portal.call(repo.get, f"users/{uid}")["user_type"] == "student"
@@ -0,0 +1,94 @@
+import asyncio
+import base64
+import json
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from routers import router_auth
+from services.token_cache import TokenCache
+
+
+def test_entry_expires_at_token_exp_before_ttl(monkeypatch):
+    cache = TokenCache(max_size=10, ttl=300)
+    now = time.time()
+    cache.put("jeton", {"uid": "u1"}, token_exp=now + 10)
+    assert cache.get("jeton") == {"uid": "u1"}
+
+    monkeypatch.setattr(time, "time", lambda: now + 11)
+    assert cache.get("jeton") is None
+
+
+def test_entry_expires_after_ttl(monkeypatch):
+    cache = TokenCache(max_size=10, ttl=60)
+    now = time.time()
+    cache.put("jeton", {"uid": "u1"}, token_exp=now + 3600)
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert cache.get("jeton") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TokenCache(max_size=2, ttl=300)
+    cache.put("a", {"uid": "ua"})
+    cache.put("b", {"uid": "ub"})
+    assert cache.get("a") is not None  # "b" devient le moins récemment utilisé
+    cache.put("c", {"uid": "uc"})
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_evict_uid_removes_every_token_of_the_user():
+    cache = TokenCache(max_size=10, ttl=300)
+    cache.put("t1", {"uid": "u1"})
+    cache.put("t2", {"uid": "u1"})
+    cache.put("t3", {"uid": "u2"})
+
+    cache.evict_uid("u1")
+    assert cache.get("t1") is None
+    assert cache.get("t2") is None
+    assert cache.get("t3") == {"uid": "u2"}
+
+
+def test_cached_user_is_a_copy():
+    cache = TokenCache(max_size=10, ttl=300)
+    cache.put("jeton", {"uid": "u1"})
+    cache.get("jeton")["uid"] = "modifié"
+    assert cache.get("jeton") == {"uid": "u1"}
+
+
+def _jwt(claims: dict) -> str:
+    payload = base64.urlsafe_b64encode(json.dumps(claims).encode()).decode().rstrip("=")
+    return f"en-tete.{payload}.signature"
+
+
+def test_revoked_token_evicts_every_cached_token_of_the_user(monkeypatch):
+    class FakeAuth:
+        class RevokedIdTokenError(Exception):
+            pass
+
+        class UserDisabledError(Exception):
+            pass
+
+        def verify_id_token(self, token, check_revoked=False):
+            raise self.RevokedIdTokenError("révoqué")
+
+    cache = TokenCache(max_size=10, ttl=300)
+    monkeypatch.setattr(router_auth, "token_cache", cache)
+    monkeypatch.setattr(router_auth, "get_admin_auth", lambda: FakeAuth())
+    cache.put("ancien", {"uid": "u1"})
+    cache.put("autre", {"uid": "u2"})
+
+    # Jeton jamais mis en cache : l'uid vient des claims non vérifiés
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(router_auth.get_current_user_checked(_jwt({"user_id": "u1", "sub": "u1"})))
+    assert error.value.status_code == 401
+    assert cache.get("ancien") is None
+    assert cache.get("autre") == {"uid": "u2"}
+
+    with pytest.raises(HTTPException):
+        asyncio.run(router_auth.get_current_user_checked("illisible"))
+    assert cache.get("autre") == {"uid": "u2"}